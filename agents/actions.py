@@ -1,16 +1,85 @@
 # agents/actions.py
 
-from typing import Dict, Any
+from typing import Dict, Any, List
 
 from agents.jd_agent import jd_agent
 from agents.resume_agent import resume_agent
-from agents.gap_agent import gap_agent
-from agents.evaluation_agent import evaluate_constraints
+from agents.incremental import (
+    previous_extraction,
+    incremental_gap,
+    incremental_evaluation,
+    verdicts_from_evaluation
+)
 from agents.recommendation_agent import recommendation_agent
 from agents.chat_agent import chat_agent
 from rag.skill_rag import infer_parent_skills
 
 
+def merge_evaluation(
+    evaluation: Dict[str, Any],
+    gap_matched: List[str],
+    gap_missing: List[str]
+) -> Dict[str, Any]:
+    """
+    Merges LLM evaluation with embedding-based GAP results.
+    LLM verdicts win; GAP only fills requirements the LLM did not cover.
+    """
+
+    # GAP results (deduped, input order kept for stable output)
+    gap_matched = dict.fromkeys(gap_matched)
+    gap_missing = dict.fromkeys(gap_missing)
+
+    final_met = {}
+    final_partial = {}
+    final_missing = {}
+
+    # -------- Evaluation MET --------
+    for item in evaluation.get("met", []):
+        final_met[item["requirement"]] = item["reason"]
+
+    # -------- Evaluation PARTIAL --------
+    for item in evaluation.get("partially_met", []):
+        if item["requirement"] not in final_met:
+            final_partial[item["requirement"]] = item["reason"]
+
+    # -------- Evaluation MISSING --------
+    for item in evaluation.get("missing", []):
+        if (
+            item["requirement"] not in final_met
+            and item["requirement"] not in final_partial
+        ):
+            final_missing[item["requirement"]] = item["reason"]
+
+    # -------- GAP FALLBACK LOGIC --------
+    for r in gap_matched:
+        if r not in final_met and r not in final_partial:
+            final_partial[r] = (
+                "Semantically matched, but explicit proficiency or depth is unclear"
+            )
+
+    for r in gap_missing:
+        if r not in final_met and r not in final_partial:
+            final_missing[r] = (
+                "No strong semantic or contextual evidence found in resume"
+            )
+
+    # -------- FINAL MERGED RESULT --------
+    return {
+        "met": [
+            {"requirement": k, "reason": v}
+            for k, v in final_met.items()
+        ],
+        "partially_met": [
+            {"requirement": k, "reason": v}
+            for k, v in final_partial.items()
+        ],
+        "missing": [
+            {"requirement": k, "reason": v}
+            for k, v in final_missing.items()
+        ]
+    }
+
+
 def execute_action(action: str, state: Dict[str, Any], api_key: str) -> Dict[str, Any]:
     """
     Executes ONE agent/tool chosen by the orchestrator.
@@ -20,13 +89,17 @@ def execute_action(action: str, state: Dict[str, Any], api_key: str) -> Dict[str
 
     # ---------------- JD AGENT ----------------
     if action == "JD_AGENT":
-        jd_data = jd_agent(state["jd_text"], api_key)
-        state["jd_requirements"] = jd_data.get("requirements", [])
+        requirements = previous_extraction(state, "jd")
+        if requirements is None:
+            requirements = jd_agent(state["jd_text"], api_key).get("requirements", [])
+        state["jd_requirements"] = requirements
 
     # ---------------- RESUME AGENT ----------------
     elif action == "RESUME_AGENT":
-        resume_data = resume_agent(state["resume_text"], api_key)
-        state["resume_evidence"] = resume_data.get("evidence", [])
+        evidence = previous_extraction(state, "resume")
+        if evidence is None:
+            evidence = resume_agent(state["resume_text"], api_key).get("evidence", [])
+        state["resume_evidence"] = evidence
 
     # ---------------- SKILL RAG AGENT ----------------
     elif action == "SKILL_RAG":
@@ -36,77 +109,40 @@ def execute_action(action: str, state: Dict[str, Any], api_key: str) -> Dict[str
 
     # ---------------- GAP AGENT ----------------
     elif action == "GAP_AGENT":
-        matched, missing, match_pct = gap_agent(
+        matched, missing, match_pct, details, report = incremental_gap(
             jd_requirements=state.get("jd_requirements", []),
             resume_evidence=state.get("resume_evidence", []),
-            inferred_skills=state.get("inferred_skills", [])
+            inferred_skills=state.get("inferred_skills", []),
+            previous=state.get("previous_run")
         )
         state["matched"] = matched
         state["missing"] = missing
         state["confidence"] = match_pct / 100
+        state["match_details"] = details
+        state["reanalysis"] = {**state.get("reanalysis", {}), **report}
 
     # ---------------- EVALUATION + MERGE AGENT ----------------
     elif action == "EVALUATION_AGENT":
 
-        evaluation = evaluate_constraints(
+        # Previous verdicts for unchanged requirements + fresh ones for the delta
+        evaluation, report = incremental_evaluation(
             state.get("jd_requirements", []),
             state.get("resume_text", ""),
-            api_key
+            api_key,
+            previous=state.get("previous_run")
         )
 
-        # GAP results
-        gap_matched = set(state.get("matched", []))
-        gap_missing = set(state.get("missing", []))
-
-        final_met = {}
-        final_partial = {}
-        final_missing = {}
-
-        # -------- Evaluation MET --------
-        for item in evaluation.get("met", []):
-            final_met[item["requirement"]] = item["reason"]
-
-        # -------- Evaluation PARTIAL --------
-        for item in evaluation.get("partially_met", []):
-            if item["requirement"] not in final_met:
-                final_partial[item["requirement"]] = item["reason"]
-
-        # -------- Evaluation MISSING --------
-        for item in evaluation.get("missing", []):
-            if (
-                item["requirement"] not in final_met
-                and item["requirement"] not in final_partial
-            ):
-                final_missing[item["requirement"]] = item["reason"]
-
-        # -------- GAP FALLBACK LOGIC --------
-        for r in gap_matched:
-            if r not in final_met and r not in final_partial:
-                final_partial[r] = (
-                    "Semantically matched, but explicit proficiency or depth is unclear"
-                )
-
-        for r in gap_missing:
-            if r not in final_met and r not in final_partial:
-                final_missing[r] = (
-                    "No strong semantic or contextual evidence found in resume"
-                )
-
-        # -------- SAVE FINAL MERGED RESULT --------
-        state["final_evaluation"] = {
-            "met": [
-                {"requirement": k, "reason": v}
-                for k, v in final_met.items()
-            ],
-            "partially_met": [
-                {"requirement": k, "reason": v}
-                for k, v in final_partial.items()
-            ],
-            "missing": [
-                {"requirement": k, "reason": v}
-                for k, v in final_missing.items()
-            ]
-        }
+        state["evaluation_context"] = (
+            evaluation.pop("context_report", None) or {"mode": "full"}
+        )
+        state["evaluation_verdicts"] = verdicts_from_evaluation(evaluation)
+        state["reanalysis"] = {**state.get("reanalysis", {}), **report}
+
+        state["final_evaluation"] = merge_evaluation(
+            evaluation,
+            gap_matched=state.get("matched", []),
+            gap_missing=state.get("missing", [])
+        )
 
     # ---------------- RECOMMENDATION AGENT ----------------
     elif action == "RECOMMENDATION_AGENT":
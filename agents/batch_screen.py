@@ -0,0 +1,282 @@
+# agents/batch_screen.py
+"""
+Batch screening: many resume PDFs against ONE job description.
+
+    python -m agents.batch_screen --resumes ./applicants --jd jd.txt --out results.jsonl
+
+The JD is extracted and embedded once; per-resume work runs in a
+process pool with a shared cap on concurrent LLM calls. Results are
+appended to --out as JSON lines, which doubles as the checkpoint:
+re-running the same command skips resumes already screened.
+"""
+
+import argparse
+import hashlib
+import json
+import multiprocessing as mp
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Any, List, Set
+
+from tqdm import tqdm
+
+from agents.jd_agent import jd_agent
+from agents.resume_agent import resume_agent
+from agents.gap_agent import gap_agent, encode_requirements
+from agents.evaluation_agent import evaluate_constraints
+from agents.actions import merge_evaluation
+from rag.skill_rag import infer_parent_skills
+from utils.pdf_parser import extract_text_from_pdf
+
+# A worker dying (OOM, crash in the PDF parser) breaks the whole pool and
+# fails every resume still in it; those are re-run in a fresh pool up to
+# this many times before being recorded as failed
+POOL_RETRIES = int(os.getenv("BATCH_POOL_RETRIES", "2"))
+
+# ---------------- WORKER STATE (SET ONCE PER PROCESS) ----------------
+_worker: Dict[str, Any] = {}
+
+
+def _init_worker(api_key, jd_requirements, jd_embeddings, llm_slots):
+    _worker["api_key"] = api_key
+    _worker["jd_requirements"] = jd_requirements
+    _worker["jd_embeddings"] = jd_embeddings
+    _worker["llm_slots"] = llm_slots
+
+
+def _file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def screen_resume(path: str) -> Dict[str, Any]:
+    """
+    Full per-resume pipeline against the worker's pre-extracted JD.
+    LLM calls hold one of the shared slots.
+    """
+
+    api_key = _worker["api_key"]
+    jd_requirements = _worker["jd_requirements"]
+    llm_slots = _worker["llm_slots"]
+
+    resume_text = extract_text_from_pdf(path)
+
+    with llm_slots:
+        resume_data = resume_agent(resume_text, api_key)
+    evidence = resume_data.get("evidence", [])
+
+    inferred = infer_parent_skills(evidence)
+
+    matched, missing, match_pct = gap_agent(
+        jd_requirements=jd_requirements,
+        resume_evidence=evidence,
+        inferred_skills=inferred,
+        jd_embeddings=_worker["jd_embeddings"]
+    )
+
+    # One slot → shards run one at a time so the global LLM cap holds
+    with llm_slots:
+        evaluation = evaluate_constraints(
+            jd_requirements, resume_text, api_key, max_concurrency=1
+        )
+
+    context_report = evaluation.pop("context_report", None)
+    final_evaluation = merge_evaluation(evaluation, matched, missing)
+
+    return {
+        "confidence": round(match_pct / 100, 2),
+        "resume_evidence": evidence,
+        "inferred_skills": inferred,
+        "matched": matched,
+        "missing": missing,
+        "final_evaluation": final_evaluation,
+        "evaluation_context": context_report or {"mode": "full"}
+    }
+
+
+def _screen_job(path: str, sha256: str) -> Dict[str, Any]:
+    record = {"file": os.path.basename(path), "sha256": sha256}
+
+    try:
+        record.update(screen_resume(path))
+        record["status"] = "ok"
+    except Exception as e:
+        record["status"] = "error"
+        record["error"] = f"{type(e).__name__}: {e}"
+
+    return record
+
+
+# ---------------- CHECKPOINT ----------------
+def _load_checkpoint(out_path: str, jd_sha256: str) -> Set[str]:
+    """
+    Resume hashes already screened successfully against this JD.
+    A truncated last line (crash mid-write) is ignored.
+    """
+
+    done = set()
+
+    if not os.path.exists(out_path):
+        return done
+
+    with open(out_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+            if record.get("status") == "ok" and record.get("jd_sha256") == jd_sha256:
+                done.add(record["sha256"])
+
+    return done
+
+
+def _list_pdfs(resume_dir: str) -> List[str]:
+    return sorted(
+        os.path.join(resume_dir, name)
+        for name in os.listdir(resume_dir)
+        if name.lower().endswith(".pdf")
+    )
+
+
+# ---------------- ENTRY POINT ----------------
+def run_batch(
+    resume_dir: str,
+    jd_text: str,
+    out_path: str,
+    api_key: str,
+    workers: int = None,
+    llm_concurrency: int = 4
+) -> Dict[str, int]:
+    """
+    Screens every PDF in resume_dir against jd_text.
+    Returns counts of screened / skipped / failed resumes.
+    """
+
+    jd_sha256 = hashlib.sha256(jd_text.encode("utf-8")).hexdigest()
+
+    # ---------------- JD WORK (ONCE) ----------------
+    jd_requirements = jd_agent(jd_text, api_key).get("requirements", [])
+    if not jd_requirements:
+        raise ValueError("No requirements could be extracted from the job description")
+
+    jd_embeddings = encode_requirements(jd_requirements)
+
+    # ---------------- PENDING RESUMES ----------------
+    done = _load_checkpoint(out_path, jd_sha256)
+
+    pending = []
+    skipped = 0
+    for path in _list_pdfs(resume_dir):
+        sha256 = _file_sha256(path)
+        if sha256 in done:
+            skipped += 1
+        else:
+            pending.append((path, sha256))
+
+    counts = {"screened": 0, "skipped": skipped, "failed": 0}
+
+    if not pending:
+        return counts
+
+    # ---------------- FAN OUT ----------------
+    ctx = mp.get_context("spawn")
+    crashes: Dict[str, int] = {}
+
+    with open(out_path, "a", encoding="utf-8") as out:
+        progress = tqdm(total=skipped + len(pending), initial=skipped, unit="resume")
+
+        while pending:
+            # Fresh slots per pool: a dead worker never releases the one it held
+            llm_slots = ctx.BoundedSemaphore(llm_concurrency)
+            broken = []
+
+            with ProcessPoolExecutor(
+                max_workers=workers or os.cpu_count(),
+                mp_context=ctx,
+                initializer=_init_worker,
+                initargs=(api_key, jd_requirements, jd_embeddings, llm_slots)
+            ) as pool:
+
+                futures = {
+                    pool.submit(_screen_job, path, sha256): (path, sha256)
+                    for path, sha256 in pending
+                }
+
+                for future in as_completed(futures):
+                    path, sha256 = futures[future]
+
+                    try:
+                        record = future.result()
+                    except BrokenProcessPool as e:
+                        crashes[path] = crashes.get(path, 0) + 1
+                        if crashes[path] <= POOL_RETRIES:
+                            broken.append((path, sha256))
+                            continue
+                        record = {
+                            "file": os.path.basename(path),
+                            "sha256": sha256,
+                            "status": "error",
+                            "error": f"{type(e).__name__}: {e}"
+                        }
+
+                    record["jd_sha256"] = jd_sha256
+
+                    # One line per resume, flushed → crash-safe checkpoint
+                    out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    out.flush()
+                    os.fsync(out.fileno())
+
+                    if record["status"] == "ok":
+                        counts["screened"] += 1
+                    else:
+                        counts["failed"] += 1
+
+                    progress.update(1)
+                    progress.set_postfix(failed=counts["failed"])
+
+            pending = broken
+
+        progress.close()
+
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Screen a directory of resume PDFs against one job description."
+    )
+    parser.add_argument("--resumes", required=True, help="directory of resume PDFs")
+    parser.add_argument("--jd", required=True, help="job description text file")
+    parser.add_argument("--out", required=True, help="results / checkpoint file (JSON lines)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--llm-concurrency", type=int, default=4, help="max concurrent LLM calls")
+    args = parser.parse_args(argv)
+
+    api_key = os.getenv("GROQ_API_KEY")
+    if not api_key:
+        parser.error("GROQ_API_KEY environment variable is not set")
+
+    with open(args.jd, "r", encoding="utf-8") as f:
+        jd_text = f.read()
+
+    counts = run_batch(
+        resume_dir=args.resumes,
+        jd_text=jd_text,
+        out_path=args.out,
+        api_key=api_key,
+        workers=args.workers,
+        llm_concurrency=args.llm_concurrency
+    )
+
+    print(json.dumps(counts), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
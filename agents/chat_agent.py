@@ -1,17 +1,12 @@
 # agents/chat_agent.py
 
-from utils.groq_client import groq_call
+from typing import Iterator, Union
 
+from utils.groq_client import groq_call, groq_stream
 
-def chat_agent(question: str, context: dict, api_key: str) -> str:
-    """
-    Company-side conversational agent.
-
-    Answers questions from the perspective of a hiring organization
-    evaluating a candidate's resume against a job description.
-    """
 
-    prompt = f"""
+def _build_chat_prompt(question: str, context: dict) -> str:
+    return f"""
 You are an AUTOMATED RESUME EVALUATION ASSISTANT
 used by a company during candidate screening.
 
@@ -53,4 +48,40 @@ RESPONSE GUIDELINES:
 Write the answer as a professional evaluation note.
 """
 
+
+def _strip_leading(chunks: Iterator[str]) -> Iterator[str]:
+    """
+    Streaming counterpart of .strip() for the start of the answer.
+    """
+    started = False
+    for chunk in chunks:
+        if not started:
+            chunk = chunk.lstrip()
+            if not chunk:
+                continue
+            started = True
+        yield chunk
+
+
+def chat_agent(
+    question: str,
+    context: dict,
+    api_key: str,
+    stream: bool = False
+) -> Union[str, Iterator[str]]:
+    """
+    Company-side conversational agent.
+
+    Answers questions from the perspective of a hiring organization
+    evaluating a candidate's resume against a job description.
+
+    With stream=True returns a generator of text chunks instead of the
+    full answer, so the UI can render tokens as they arrive.
+    """
+
+    prompt = _build_chat_prompt(question, context)
+
+    if stream:
+        return _strip_leading(groq_stream(prompt, api_key))
+
     return groq_call(prompt, api_key).strip()
@@ -0,0 +1,144 @@
+# agents/checkpointer.py
+
+import argparse
+import contextvars
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+# ---------------- CONFIG ----------------
+# One SQLite file shared by every worker: any process can resume any run
+CHECKPOINT_PATH = os.getenv(
+    "GRAPH_CHECKPOINT_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "skill-gap-analyzer", "checkpoints.sqlite")
+)
+
+# Never written to disk; callers pass them again when resuming
+SECRET_KEYS = frozenset({"api_key"})
+
+_saver: Optional["RedactingSqliteSaver"] = None
+_saver_lock = threading.Lock()
+
+_secrets: contextvars.ContextVar[Dict[str, Any]] = contextvars.ContextVar(
+    "skill_gap_graph_secrets", default={}
+)
+
+
+@contextmanager
+def secrets(**values):
+    """
+    Secrets added back to graph state whenever a checkpoint is loaded
+    inside the block (e.g. secrets(api_key=key) around a resumed run).
+    """
+
+    token = _secrets.set(values)
+    try:
+        yield
+    finally:
+        _secrets.reset(token)
+
+
+def _strip(value: Any) -> Any:
+    # Graph input (the __start__ channel) carries the whole input dict
+    if isinstance(value, dict) and SECRET_KEYS & value.keys():
+        return {k: v for k, v in value.items() if k not in SECRET_KEYS}
+    return value
+
+
+class RedactingSqliteSaver(SqliteSaver):
+    """
+    SqliteSaver that never stores secret channels (SECRET_KEYS) and
+    restores the caller's secrets (see secrets()) when loading.
+    """
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        checkpoint = {
+            **checkpoint,
+            "channel_values": {
+                k: _strip(v)
+                for k, v in checkpoint["channel_values"].items()
+                if k not in SECRET_KEYS
+            }
+        }
+        return super().put(config, checkpoint, metadata, new_versions)
+
+    def put_writes(self, config, writes, task_id, task_path=""):
+        writes = [
+            (channel, _strip(value))
+            for channel, value in writes
+            if channel not in SECRET_KEYS
+        ]
+        return super().put_writes(config, writes, task_id, task_path)
+
+    def get_tuple(self, config):
+        saved = super().get_tuple(config)
+
+        values = _secrets.get()
+        if saved is not None and values:
+            saved.checkpoint["channel_values"] = {
+                **saved.checkpoint["channel_values"],
+                **values
+            }
+
+        return saved
+
+
+def get_checkpointer() -> "RedactingSqliteSaver":
+    """
+    Process-wide SQLite checkpointer (WAL, safe across worker processes).
+    """
+
+    global _saver
+
+    if _saver is not None:
+        return _saver
+
+    with _saver_lock:
+        if _saver is None:
+            os.makedirs(os.path.dirname(CHECKPOINT_PATH) or ".", exist_ok=True)
+
+            conn = sqlite3.connect(CHECKPOINT_PATH, check_same_thread=False, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+
+            saver = RedactingSqliteSaver(conn)
+            saver.setup()
+            _saver = saver
+
+    return _saver
+
+
+def delete_thread(thread_id: str):
+    get_checkpointer().delete_thread(thread_id)
+
+
+def clear():
+    """
+    Drops every saved run of every session and worker (admin use only;
+    the app deletes single runs with delete_thread).
+    """
+
+    with get_checkpointer().cursor() as cur:
+        cur.execute("DELETE FROM checkpoints")
+        cur.execute("DELETE FROM writes")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage saved graph runs.")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--delete", metavar="THREAD_ID", help="delete one saved run")
+    group.add_argument("--clear", action="store_true", help="delete EVERY saved run")
+    args = parser.parse_args(argv)
+
+    if args.clear:
+        clear()
+    else:
+        delete_thread(args.delete)
+
+
+if __name__ == "__main__":
+    main()
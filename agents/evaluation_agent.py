@@ -1,8 +1,28 @@
 # agents/evaluation_agent.py
 
-import json
-from typing import List, Dict, Any
-from utils.groq_client import groq_call
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
+from utils.structured_output import structured_call, EVALUATION_SCHEMA
+from rag.resume_retrieval import retrieve_context
+from utils import metrics
+
+
+# "full"      → whole resume in the prompt
+# "retrieval" → top-k relevant resume chunks per requirement
+# "auto"      → retrieval only for resumes longer than FULL_CONTEXT_MAX_CHARS
+CONTEXT_MODE = os.getenv("EVALUATION_CONTEXT_MODE", "auto")
+FULL_CONTEXT_MAX_CHARS = int(os.getenv("EVALUATION_FULL_CONTEXT_MAX_CHARS", "6000"))
+RETRIEVAL_TOP_K = int(os.getenv("EVALUATION_RETRIEVAL_TOP_K", "3"))
+
+# Large JDs are split into shards evaluated concurrently
+SHARD_SIZE = int(os.getenv("EVALUATION_SHARD_SIZE", "15"))
+MAX_CONCURRENCY = int(os.getenv("EVALUATION_MAX_CONCURRENCY", "4"))
+SHARD_RETRIES = int(os.getenv("EVALUATION_SHARD_RETRIES", "1"))
+
+CATEGORIES = ("met", "partially_met", "missing")
+
+FALLBACK_REASON = "Unable to confidently evaluate this requirement"
 
 
 EVALUATION_PROMPT = """
@@ -20,6 +40,7 @@ IMPORTANT RULES:
 - Projects, tools, and applied usage count as evidence
 - Certifications and degrees count as supporting evidence
 - Be conservative but fair
+- Judge EVERY requirement exactly once, copying its text as given
 
 Return ONLY valid JSON in the following format:
 
@@ -46,14 +67,188 @@ Return ONLY valid JSON in the following format:
 """
 
 
+def _normalize(requirement: str) -> str:
+    return " ".join(requirement.casefold().split())
+
+
+def _coverage_check(requirements: List[str]):
+    """
+    check() for structured_call: every requirement of the shard must be
+    judged. Items whose text was rephrased may stand in for requirements
+    not matched verbatim, but fewer items than requirements means some
+    were dropped (typically a truncated reply).
+    """
+
+    wanted = {_normalize(r) for r in requirements}
+
+    def check(parsed: Dict[str, Any]) -> Optional[str]:
+        judged = {
+            _normalize(item["requirement"])
+            for category in CATEGORIES
+            for item in parsed[category]
+        }
+
+        rephrased = judged - wanted
+        uncovered = [r for r in requirements if _normalize(r) not in judged]
+
+        if len(uncovered) > len(rephrased):
+            return (
+                "These requirements are missing from your answer: "
+                + "; ".join(uncovered)
+            )
+        return None
+
+    return check
+
+
+def _evaluate_shard(
+    requirements: List[str],
+    resume_text: str,
+    api_key: str,
+    mode: str,
+    top_k: int,
+    use_cache: bool = True,
+    max_retries: int = 1
+) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """
+    One LLM call (+ max_retries targeted retries) for one shard of requirements.
+    Returns (parsed result or None if the output never parsed, context report).
+    Network / API errors propagate so the caller can re-run the shard.
+    """
+
+    requirements_block = "\n".join(f"- {r}" for r in requirements)
+
+    # ---------------- RESUME CONTEXT ----------------
+    context_report = None
+
+    if mode == "retrieval":
+        resume_context, context_report = retrieve_context(
+            requirements,
+            resume_text,
+            top_k=top_k
+        )
+        resume_label = "RESUME (relevant excerpts)"
+    else:
+        resume_context = resume_text
+        resume_label = "RESUME"
+
+    prompt = f"""
+{EVALUATION_PROMPT}
+
+JOB REQUIREMENTS:
+{requirements_block}
+
+{resume_label}:
+{resume_context}
+"""
+
+    parsed = structured_call(
+        prompt,
+        api_key,
+        EVALUATION_SCHEMA,
+        agent="EVALUATION_AGENT",
+        max_retries=max_retries,
+        use_cache=use_cache,
+        check=_coverage_check(requirements)
+    )
+
+    if parsed is None:
+        return None, context_report
+
+    # ---- SAFETY NORMALIZATION ----
+    return {
+        category: parsed[category]
+        for category in CATEGORIES
+    }, context_report
+
+
+def _fallback(requirements: List[str]) -> Dict[str, Any]:
+    # Conservative fallback
+    return {
+        "met": [],
+        "partially_met": [],
+        "missing": [
+            {
+                "requirement": r,
+                "reason": FALLBACK_REASON
+            }
+            for r in requirements
+        ]
+    }
+
+
+def _merge_shards(
+    jd_requirements: List[str],
+    shard_results: List[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """
+    Deterministic merge: items ordered by their position in the JD,
+    requirements the LLM rephrased keep shard order after the known ones.
+    """
+
+    position = {r: i for i, r in enumerate(jd_requirements)}
+    merged = {}
+
+    for category in CATEGORIES:
+        items = [
+            (shard_no, item_no, item)
+            for shard_no, result in enumerate(shard_results)
+            for item_no, item in enumerate(result.get(category, []))
+        ]
+        items.sort(key=lambda t: (
+            position.get(t[2].get("requirement"), len(position)),
+            t[0],
+            t[1]
+        ))
+        merged[category] = [item for _, _, item in items]
+
+    return merged
+
+
+def _merge_context_reports(reports: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Aggregates per-shard retrieval reports against sending the full
+    resume with every shard.
+    """
+
+    full_chars = sum(r["full_chars"] for r in reports)
+    context_chars = sum(r["context_chars"] for r in reports)
+
+    return {
+        "mode": "retrieval",
+        "shards": len(reports),
+        "chunks_total": reports[0]["chunks_total"],
+        "chunks_used": sum(r["chunks_used"] for r in reports),
+        "full_chars": full_chars,
+        "context_chars": context_chars,
+        "reduction": round(1 - context_chars / full_chars, 4) if full_chars else 0.0,
+        "approx_tokens_saved": (full_chars - context_chars) // 4,
+        "keyword_recall": round(
+            sum(r["keyword_recall"] for r in reports) / len(reports), 4
+        )
+    }
+
+
 def evaluate_constraints(
     jd_requirements: List[str],
     resume_text: str,
-    api_key: str
+    api_key: str,
+    context_mode: str = None,
+    top_k: int = None,
+    shard_size: int = None,
+    max_concurrency: int = None
 ) -> Dict[str, Any]:
     """
     LLM-based reasoning agent.
     Overrides embedding-based decisions when necessary.
+
+    Requirements are split into shards evaluated concurrently; only
+    shards whose call errored are re-run, and a shard that still fails
+    falls back on its own requirements only.
+
+    In retrieval mode the prompt carries only resume snippets relevant
+    to the requirements; the result then includes a "context_report"
+    with the prompt-size reduction and keyword recall.
     """
 
     if not jd_requirements:
@@ -63,46 +258,79 @@ def evaluate_constraints(
             "missing": []
         }
 
-    requirements_block = "\n".join(f"- {r}" for r in jd_requirements)
+    mode = context_mode or CONTEXT_MODE
+    if mode == "auto":
+        mode = "retrieval" if len(resume_text) > FULL_CONTEXT_MAX_CHARS else "full"
 
-    prompt = f"""
-{EVALUATION_PROMPT}
+    top_k = RETRIEVAL_TOP_K if top_k is None else top_k
+    shard_size = SHARD_SIZE if shard_size is None else shard_size
 
-JOB REQUIREMENTS:
-{requirements_block}
+    # Checked here so a bad setting fails loudly instead of every shard
+    # erroring into the fallback (or no shard being built at all)
+    if mode == "retrieval" and top_k < 1:
+        raise ValueError(f"top_k must be >= 1, got {top_k}")
 
-RESUME:
-{resume_text}
-"""
+    if shard_size < 1:
+        raise ValueError(f"shard_size must be >= 1, got {shard_size}")
 
-    raw = groq_call(prompt, api_key)
+    shards = [
+        jd_requirements[i:i + shard_size]
+        for i in range(0, len(jd_requirements), shard_size)
+    ]
 
-    clean = (
-        raw.replace("```json", "")
-           .replace("```", "")
-           .strip()
-    )
+    results: List[Optional[Dict[str, Any]]] = [None] * len(shards)
+    reports: List[Optional[Dict[str, Any]]] = [None] * len(shards)
 
-    try:
-        parsed = json.loads(clean)
+    # ---------------- EVALUATE (+ RETRY FAILED SHARDS) ----------------
+    # Unparseable output gets one targeted retry inside structured_call and
+    # then falls back; only network / API errors re-run the shard, without
+    # a further targeted retry. Worst case is two calls per shard.
+    pending = list(range(len(shards)))
+    attempt = 0
 
-        # ---- SAFETY NORMALIZATION ----
-        return {
-            "met": parsed.get("met", []),
-            "partially_met": parsed.get("partially_met", []),
-            "missing": parsed.get("missing", [])
-        }
+    with ThreadPoolExecutor(max_workers=max_concurrency or MAX_CONCURRENCY) as pool:
+        while pending and attempt <= SHARD_RETRIES:
+            if attempt > 0:
+                for _ in pending:
+                    metrics.observe_retry("EVALUATION_SHARD")
 
-    except Exception:
-        # Conservative fallback
-        return {
-            "met": [],
-            "partially_met": [],
-            "missing": [
-                {
-                    "requirement": r,
-                    "reason": "Unable to confidently evaluate this requirement"
-                }
-                for r in jd_requirements
-            ]
-        }
+            futures = {
+                i: metrics.submit(
+                    pool,
+                    _evaluate_shard,
+                    shards[i],
+                    resume_text,
+                    api_key,
+                    mode,
+                    top_k,
+                    attempt == 0,           # retries must not replay a cached bad answer
+                    1 if attempt == 0 else 0
+                )
+                for i in pending
+            }
+
+            failed = []
+            for i, future in futures.items():
+                try:
+                    results[i], reports[i] = future.result()
+                except Exception:
+                    failed.append(i)
+
+            pending = failed
+            attempt += 1
+
+    for i, result in enumerate(results):
+        if result is None:
+            results[i] = _fallback(shards[i])
+
+    result = _merge_shards(jd_requirements, results)
+
+    # Shards whose call errored on every attempt have no report
+    reports = [r for r in reports if r is not None]
+
+    if mode == "retrieval" and reports:
+        result["context_report"] = (
+            reports[0] if len(reports) == 1 else _merge_context_reports(reports)
+        )
+
+    return result
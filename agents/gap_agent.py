@@ -1,11 +1,13 @@
 # agents/gap_agent.py
 
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
 import numpy as np
 
-# ---------------- LOAD MODEL ONCE ----------------
-model = SentenceTransformer("all-MiniLM-L6-v2")
+from utils.embedding_service import encode
+
+# Short skills (python, sql) → lower threshold
+# Conceptual requirements → slightly higher
+SHORT_REQUIREMENT_WORDS = 3
+SHORT_REQUIREMENT_RELAXATION = 0.05
 
 
 def _normalize(text: str) -> str:
@@ -15,11 +17,55 @@ def _normalize(text: str) -> str:
     return text.lower().strip()
 
 
+def dedupe_evidence(resume_evidence, inferred_skills=None):
+    """
+    Normalized, de-duplicated evidence (+ inferred parent skills).
+    Returns {normalized: first original spelling}, in stable order.
+    """
+
+    evidence_items = list(resume_evidence)
+
+    # Add inferred / parent skills if available
+    if inferred_skills:
+        evidence_items.extend(inferred_skills)
+
+    resume_lookup = {}
+    for item in evidence_items:
+        resume_lookup.setdefault(_normalize(item), item)
+
+    return resume_lookup
+
+
+def adaptive_thresholds(jd_reqs, base_threshold) -> np.ndarray:
+    """
+    Per-requirement thresholds for normalized requirement texts.
+    """
+
+    word_counts = np.array([len(r.split()) for r in jd_reqs])
+
+    return np.where(
+        word_counts <= SHORT_REQUIREMENT_WORDS,
+        base_threshold - SHORT_REQUIREMENT_RELAXATION,  # looser match for skill names
+        base_threshold
+    )
+
+
+def encode_requirements(jd_requirements) -> np.ndarray:
+    """
+    Normalized JD requirement embeddings, reusable across many resumes
+    via gap_agent(jd_embeddings=...).
+    """
+    return encode([_normalize(r) for r in jd_requirements], normalize=True)
+
+
 def gap_agent(
     jd_requirements,
     resume_evidence,
     inferred_skills=None,
-    base_threshold=0.65
+    base_threshold=0.65,
+    return_details=False,
+    jd_embeddings=None,
+    resume_embeddings=None
 ):
     """
     Improved semantic JD vs Resume comparison.
@@ -28,53 +74,83 @@ def gap_agent(
     - Long JD sentence vs short resume skill mismatch
     - Uses inferred (parent) skills if available
     - Adaptive similarity threshold
+
+    All requirements and evidence are encoded in one batch and scored
+    with a single normalized matrix product.
+    With return_details=True a fourth value is returned: one dict per
+    requirement with its best-matching evidence, score and threshold.
+    Pass jd_embeddings (from encode_requirements) to skip re-encoding
+    the same JD for every resume; resume_embeddings likewise must follow
+    the order of dedupe_evidence(resume_evidence, inferred_skills).
     """
 
     if not jd_requirements:
-        return [], [], 0
+        return ([], [], 0, []) if return_details else ([], [], 0)
 
     if not resume_evidence:
-        return [], jd_requirements, 0
+        details = [
+            {
+                "requirement": r,
+                "best_evidence": None,
+                "score": 0.0,
+                "threshold": None,
+                "matched": False
+            }
+            for r in jd_requirements
+        ]
+        return (
+            ([], list(jd_requirements), 0, details)
+            if return_details
+            else ([], jd_requirements, 0)
+        )
 
     # ---------------- NORMALIZE INPUTS ----------------
     jd_reqs = [_normalize(r) for r in jd_requirements]
-    resume_skills = [_normalize(r) for r in resume_evidence]
 
-    # Add inferred / parent skills if available
-    if inferred_skills:
-        resume_skills.extend([_normalize(s) for s in inferred_skills])
+    # Remove duplicates (keep first original spelling, stable order)
+    resume_lookup = dedupe_evidence(resume_evidence, inferred_skills)
 
-    # Remove duplicates
-    resume_skills = list(set(resume_skills))
+    resume_skills = list(resume_lookup.keys())
 
-    # ---------------- EMBEDDINGS ----------------
-    jd_embeddings = model.encode(jd_reqs, convert_to_numpy=True)
-    resume_embeddings = model.encode(resume_skills, convert_to_numpy=True)
-
-    matched = []
-    missing = []
+    # ---------------- EMBEDDINGS (ONE BATCH) ----------------
+    if jd_embeddings is None and resume_embeddings is None:
+        embeddings = encode(jd_reqs + resume_skills, normalize=True)
+        jd_embeddings = embeddings[:len(jd_reqs)]
+        resume_embeddings = embeddings[len(jd_reqs):]
+    elif jd_embeddings is None:
+        jd_embeddings = encode(jd_reqs, normalize=True)
+    elif resume_embeddings is None:
+        resume_embeddings = encode(resume_skills, normalize=True)
 
     # ---------------- MATCHING ----------------
-    for i, jd_req in enumerate(jd_reqs):
-        similarities = cosine_similarity(
-            jd_embeddings[i].reshape(1, -1),
-            resume_embeddings
-        )[0]
-
-        max_sim = float(np.max(similarities))
-
-        # ---------------- ADAPTIVE THRESHOLD ----------------
-        # Short skills (python, sql) → lower threshold
-        # Conceptual requirements → slightly higher
-        threshold = base_threshold
-        if len(jd_req.split()) <= 3:
-            threshold -= 0.05  # allow looser match for skill names
-
-        if max_sim >= threshold:
-            matched.append(jd_requirements[i])  # original text
-        else:
-            missing.append(jd_requirements[i])
+    # Unit vectors → dot product == cosine similarity
+    similarities = jd_embeddings @ resume_embeddings.T
+
+    best_idx = np.argmax(similarities, axis=1)
+    best_sim = similarities[np.arange(len(jd_reqs)), best_idx]
+
+    # ---------------- ADAPTIVE THRESHOLD ----------------
+    thresholds = adaptive_thresholds(jd_reqs, base_threshold)
+
+    is_match = best_sim >= thresholds
+
+    matched = [r for r, ok in zip(jd_requirements, is_match) if ok]  # original text
+    missing = [r for r, ok in zip(jd_requirements, is_match) if not ok]
 
     match_percentage = int((len(matched) / len(jd_requirements)) * 100)
 
-    return matched, missing, match_percentage
+    if not return_details:
+        return matched, missing, match_percentage
+
+    details = [
+        {
+            "requirement": jd_requirements[i],
+            "best_evidence": resume_lookup[resume_skills[best_idx[i]]],
+            "score": round(float(best_sim[i]), 4),
+            "threshold": round(float(thresholds[i]), 4),
+            "matched": bool(is_match[i])
+        }
+        for i in range(len(jd_requirements))
+    ]
+
+    return matched, missing, match_percentage, details
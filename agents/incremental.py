@@ -0,0 +1,237 @@
+# agents/incremental.py
+"""
+Incremental re-analysis.
+
+A finished run is reduced to a compact baseline (snapshot_run) and
+passed to the next run as state["previous_run"]. Each stage then diffs
+its inputs against the baseline and only sends added / changed items
+through the expensive paths:
+
+- extraction: unchanged JD / resume text → previous requirements / evidence
+- gap:        unchanged evidence pool → previous verdict per unchanged requirement
+- evaluation: unchanged resume text → previous LLM verdict per unchanged requirement
+"""
+
+import hashlib
+from typing import Dict, Any, List, Optional, Tuple
+
+from agents.gap_agent import gap_agent, dedupe_evidence, adaptive_thresholds, _normalize
+from agents.evaluation_agent import (
+    evaluate_constraints,
+    _merge_shards,
+    CATEGORIES,
+    FALLBACK_REASON
+)
+from utils.embedding_service import encode_cached
+
+
+def text_sha256(text: Optional[str]) -> str:
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+
+def snapshot_run(state: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    What the next run needs from this one (hashes instead of texts).
+    """
+
+    if not state or not state.get("jd_requirements"):
+        return None
+
+    return {
+        "jd_sha256": text_sha256(state.get("jd_text")),
+        "resume_sha256": text_sha256(state.get("resume_text")),
+        "jd_requirements": list(state.get("jd_requirements", [])),
+        "resume_evidence": list(state.get("resume_evidence", [])),
+        "inferred_skills": list(state.get("inferred_skills", [])),
+        "match_details": list(state.get("match_details", [])),
+        "evaluation_verdicts": dict(state.get("evaluation_verdicts", {}))
+    }
+
+
+def diff_items(old: List[str], new: List[str]) -> Dict[str, List[str]]:
+    """
+    Requirement / evidence diff on normalized text.
+    added / unchanged keep the new spelling, removed the old one.
+    """
+
+    old_keys = {_normalize(x) for x in old}
+    new_keys = {_normalize(x) for x in new}
+
+    return {
+        "unchanged": [x for x in new if _normalize(x) in old_keys],
+        "added": [x for x in new if _normalize(x) not in old_keys],
+        "removed": [x for x in old if _normalize(x) not in new_keys]
+    }
+
+
+def previous_extraction(state: Dict[str, Any], kind: str) -> Optional[List[str]]:
+    """
+    Previous run's JD requirements (kind="jd") or resume evidence
+    (kind="resume") if the source text is byte-identical, else None.
+    """
+
+    previous = state.get("previous_run")
+    if not previous:
+        return None
+
+    text_key, field = {
+        "jd": ("jd_text", "jd_requirements"),
+        "resume": ("resume_text", "resume_evidence")
+    }[kind]
+
+    if previous.get(f"{kind}_sha256") != text_sha256(state.get(text_key)):
+        return None
+
+    return previous.get(field) or None
+
+
+# =========================================================
+# GAP
+# =========================================================
+
+def incremental_gap(
+    jd_requirements: List[str],
+    resume_evidence: List[str],
+    inferred_skills: Optional[List[str]] = None,
+    previous: Optional[Dict[str, Any]] = None,
+    base_threshold: float = 0.65
+) -> Tuple[List[str], List[str], int, List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    gap_agent(..., return_details=True) that reuses the previous run's
+    rows for unchanged requirements when the evidence pool is the same.
+    Embeddings go through the text-level cache either way.
+    Returns (matched, missing, match_pct, details, report).
+    """
+
+    previous = previous or {}
+    diff = diff_items(previous.get("jd_requirements", []), jd_requirements)
+
+    pool = list(dedupe_evidence(resume_evidence, inferred_skills))
+    previous_pool = list(dedupe_evidence(
+        previous.get("resume_evidence", []),
+        previous.get("inferred_skills", [])
+    ))
+    evidence_changed = not previous or pool != previous_pool
+
+    # ---------------- REUSABLE ROWS ----------------
+    reusable = {}
+    if not evidence_changed:
+        thresholds = adaptive_thresholds(
+            [_normalize(r) for r in jd_requirements], base_threshold
+        )
+        wanted = {_normalize(r): round(float(t), 4) for r, t in zip(jd_requirements, thresholds)}
+
+        for row in previous.get("match_details", []):
+            key = _normalize(row["requirement"])
+            if key in wanted and row.get("threshold") == wanted[key]:
+                reusable[key] = row
+
+    todo = [r for r in jd_requirements if _normalize(r) not in reusable]
+
+    # ---------------- SCORE ONLY NEW / CHANGED ----------------
+    fresh = {}
+    if todo:
+        _, _, _, rows = gap_agent(
+            todo,
+            resume_evidence,
+            inferred_skills=inferred_skills,
+            base_threshold=base_threshold,
+            return_details=True,
+            jd_embeddings=encode_cached([_normalize(r) for r in todo]),
+            resume_embeddings=encode_cached(pool) if pool else None
+        )
+        fresh = {_normalize(row["requirement"]): row for row in rows}
+
+    details = [
+        {**(fresh.get(_normalize(r)) or reusable[_normalize(r)]), "requirement": r}
+        for r in jd_requirements
+    ]
+
+    matched = [d["requirement"] for d in details if d["matched"]]
+    missing = [d["requirement"] for d in details if not d["matched"]]
+    match_percentage = int(len(matched) / len(jd_requirements) * 100) if jd_requirements else 0
+
+    report = {
+        "requirements_unchanged": len(diff["unchanged"]),
+        "requirements_added": len(diff["added"]),
+        "requirements_removed": len(diff["removed"]),
+        "evidence_changed": evidence_changed,
+        "gap_rows_reused": len(jd_requirements) - len(todo),
+        "gap_rows_computed": len(todo)
+    }
+
+    return matched, missing, match_percentage, details, report
+
+
+# =========================================================
+# EVALUATION
+# =========================================================
+
+def verdicts_from_evaluation(evaluation: Dict[str, Any]) -> Dict[str, Dict[str, str]]:
+    """
+    {requirement: {"status", "reason"}} from an evaluate_constraints result.
+    Fallback verdicts (failed shards) are left out so they get re-evaluated.
+    """
+
+    verdicts = {}
+    for category in CATEGORIES:
+        for item in evaluation.get(category, []):
+            if item.get("reason") == FALLBACK_REASON:
+                continue
+            verdicts.setdefault(
+                item["requirement"],
+                {"status": category, "reason": item.get("reason", "")}
+            )
+    return verdicts
+
+
+def incremental_evaluation(
+    jd_requirements: List[str],
+    resume_text: str,
+    api_key: str,
+    previous: Optional[Dict[str, Any]] = None
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    evaluate_constraints() for the requirements the previous run did not
+    judge against this exact resume; earlier verdicts are reused for the
+    rest and removed requirements drop out.
+    Returns (evaluation, report); evaluation may carry a context_report.
+    """
+
+    previous = previous or {}
+    resume_changed = previous.get("resume_sha256") != text_sha256(resume_text)
+
+    known = {}
+    if not resume_changed:
+        known = {
+            _normalize(r): v
+            for r, v in previous.get("evaluation_verdicts", {}).items()
+        }
+
+    reused = [
+        dict(known[_normalize(r)], requirement=r)
+        for r in jd_requirements if _normalize(r) in known
+    ]
+    todo = [r for r in jd_requirements if _normalize(r) not in known]
+
+    fresh = evaluate_constraints(todo, resume_text, api_key) if todo else {}
+    context_report = fresh.pop("context_report", None)
+
+    # ---------------- APPLY DELTA ----------------
+    reused_result = {category: [] for category in CATEGORIES}
+    for verdict in reused:
+        reused_result[verdict["status"]].append(
+            {"requirement": verdict["requirement"], "reason": verdict["reason"]}
+        )
+
+    evaluation = _merge_shards(jd_requirements, [reused_result, fresh])
+    if context_report:
+        evaluation["context_report"] = context_report
+
+    report = {
+        "resume_changed": resume_changed,
+        "evaluations_reused": len(reused),
+        "evaluations_computed": len(todo)
+    }
+
+    return evaluation, report
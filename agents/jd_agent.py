@@ -1,6 +1,5 @@
-import json
 from utils.prompts import JD_PROMPT
-from utils.groq_client import groq_call
+from utils.structured_output import structured_call, JD_SCHEMA
 
 
 def jd_agent(jd_text: str, api_key: str):
@@ -10,11 +9,6 @@ def jd_agent(jd_text: str, api_key: str):
 
     prompt = JD_PROMPT + "\n\nJOB DESCRIPTION:\n" + jd_text
 
-    raw = groq_call(prompt, api_key)
+    parsed = structured_call(prompt, api_key, JD_SCHEMA, agent="JD_AGENT")
 
-    clean = raw.replace("```json", "").replace("```", "").strip()
-
-    try:
-        return json.loads(clean)
-    except Exception:
-        return {"requirements": []}
+    return parsed if parsed is not None else {"requirements": []}
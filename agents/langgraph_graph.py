@@ -1,44 +1,66 @@
 # agents/langgraph_graph.py
 
+import threading
+from typing import Dict, Any, Callable, Iterator, Optional
+
 from langgraph.graph import StateGraph
 from langgraph.constants import END
 
-from agents.langgraph_state import SkillGapState
-
 # ---------------- ROUTER ----------------
 from agents.lg_nodes.orchestrator_router import orchestrator_router
 
 # ---------------- AGENT NODES ----------------
 from agents.lg_nodes.jd_node import jd_node
 from agents.lg_nodes.resume_node import resume_node
+from agents.lg_nodes.extraction_node import parallel_extraction_node
 from agents.lg_nodes.skill_rag_node import skill_rag_node
 from agents.lg_nodes.gap_node import gap_node
 from agents.lg_nodes.evaluation_node import evaluation_node
 from agents.lg_nodes.recommendation_node import recommendation_node
 from agents.lg_nodes.chat_node import chat_node
 
+from agents.checkpointer import get_checkpointer
+from agents.langgraph_state import SkillGapState
+from utils.metrics import timed_node
+
 
-def build_skill_gap_graph():
+AGENT_NODES: Dict[str, Callable[[dict], dict]] = {
+    "JD_AGENT": jd_node,
+    "RESUME_AGENT": resume_node,
+    "PARALLEL_EXTRACTION": parallel_extraction_node,
+    "SKILL_RAG": skill_rag_node,
+    "GAP_AGENT": gap_node,
+    "EVALUATION_AGENT": evaluation_node,
+    "RECOMMENDATION_AGENT": recommendation_node,
+    "CHAT_AGENT": chat_node
+}
+
+
+def build_skill_gap_graph(
+    nodes: Optional[Dict[str, Callable[[dict], dict]]] = None,
+    checkpointer=None
+):
     """
     Builds and returns the LangGraph-based
     Skill Gap Analyzer agentic graph.
+
+    Prefer get_compiled_graph() — this compiles a fresh graph every call.
+    With a checkpointer, every step is saved under the run's thread_id.
     """
 
+    nodes = nodes or AGENT_NODES
+
+    # One channel per state key → nodes return only what they change
     graph = StateGraph(SkillGapState)
 
     # ==================================================
     # REGISTER NODES
     # ==================================================
 
-    graph.add_node("ORCHESTRATOR", orchestrator_router)
+    graph.add_node("ORCHESTRATOR", timed_node("ORCHESTRATOR", orchestrator_router))
 
-    graph.add_node("JD_AGENT", jd_node)
-    graph.add_node("RESUME_AGENT", resume_node)
-    graph.add_node("SKILL_RAG", skill_rag_node)
-    graph.add_node("GAP_AGENT", gap_node)
-    graph.add_node("EVALUATION_AGENT", evaluation_node)
-    graph.add_node("RECOMMENDATION_AGENT", recommendation_node)
-    graph.add_node("CHAT_AGENT", chat_node)
+    for name, fn in nodes.items():
+        graph.add_node(name, timed_node(name, fn))
 
     # ==================================================
     # ENTRY POINT
@@ -50,37 +72,83 @@ def build_skill_gap_graph():
     # CONDITIONAL ROUTING (THE MAGIC)
     # ==================================================
 
+    routes = {name: name for name in nodes}
+    routes["HUMAN"] = END   # pause handled in UI
+    routes["DONE"] = END
+
     graph.add_conditional_edges(
         "ORCHESTRATOR",
-        orchestrator_router,
-        {
-            "JD_AGENT": "JD_AGENT",
-            "RESUME_AGENT": "RESUME_AGENT",
-            "SKILL_RAG": "SKILL_RAG",
-            "GAP_AGENT": "GAP_AGENT",
-            "EVALUATION_AGENT": "EVALUATION_AGENT",
-            "RECOMMENDATION_AGENT": "RECOMMENDATION_AGENT",
-            "CHAT_AGENT": "CHAT_AGENT",
-            "HUMAN": END,   # pause handled in UI
-            "DONE": END
-        }
+        lambda state: state["next_action"],
+        routes
     )
 
     # ==================================================
     # LOOP BACK TO ORCHESTRATOR
     # ==================================================
 
-    graph.add_edge("JD_AGENT", "ORCHESTRATOR")
-    graph.add_edge("RESUME_AGENT", "ORCHESTRATOR")
-    graph.add_edge("SKILL_RAG", "ORCHESTRATOR")
-    graph.add_edge("GAP_AGENT", "ORCHESTRATOR")
-    graph.add_edge("EVALUATION_AGENT", "ORCHESTRATOR")
-    graph.add_edge("RECOMMENDATION_AGENT", "ORCHESTRATOR")
-    graph.add_edge("CHAT_AGENT", "ORCHESTRATOR")
+    for name in nodes:
+        graph.add_edge(name, "ORCHESTRATOR")
 
     # ==================================================
     # COMPILE GRAPH
     # ==================================================
 
-    return graph.compile()
+    return graph.compile(checkpointer=checkpointer)
+
+
+# ==================================================
+# PROCESS-WIDE COMPILED GRAPH CACHE
+# ==================================================
+
+# Plain graph for one-shot runs, checkpointed graph for resumable ones
+_compiled_graphs: Dict[bool, Any] = {}
+_graph_lock = threading.Lock()
+
+
+def _compile(nodes, checkpointed: bool):
+    return build_skill_gap_graph(
+        nodes,
+        checkpointer=get_checkpointer() if checkpointed else None
+    )
+
+
+def get_compiled_graph(checkpointed: bool = False):
+    """
+    Returns the compiled graph, compiling it once per process.
+    Compiled graphs are stateless between invocations, so the same
+    instance is safe to share across sessions and threads.
+
+    checkpointed=True returns the variant backed by the SQLite
+    checkpointer; invoke it with {"configurable": {"thread_id": ...}}.
+    """
+
+    graph = _compiled_graphs.get(checkpointed)
+    if graph is not None:
+        return graph
+
+    with _graph_lock:
+        if checkpointed not in _compiled_graphs:
+            _compiled_graphs[checkpointed] = _compile(None, checkpointed)
+        return _compiled_graphs[checkpointed]
+
+
+def rebuild_graph(nodes: Optional[Dict[str, Callable[[dict], dict]]] = None):
+    """
+    Compiles new graphs (e.g. after the node set changed) and swaps them in.
+    In-flight runs keep the instance they started with.
+    """
+
+    graphs = {checkpointed: _compile(nodes, checkpointed) for checkpointed in (False, True)}
+
+    with _graph_lock:
+        _compiled_graphs.update(graphs)
+
+    return graphs[False]
+
+
+def invoke(state: Dict[str, Any], **kwargs) -> Dict[str, Any]:
+    return get_compiled_graph().invoke(state, **kwargs)
+
 
+def stream(state: Dict[str, Any], **kwargs) -> Iterator[Dict[str, Any]]:
+    return get_compiled_graph().stream(state, **kwargs)
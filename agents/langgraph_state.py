@@ -7,11 +7,15 @@ class SkillGapState(TypedDict, total=False):
     """
     Shared state for LangGraph-based Skill Gap Analyzer.
     This is the single source of truth across all agents.
+
+    Every key is its own channel: nodes return only the keys they
+    change, and keys not declared here are dropped by the graph.
     """
 
     # ---------------- INPUT ----------------
     resume_text: str
     jd_text: str
+    api_key: str
 
     # ---------------- EXTRACTION ----------------
     jd_requirements: List[str]
@@ -23,9 +27,12 @@ class SkillGapState(TypedDict, total=False):
     partially_met: List[Dict[str, str]]
     missing: List[Dict[str, str]]
     confidence: float
+    match_details: List[Dict[str, Any]]
 
     # ---------------- EVALUATION ----------------
     final_evaluation: Dict[str, Any]
+    evaluation_context: Dict[str, Any]
+    evaluation_verdicts: Dict[str, Dict[str, str]]
 
     # ---------------- RECOMMENDATION ----------------
     recommendations: List[Dict[str, Any]]
@@ -39,8 +46,15 @@ class SkillGapState(TypedDict, total=False):
     human_response: str
 
     # ---------------- ORCHESTRATION ----------------
+    next_action: Optional[str]
     last_action: str
     planner_reason: str
+    is_done: bool
 
     orchestrator_trace: List[Dict[str, Any]]
+    run_metrics: Dict[str, Any]
+
+    # ---------------- INCREMENTAL RE-ANALYSIS ----------------
+    previous_run: Dict[str, Any]
+    reanalysis: Dict[str, Any]
     done: bool
@@ -1,5 +1,7 @@
 # agents/lg_nodes/chat_node.py
 
+from langgraph.config import get_stream_writer
+
 from agents.chat_agent import chat_agent
 
 
@@ -7,7 +9,7 @@ def chat_node(state: dict) -> dict:
     """
     LangGraph node: Recruiter-style Q&A.
     Reactive agent — runs ONLY when a user question exists.
-    Preserves full LangGraph state.
+    Returns only the keys it changes.
     """
 
     # ---------------- STATE GUARDS ----------------
@@ -26,14 +28,28 @@ def chat_node(state: dict) -> dict:
         )
 
     # ---------------- CHAT RESPONSE ----------------
-    answer = chat_agent(
+    # Chunks go to stream_mode="custom" consumers (no-op otherwise)
+    try:
+        writer = get_stream_writer()
+    except RuntimeError:
+        # Called outside a graph run
+        def writer(chunk):
+            pass
+
+    parts = []
+
+    for chunk in chat_agent(
         question=state["chat_question"],
         context=state,
-        api_key=state["api_key"]
-    )
+        api_key=state["api_key"],
+        stream=True
+    ):
+        parts.append(chunk)
+        writer(chunk)
+
+    answer = "".join(parts).strip()
 
     return {
-        **state,  # 🔥 preserve entire graph state
         "chat_answer": answer,
         "last_action": "CHAT_AGENT"
     }
@@ -1,13 +1,13 @@
 # agents/lg_nodes/evaluation_node.py
 
-from agents.evaluation_agent import evaluate_constraints
+from agents.incremental import incremental_evaluation, verdicts_from_evaluation
 
 
 def evaluation_node(state: dict) -> dict:
     """
     LangGraph node: Explain WHY requirements are met / partial / missing.
     Requires GAP_AGENT to have run.
-    Preserves full LangGraph state.
+    Returns only the keys it changes.
     """
 
     # ---------------- STATE GUARDS ----------------
@@ -24,14 +24,20 @@ def evaluation_node(state: dict) -> dict:
         raise KeyError("api_key missing from state")
 
     # ---------------- EVALUATION ----------------
-    evaluation = evaluate_constraints(
+    # Only requirements without a previous verdict for this resume go to the LLM
+    evaluation, report = incremental_evaluation(
         jd_requirements=state["jd_requirements"],
         resume_text=state["resume_text"],
-        api_key=state["api_key"]
+        api_key=state["api_key"],
+        previous=state.get("previous_run")
     )
 
+    context_report = evaluation.pop("context_report", None)
+
     return {
-        **state,  # 🔥 preserve everything
         "final_evaluation": evaluation,
+        "evaluation_verdicts": verdicts_from_evaluation(evaluation),
+        "reanalysis": {**state.get("reanalysis", {}), **report},
+        "evaluation_context": context_report or {"mode": "full"},
         "last_action": "EVALUATION_AGENT"
     }
@@ -0,0 +1,74 @@
+# agents/lg_nodes/extraction_node.py
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from agents.lg_nodes.jd_node import jd_node
+from agents.lg_nodes.resume_node import resume_node
+from agents.lg_nodes.skill_rag_node import skill_rag_node
+from utils import metrics
+
+
+# Shared across runs — branches are I/O bound (LLM calls). Each run takes
+# one slot (the JD branch stays on the caller's thread), so this bounds the
+# number of analyses extracting concurrently.
+EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", "16"))
+
+_executor = ThreadPoolExecutor(max_workers=EXTRACTION_WORKERS, thread_name_prefix="extraction")
+
+
+def _jd_branch(state: dict) -> dict:
+    return metrics.timed_node("JD_AGENT", jd_node)(state)
+
+
+def _resume_branch(state: dict) -> dict:
+    """
+    RESUME_AGENT → SKILL_RAG, so inference starts as soon as the
+    evidence is ready instead of waiting for the JD branch.
+    """
+    resume_update = metrics.timed_node("RESUME_AGENT", resume_node)(state)
+    rag_update = metrics.timed_node("SKILL_RAG", skill_rag_node)({**state, **resume_update})
+    return {**resume_update, **rag_update}
+
+
+def parallel_extraction_node(state: dict) -> dict:
+    """
+    LangGraph node: JD_AGENT and RESUME_AGENT (+ SKILL_RAG) in one super-step.
+    The branches share no data, so they run concurrently and their
+    disjoint updates are merged into the state.
+    """
+
+    if "jd_text" not in state:
+        raise KeyError("jd_text missing from state")
+
+    if "resume_text" not in state:
+        raise KeyError("resume_text missing from state")
+
+    if "api_key" not in state:
+        raise KeyError("api_key missing from state")
+
+    resume_future = metrics.submit(_executor, _resume_branch, state)
+
+    jd_error = None
+    try:
+        jd_update = _jd_branch(state)
+    except Exception as e:
+        jd_error = e
+
+    # Always wait for the resume branch so it never runs on unobserved;
+    # if both failed, the JD error wins and the resume one is chained
+    try:
+        resume_update = resume_future.result()
+    except Exception as resume_error:
+        if jd_error is not None:
+            raise jd_error from resume_error
+        raise
+
+    if jd_error is not None:
+        raise jd_error
+
+    return {
+        **jd_update,
+        **resume_update,
+        "last_action": "PARALLEL_EXTRACTION"
+    }
@@ -1,12 +1,12 @@
 # agents/lg_nodes/gap_node.py
 
-from agents.gap_agent import gap_agent
+from agents.incremental import incremental_gap
 
 
 def gap_node(state: dict) -> dict:
     """
     LangGraph node: Semantic gap analysis.
-    Preserves full graph state and fails fast if inputs are missing.
+    Returns only the keys it changes and fails fast if inputs are missing.
     """
 
     if "jd_requirements" not in state:
@@ -15,16 +15,19 @@ def gap_node(state: dict) -> dict:
     if "resume_evidence" not in state:
         raise KeyError("resume_evidence missing from state")
 
-    matched, missing, match_pct = gap_agent(
+    # Rows for unchanged requirements come from the previous run, if any
+    matched, missing, match_pct, details, report = incremental_gap(
         jd_requirements=state.get("jd_requirements", []),
         resume_evidence=state.get("resume_evidence", []),
-        inferred_skills=state.get("inferred_skills", [])
+        inferred_skills=state.get("inferred_skills", []),
+        previous=state.get("previous_run")
     )
 
     return {
-        **state,  # 🔥 preserve everything
         "matched": matched,
         "missing": missing,
         "confidence": round(match_pct / 100, 2),
+        "match_details": details,
+        "reanalysis": {**state.get("reanalysis", {}), **report},
         "last_action": "GAP_AGENT"
     }
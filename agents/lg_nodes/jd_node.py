@@ -1,12 +1,13 @@
 # agents/lg_nodes/jd_node.py
 
 from agents.jd_agent import jd_agent
+from agents.incremental import previous_extraction
 
 
 def jd_node(state: dict) -> dict:
     """
     LangGraph node: Extract job requirements from JD text.
-    Preserves full state.
+    Returns only the keys it changes.
     """
 
     if "jd_text" not in state:
@@ -15,13 +16,17 @@ def jd_node(state: dict) -> dict:
     if "api_key" not in state:
         raise KeyError("api_key missing from state")
 
-    jd_data = jd_agent(
-        state["jd_text"],
-        api_key=state["api_key"]
-    )
+    # Same JD text as the previous run → reuse its requirements
+    requirements = previous_extraction(state, "jd")
+
+    if requirements is None:
+        jd_data = jd_agent(
+            state["jd_text"],
+            api_key=state["api_key"]
+        )
+        requirements = jd_data.get("requirements", [])
 
     return {
-        **state,  # 🔥 preserve everything
-        "jd_requirements": jd_data.get("requirements", []),
+        "jd_requirements": requirements,
         "last_action": "JD_AGENT"
     }
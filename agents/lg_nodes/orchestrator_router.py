@@ -11,7 +11,7 @@ def orchestrator_router(state: dict) -> dict:
     - Decide which agent should run next
     - Decide WHEN the system is done
     - Log decision + reasoning
-    - Preserve full graph state
+    - Return only the keys it changes
     """
 
     # ---------------- SAFETY CHECK ----------------
@@ -28,7 +28,8 @@ def orchestrator_router(state: dict) -> dict:
     reason = decision.get("reason", "N/A")
 
     # ---------------- TRACE LOG ----------------
-    trace = state.get("orchestrator_trace", [])
+    # New list: the previous one belongs to an earlier checkpoint
+    trace = list(state.get("orchestrator_trace", []))
 
     trace.append({
         "step": len(trace) + 1,
@@ -47,9 +48,8 @@ def orchestrator_router(state: dict) -> dict:
     # ---------------- TERMINATION LOGIC ----------------
     is_done = chosen_action == "DONE"
 
-    # ---------------- RETURN FULL STATE ----------------
+    # ---------------- RETURN CHANGED KEYS ----------------
     return {
-        **state,                        # 🔥 preserve EVERYTHING
         "next_action": chosen_action,   # used by conditional routing
         "planner_reason": reason,
         "last_action": chosen_action,
@@ -7,7 +7,7 @@ def recommendation_node(state: dict) -> dict:
     """
     LangGraph node: Generate recruiter-focused recommendations.
     Requires GAP + EVALUATION to have completed.
-    Preserves full LangGraph state.
+    Returns only the keys it changes.
     """
 
     # ---------------- STATE GUARDS ----------------
@@ -33,7 +33,6 @@ def recommendation_node(state: dict) -> dict:
     )
 
     return {
-        **state,  # 🔥 preserve everything
         "recommendations": recs.get("recommendations", []),
         "last_action": "RECOMMENDATION_AGENT"
     }
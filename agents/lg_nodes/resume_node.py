@@ -1,12 +1,13 @@
 # agents/lg_nodes/resume_node.py
 
 from agents.resume_agent import resume_agent
+from agents.incremental import previous_extraction
 
 
 def resume_node(state: dict) -> dict:
     """
     LangGraph node: Extract resume skills & evidence.
-    Preserves full state.
+    Returns only the keys it changes.
     """
 
     if "resume_text" not in state:
@@ -15,13 +16,17 @@ def resume_node(state: dict) -> dict:
     if "api_key" not in state:
         raise KeyError("api_key missing from state")
 
-    resume_data = resume_agent(
-        state["resume_text"],
-        api_key=state["api_key"]
-    )
+    # Same resume text as the previous run → reuse its evidence
+    evidence = previous_extraction(state, "resume")
+
+    if evidence is None:
+        resume_data = resume_agent(
+            state["resume_text"],
+            api_key=state["api_key"]
+        )
+        evidence = resume_data.get("evidence", [])
 
     return {
-        **state,  # 🔥 preserve everything
-        "resume_evidence": resume_data.get("evidence", []),
+        "resume_evidence": evidence,
         "last_action": "RESUME_AGENT"
     }
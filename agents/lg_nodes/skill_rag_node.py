@@ -6,7 +6,7 @@ from rag.skill_rag import infer_parent_skills
 def skill_rag_node(state: dict) -> dict:
     """
     LangGraph node: Infer high-level skills from resume evidence.
-    Preserves full graph state.
+    Returns only the keys it changes.
     """
 
     if "resume_evidence" not in state:
@@ -17,7 +17,6 @@ def skill_rag_node(state: dict) -> dict:
     inferred = infer_parent_skills(evidence)
 
     return {
-        **state,  # 🔥 preserve everything
         "inferred_skills": inferred,
         "last_action": "SKILL_RAG"
     }
@@ -1,8 +1,26 @@
 # agents/orchestrator.py
 
 import json
-from typing import Dict, Any
-from utils.groq_client import groq_call
+import os
+from typing import Dict, Any, Optional
+from utils.structured_output import structured_call, ORCHESTRATOR_SCHEMA
+
+
+# "hybrid" → rule-based fast path, LLM only for ambiguous states
+# "llm"    → every step goes to the LLM planner
+PLANNER_MODE = os.getenv("PLANNER_MODE", "hybrid")
+
+# Same band the LLM prompt treats as borderline
+BORDERLINE_CONFIDENCE = (0.4, 0.6)
+
+RULE_REASON_PREFIX = "[rule-based] "
+
+# Set PARALLEL_EXTRACTION=0 to run JD / resume extraction one step at a time
+PARALLEL_EXTRACTION = os.getenv("PARALLEL_EXTRACTION", "1") != "0"
+
+# Planner view: trace steps and characters of free text it may include
+PLANNER_TRACE_STEPS = int(os.getenv("PLANNER_TRACE_STEPS", "5"))
+PLANNER_TEXT_CHARS = 300
 
 
 # =========================================================
@@ -28,6 +46,8 @@ AVAILABLE AGENTS / TOOLS
 CORE ANALYSIS AGENTS:
 - JD_AGENT: extract job requirements from job description
 - RESUME_AGENT: extract skills, tools, and evidence from resume
+- PARALLEL_EXTRACTION: run JD_AGENT and RESUME_AGENT (+ SKILL_RAG)
+  concurrently when neither has run yet
 - SKILL_RAG: infer high-level skills from low-level resume evidence
 - GAP_AGENT: compute semantic match and missing skills
 - EVALUATION_AGENT: explain WHY requirements are met or missing
@@ -72,34 +92,165 @@ OUTPUT FORMAT (STRICT JSON)
 --------------------------------------------------
 ALLOWED ACTIONS
 --------------------------------------------------
-["JD_AGENT", "RESUME_AGENT", "SKILL_RAG", "GAP_AGENT",
+["JD_AGENT", "RESUME_AGENT", "PARALLEL_EXTRACTION", "SKILL_RAG", "GAP_AGENT",
  "EVALUATION_AGENT", "RECOMMENDATION_AGENT",
  "CHAT_AGENT", "HUMAN", "DONE"]
 
 --------------------------------------------------
 CURRENT STATE
 --------------------------------------------------
+(Summary: numbers are item counts, null means that step has not run yet,
+recent_steps are the latest decisions.)
 """
 
 
+# =========================================================
+# PLANNER VIEW OF THE STATE
+# =========================================================
+
+def _count(state: Dict[str, Any], key: str) -> Optional[int]:
+    # None → step has not run yet, 0 → ran and found nothing
+    return len(state[key]) if key in state and state[key] is not None else None
+
+
+def _clip(text: Optional[str]) -> str:
+    text = (text or "").strip()
+    return text if len(text) <= PLANNER_TEXT_CHARS else text[:PLANNER_TEXT_CHARS] + "…"
+
+
+def planner_view(state: Dict[str, Any], trace_steps: int = PLANNER_TRACE_STEPS) -> Dict[str, Any]:
+    """
+    Bounded projection of the state for the LLM planner: presence flags,
+    counts, confidence and the last few decisions. No documents, no
+    secrets — its size does not grow with resume / JD length or steps.
+    """
+
+    evaluation = state.get("final_evaluation") or {}
+    trace = state.get("orchestrator_trace") or []
+
+    return {
+        "has_jd_text": bool((state.get("jd_text") or "").strip()),
+        "has_resume_text": bool((state.get("resume_text") or "").strip()),
+        "jd_requirements": _count(state, "jd_requirements"),
+        "resume_evidence": _count(state, "resume_evidence"),
+        "inferred_skills": _count(state, "inferred_skills"),
+        "gap_analysis_done": "matched" in state and "missing" in state,
+        "matched": _count(state, "matched"),
+        "missing": _count(state, "missing"),
+        "confidence": round(state.get("confidence") or 0.0, 2),
+        "evaluation": {
+            category: len(evaluation.get(category, []))
+            for category in ("met", "partially_met", "missing")
+        } if evaluation else None,
+        "recommendations": _count(state, "recommendations"),
+        "chat_question": _clip(state.get("chat_question")),
+        "human_response": _clip(state.get("human_response")),
+        "last_action": state.get("last_action"),
+        "total_steps": len(trace),
+        "recent_steps": [
+            {"step": t.get("step"), "action": t.get("chosen_action")}
+            for t in trace[-trace_steps:]
+        ]
+    }
+
+
+# =========================================================
+# RULE-BASED PLANNER (FAST PATH)
+# =========================================================
+
+def _rule(action: str, reason: str) -> Dict[str, Any]:
+    return {
+        "next_action": action,
+        "reason": RULE_REASON_PREFIX + reason,
+        "rejected_actions": {}
+    }
+
+
+def rule_based_decision(state: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Deterministic planner for states where the next step is obvious.
+    Returns None when the state is ambiguous and the LLM should decide.
+    """
+
+    # ---------------- INTERACTION → LLM ----------------
+    if (state.get("chat_question") or "").strip():
+        return None
+
+    # ---------------- EXTRACTION ----------------
+    if (
+        PARALLEL_EXTRACTION
+        and "jd_requirements" not in state
+        and "resume_evidence" not in state
+    ):
+        return _rule(
+            "PARALLEL_EXTRACTION",
+            "Neither JD nor resume extracted yet — independent, run both at once"
+        )
+
+    if "jd_requirements" not in state:
+        return _rule("JD_AGENT", "No job requirements extracted yet")
+
+    if "resume_evidence" not in state:
+        return _rule("RESUME_AGENT", "No resume evidence extracted yet")
+
+    # Extraction ran but found nothing → unclear input, let the LLM judge
+    if not state["jd_requirements"] or not state["resume_evidence"]:
+        return None
+
+    if "inferred_skills" not in state:
+        return _rule("SKILL_RAG", "Resume evidence present, parent skills not inferred")
+
+    # ---------------- ANALYSIS ----------------
+    if "matched" not in state or "missing" not in state:
+        return _rule("GAP_AGENT", "Requirements and evidence ready, no gap analysis yet")
+
+    if not state.get("final_evaluation"):
+        low, high = BORDERLINE_CONFIDENCE
+        # Borderline is ambiguous only until a recruiter has answered
+        if low <= state.get("confidence", 0) <= high and not state.get("human_response"):
+            return None
+
+        return _rule("EVALUATION_AGENT", "Gap analysis done, requirements not yet explained")
+
+    # ---------------- RECOMMENDATION ----------------
+    if (
+        state["final_evaluation"].get("missing")
+        and "recommendations" not in state
+    ):
+        return _rule("RECOMMENDATION_AGENT", "Missing requirements have no recommendations yet")
+
+    return _rule("DONE", "Gaps identified, evaluated and recommendations generated")
+
+
 # =========================================================
 # ORCHESTRATOR DECISION FUNCTION
 # =========================================================
 
-def decide_next_action(state: Dict[str, Any], api_key: str) -> Dict[str, Any]:
+def decide_next_action(
+    state: Dict[str, Any],
+    api_key: str,
+    mode: Optional[str] = None
+) -> Dict[str, Any]:
     """
-    LLM-driven planner.
-    Decides which agent/tool should act next
-    and explains why other agents were rejected.
+    Hybrid planner.
+    Obvious states are resolved by rule_based_decision();
+    ambiguous ones (chat question, borderline confidence, empty
+    extraction) go to the LLM, which decides which agent/tool should
+    act next and explains why other agents were rejected.
     """
 
-    prompt = ORCHESTRATOR_PROMPT + json.dumps(state, indent=2)
+    if (mode or PLANNER_MODE) == "hybrid":
+        decision = rule_based_decision(state)
+        if decision is not None:
+            return decision
+
+    prompt = ORCHESTRATOR_PROMPT + json.dumps(planner_view(state), indent=2)
 
-    raw = groq_call(prompt, api_key)
+    decision = structured_call(
+        prompt, api_key, ORCHESTRATOR_SCHEMA, agent="ORCHESTRATOR"
+    )
 
-    try:
-        decision = json.loads(raw)
-    except Exception:
+    if decision is None:
         # Fail-safe fallback
         return {
             "next_action": "HUMAN",
@@ -110,6 +261,7 @@ def decide_next_action(state: Dict[str, Any], api_key: str) -> Dict[str, Any]:
     allowed_actions = {
         "JD_AGENT",
         "RESUME_AGENT",
+        "PARALLEL_EXTRACTION",
         "SKILL_RAG",
         "GAP_AGENT",
         "EVALUATION_AGENT",
@@ -119,7 +271,7 @@ def decide_next_action(state: Dict[str, Any], api_key: str) -> Dict[str, Any]:
         "DONE"
     }
 
-    action = decision.get("next_action")
+    action = decision["next_action"].strip().upper()
 
     if action not in allowed_actions:
         return {
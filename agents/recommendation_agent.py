@@ -1,6 +1,5 @@
-import json
 from utils.prompts import RECOMMENDATION_PROMPT
-from utils.groq_client import groq_call
+from utils.structured_output import structured_call, RECOMMENDATION_SCHEMA
 
 
 def recommendation_agent(missing_skills, role, api_key):
@@ -22,11 +21,8 @@ MISSING SKILLS:
 {missing_skills}
 """
 
-    raw = groq_call(prompt, api_key)
+    parsed = structured_call(
+        prompt, api_key, RECOMMENDATION_SCHEMA, agent="RECOMMENDATION_AGENT"
+    )
 
-    clean = raw.replace("```json", "").replace("```", "").strip()
-
-    try:
-        return json.loads(clean)
-    except Exception:
-        return {"recommendations": []}
+    return parsed if parsed is not None else {"recommendations": []}
@@ -1,6 +1,5 @@
-import json
 from utils.prompts import RESUME_PROMPT
-from utils.groq_client import groq_call
+from utils.structured_output import structured_call, RESUME_SCHEMA
 
 
 def resume_agent(resume_text: str, api_key: str):
@@ -11,11 +10,6 @@ def resume_agent(resume_text: str, api_key: str):
 
     prompt = RESUME_PROMPT + "\n\nRESUME:\n" + resume_text
 
-    raw = groq_call(prompt, api_key)
+    parsed = structured_call(prompt, api_key, RESUME_SCHEMA, agent="RESUME_AGENT")
 
-    clean = raw.replace("```json", "").replace("```", "").strip()
-
-    try:
-        return json.loads(clean)
-    except Exception:
-        return {"evidence": []}
+    return parsed if parsed is not None else {"evidence": []}
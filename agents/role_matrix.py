@@ -0,0 +1,141 @@
+# agents/role_matrix.py
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List
+
+import numpy as np
+
+from agents.jd_agent import jd_agent
+from agents.resume_agent import resume_agent
+from agents.gap_agent import _normalize, dedupe_evidence, adaptive_thresholds
+from rag.skill_rag import infer_parent_skills
+from utils.embedding_service import encode
+from utils import metrics
+
+
+def match_roles(
+    resume_evidence: List[str],
+    role_requirements: Dict[str, List[str]],
+    inferred_skills: List[str] = None,
+    base_threshold: float = 0.65
+) -> Dict[str, Any]:
+    """
+    Scores ONE resume against N roles in a single vectorized pass.
+
+    Evidence and every role's requirements are encoded in one batch;
+    requirements shared between roles (e.g. "Python") are encoded and
+    scored once. Matching uses the same thresholds as gap_agent.
+
+    Returns roles ranked by coverage, each with its per-requirement rows.
+    """
+
+    roles = list(role_requirements.keys())
+
+    # ---------------- FLATTEN ROLE × REQUIREMENT ----------------
+    flat_reqs = [r for role in roles for r in role_requirements[role]]
+    role_sizes = np.array([len(role_requirements[role]) for role in roles], dtype=np.int64)
+
+    resume_lookup = dedupe_evidence(resume_evidence or [], inferred_skills)
+    resume_skills = list(resume_lookup.keys())
+
+    if flat_reqs and resume_skills:
+        normalized = [_normalize(r) for r in flat_reqs]
+        unique_reqs, inverse = np.unique(np.array(normalized, dtype=object), return_inverse=True)
+        unique_reqs = list(unique_reqs)
+
+        # ---------------- EMBEDDINGS (ONE BATCH) ----------------
+        embeddings = encode(unique_reqs + resume_skills, normalize=True)
+        req_embeddings = embeddings[:len(unique_reqs)]
+        resume_embeddings = embeddings[len(unique_reqs):]
+
+        # ---------------- MATCHING (UNIQUE REQUIREMENTS) ----------------
+        similarities = req_embeddings @ resume_embeddings.T
+        best_idx_u = np.argmax(similarities, axis=1)
+        best_sim_u = similarities[np.arange(len(unique_reqs)), best_idx_u]
+        thresholds_u = adaptive_thresholds(unique_reqs, base_threshold)
+
+        best_idx = best_idx_u[inverse]
+        best_sim = best_sim_u[inverse]
+        thresholds = thresholds_u[inverse]
+        is_match = best_sim >= thresholds
+    else:
+        best_idx = np.zeros(len(flat_reqs), dtype=np.int64)
+        best_sim = np.zeros(len(flat_reqs), dtype=np.float32)
+        thresholds = adaptive_thresholds([_normalize(r) for r in flat_reqs], base_threshold)
+        is_match = np.zeros(len(flat_reqs), dtype=bool)
+
+    # ---------------- PER-ROLE COVERAGE ----------------
+    offsets = np.zeros(len(roles) + 1, dtype=np.int64)
+    np.cumsum(role_sizes, out=offsets[1:])
+
+    matched_counts = np.diff(
+        np.concatenate([[0], np.cumsum(is_match, dtype=np.int64)])[offsets]
+    )
+    coverage = np.divide(
+        matched_counts,
+        role_sizes,
+        out=np.zeros(len(roles), dtype=np.float64),
+        where=role_sizes > 0
+    )
+
+    results = []
+    for k, role in enumerate(roles):
+        rows = [
+            {
+                "requirement": flat_reqs[i],
+                "best_evidence": (
+                    resume_lookup[resume_skills[best_idx[i]]] if resume_skills else None
+                ),
+                "score": round(float(best_sim[i]), 4),
+                "threshold": round(float(thresholds[i]), 4),
+                "matched": bool(is_match[i])
+            }
+            for i in range(offsets[k], offsets[k + 1])
+        ]
+
+        results.append({
+            "role": role,
+            "coverage": round(float(coverage[k]), 4),
+            "match_percentage": int(coverage[k] * 100),
+            "matched": [row["requirement"] for row in rows if row["matched"]],
+            "missing": [row["requirement"] for row in rows if not row["matched"]],
+            "requirements": rows
+        })
+
+    results.sort(key=lambda r: (-r["coverage"], r["role"]))
+
+    return {"roles": results}
+
+
+def match_resume_to_jds(
+    resume_text: str,
+    jd_texts: Dict[str, str],
+    api_key: str,
+    max_workers: int = 4
+) -> Dict[str, Any]:
+    """
+    Resume-vs-many-JDs entry point.
+    The resume is extracted and skill-inferred once; JDs are extracted
+    concurrently, then all roles are scored in one pass by match_roles().
+    """
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        resume_future = metrics.submit(pool, resume_agent, resume_text, api_key)
+        jd_futures = {
+            role: metrics.submit(pool, jd_agent, text, api_key)
+            for role, text in jd_texts.items()
+        }
+
+        evidence = resume_future.result().get("evidence", [])
+        role_requirements = {
+            role: future.result().get("requirements", [])
+            for role, future in jd_futures.items()
+        }
+
+    inferred = infer_parent_skills(evidence)
+
+    result = match_roles(evidence, role_requirements, inferred_skills=inferred)
+    result["resume_evidence"] = evidence
+    result["inferred_skills"] = inferred
+
+    return result
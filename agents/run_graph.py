@@ -1,28 +1,53 @@
 # agents/run_graph.py
 
-from typing import Dict, Any
-from langgraph.graph import StateGraph
-from langgraph.constants import END
+from typing import Dict, Any, Iterator, Optional
 
-from agents.lg_nodes.jd_node import jd_node
-from agents.lg_nodes.resume_node import resume_node
-from agents.lg_nodes.skill_rag_node import skill_rag_node
-from agents.lg_nodes.gap_node import gap_node
-from agents.lg_nodes.evaluation_node import evaluation_node
-from agents.lg_nodes.recommendation_node import recommendation_node
-from agents.lg_nodes.chat_node import chat_node
-from agents.lg_nodes.orchestrator_router import orchestrator_router
+from agents.langgraph_graph import invoke, get_compiled_graph
+from agents.checkpointer import delete_thread, secrets
+from agents.incremental import snapshot_run
+from utils.metrics import track_run
+
+
+def _config(thread_id: str) -> Dict[str, Any]:
+    return {"configurable": {"thread_id": thread_id}}
+
+
+def _is_finished(saved: Dict[str, Any]) -> bool:
+    # Single-node runs (chat, recommendations) leave next_action on that node
+    return bool(
+        saved.get("final_evaluation")
+        or saved.get("is_done")
+        or saved.get("next_action") in ("DONE", "HUMAN")
+    )
 
 
 def run_skill_gap_graph(
     resume_text: str,
     jd_text: str,
-    api_key: str
+    api_key: str,
+    thread_id: Optional[str] = None,
+    previous_state: Optional[Dict[str, Any]] = None
 ) -> Dict[str, Any]:
     """
     Entry point for LangGraph-powered Skill Gap Analyzer
+
+    With a thread_id every step is checkpointed, and a finished run
+    saved under that id (by any worker) is returned without re-running.
+    With previous_state (e.g. the run before a JD edit) only added or
+    changed requirements / evidence go through the LLM and embeddings.
     """
 
+    saved = load_run(thread_id) if thread_id else None
+    if saved and _is_finished(saved):
+        return {**saved, "api_key": api_key, "thread_id": thread_id}
+
+    if saved:
+        # Every key is its own channel, so invoke() would merge the new
+        # input into the old run (stale chat / analysis keys). Start the
+        # thread over, keeping the old run as the incremental baseline.
+        delete_thread(thread_id)
+        previous_state = previous_state or saved
+
     # ---------------- INITIAL GRAPH STATE ----------------
     initial_state: Dict[str, Any] = {
         "resume_text": resume_text,
@@ -35,56 +60,135 @@ def run_skill_gap_graph(
         "is_done": False
     }
 
-    # ---------------- BUILD GRAPH ----------------
-    graph = StateGraph(dict)
-
-    # Nodes
-    graph.add_node("ORCHESTRATOR", orchestrator_router)
-    graph.add_node("JD_AGENT", jd_node)
-    graph.add_node("RESUME_AGENT", resume_node)
-    graph.add_node("SKILL_RAG", skill_rag_node)
-    graph.add_node("GAP_AGENT", gap_node)
-    graph.add_node("EVALUATION_AGENT", evaluation_node)
-    graph.add_node("RECOMMENDATION_AGENT", recommendation_node)
-    graph.add_node("CHAT_AGENT", chat_node)
-
-    # Entry point
-    graph.set_entry_point("ORCHESTRATOR")
-
-    # ---------------- CONDITIONAL ROUTING ----------------
-    graph.add_conditional_edges(
-        "ORCHESTRATOR",
-        lambda state: state["next_action"],
-        {
-            "JD_AGENT": "JD_AGENT",
-            "RESUME_AGENT": "RESUME_AGENT",
-            "SKILL_RAG": "SKILL_RAG",
-            "GAP_AGENT": "GAP_AGENT",
-            "EVALUATION_AGENT": "EVALUATION_AGENT",
-            "RECOMMENDATION_AGENT": "RECOMMENDATION_AGENT",
-            "CHAT_AGENT": "CHAT_AGENT",
-
-            # 🔥 CRITICAL FIXES
-            "HUMAN": END,   # pause → return control to UI
-            "DONE": END     # terminate graph
-        }
+    previous_run = snapshot_run(previous_state)
+    if previous_run:
+        initial_state["previous_run"] = previous_run
+
+    # ---------------- RUN CACHED GRAPH ----------------
+    with track_run() as run:
+        if thread_id:
+            final_state = get_compiled_graph(checkpointed=True).invoke(
+                initial_state, _config(thread_id)
+            )
+            final_state["thread_id"] = thread_id
+        else:
+            final_state = invoke(initial_state)
+
+    final_state["run_metrics"] = run.summary()
+    return final_state
+
+
+# ==================================================
+# RESUMING SAVED RUNS
+# ==================================================
+
+def load_run(thread_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Latest saved state of a run (without the api_key), or None.
+    """
+
+    snapshot = get_compiled_graph(checkpointed=True).get_state(_config(thread_id))
+    return dict(snapshot.values) if snapshot.values else None
+
+
+def delete_run(thread_id: str):
+    delete_thread(thread_id)
+
+
+def _prepare_node(thread_id: str, action: str, **updates):
+    """
+    Points the saved run at one node, as if the orchestrator chose it.
+    """
+
+    if load_run(thread_id) is None:
+        raise KeyError(f"no saved run for thread_id {thread_id!r}")
+
+    graph = get_compiled_graph(checkpointed=True)
+    config = _config(thread_id)
+
+    # Only the changed keys; api_key is restored by secrets() on resume
+    graph.update_state(
+        config,
+        {**updates, "next_action": action},
+        as_node="ORCHESTRATOR"
     )
 
-    # Every agent returns control to orchestrator
-    for node in [
-        "JD_AGENT",
-        "RESUME_AGENT",
-        "SKILL_RAG",
-        "GAP_AGENT",
-        "EVALUATION_AGENT",
-        "RECOMMENDATION_AGENT",
-        "CHAT_AGENT"
-    ]:
-        graph.add_edge(node, "ORCHESTRATOR")
-
-    compiled_graph = graph.compile()
-
-    # ---------------- RUN GRAPH ----------------
-    final_state = compiled_graph.invoke(initial_state)
+    return graph, config
+
+
+def run_node(thread_id: str, api_key: str, action: str, **updates) -> Dict[str, Any]:
+    """
+    Runs ONLY `action` on top of the saved state, checkpoints the result
+    and returns it. Earlier steps are not recomputed.
+    """
+
+    graph, config = _prepare_node(thread_id, action, **updates)
+
+    with track_run() as run, secrets(api_key=api_key):
+        final_state = graph.invoke(None, config, interrupt_after=[action])
+
+    final_state["thread_id"] = thread_id
+    final_state["run_metrics"] = run.summary()
     return final_state
 
+
+def ask_question(thread_id: str, question: str, api_key: str) -> Dict[str, Any]:
+    return run_node(thread_id, api_key, "CHAT_AGENT", chat_question=question)
+
+
+def stream_question(thread_id: str, question: str, api_key: str) -> Iterator[str]:
+    """
+    Like ask_question(), yielding answer chunks as they arrive.
+    The full answer is checkpointed once the stream ends.
+    """
+
+    graph, config = _prepare_node(
+        thread_id, "CHAT_AGENT", chat_question=question
+    )
+
+    chunks = graph.stream(
+        None, config, stream_mode="custom", interrupt_after=["CHAT_AGENT"]
+    )
+
+    # secrets() is set per step, never held across a yield: an abandoned
+    # generator would otherwise reset it from another context
+    try:
+        while True:
+            with secrets(api_key=api_key):
+                try:
+                    chunk = next(chunks)
+                except StopIteration:
+                    return
+            yield chunk
+    finally:
+        chunks.close()
+
+
+def request_recommendations(thread_id: str, api_key: str) -> Dict[str, Any]:
+    return run_node(thread_id, api_key, "RECOMMENDATION_AGENT")
+
+
+def resume_after_human(thread_id: str, human_response: str, api_key: str) -> Dict[str, Any]:
+    """
+    Continues a run that stopped at HUMAN: the orchestrator plans again
+    from the saved state plus the recruiter's answer.
+    """
+
+    if load_run(thread_id) is None:
+        raise KeyError(f"no saved run for thread_id {thread_id!r}")
+
+    # Merged into the saved channels; a stale chat question is cleared
+    state = {
+        "human_response": human_response,
+        "chat_question": "",
+        "api_key": api_key,
+        "next_action": None,
+        "is_done": False
+    }
+
+    with track_run() as run:
+        final_state = get_compiled_graph(checkpointed=True).invoke(state, _config(thread_id))
+
+    final_state["thread_id"] = thread_id
+    final_state["run_metrics"] = run.summary()
+    return final_state
@@ -1,11 +1,22 @@
 # app.py
 
+import hashlib
+
 import streamlit as st
 import streamlit.components.v1 as components
 
-from utils.pdf_parser import extract_text_from_pdf
-from agents.run_graph import run_skill_gap_graph
-from agents.actions import execute_action
+from utils import pdf_parser, llm_cache, metrics
+from utils.embedding_service import get_model
+from rag.skill_rag import get_index
+from agents.langgraph_graph import get_compiled_graph, rebuild_graph
+from agents.run_graph import (
+    run_skill_gap_graph,
+    load_run,
+    delete_run,
+    stream_question,
+    request_recommendations,
+    resume_after_human
+)
 from utils.groq_client import groq_call
 from utils.prompts import JD_SUMMARY_PROMPT, RESUME_SUMMARY_PROMPT
 
@@ -27,9 +38,87 @@ st.markdown("---")
 
 API_KEY = st.secrets["GROQ_API_KEY"]
 
+# ------------------ SHARED RESOURCES (ONE PER PROCESS) ------------------
+# Reruns and concurrent sessions reuse the same model, index and graph
+@st.cache_resource(show_spinner="⏳ Loading models and index...")
+def load_resources():
+    # Prometheus /metrics, only when METRICS_PORT is set
+    metrics.start_metrics_server()
+
+    return {
+        "model": get_model(),
+        "skill_index": get_index(),
+        "graph": get_compiled_graph(checkpointed=True)
+    }
+
+
+# ------------------ CACHED RESULTS (BY CONTENT HASH) ------------------
+# Keys are explicit digests; underscore args are not hashed by Streamlit
+@st.cache_data(show_spinner=False, max_entries=64)
+def cached_resume_text(resume_sha: str, _resume_bytes: bytes) -> str:
+    return pdf_parser.extract_text_from_pdf(_resume_bytes)
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def make_thread_id(resume_sha: str, jd_sha: str) -> str:
+    # Same inputs → same saved run, on any worker
+    return f"{resume_sha[:16]}-{jd_sha[:16]}"
+
+
+def clear_current_run():
+    # Only this session's run: the checkpoint store is shared by every
+    # session and worker (wipe it all with `python -m agents.checkpointer --clear`)
+    state = st.session_state.get("agent_state")
+    thread_id = (state or {}).get("thread_id") or st.query_params.get("run")
+
+    cached_resume_text.clear()
+    pdf_parser.clear_cache()
+
+    if thread_id:
+        delete_run(thread_id)
+
+    st.session_state.agent_state = None
+    st.query_params.pop("run", None)
+
+
+load_resources()
+
 # ------------------ SESSION STATE ------------------
+# The run id lives in the URL, so a reload / restart / other worker
+# picks the saved run back up from the checkpoint store
 if "agent_state" not in st.session_state:
-    st.session_state.agent_state = None
+    thread_id = st.query_params.get("run")
+    saved = load_run(thread_id) if thread_id else None
+    st.session_state.agent_state = {**saved, "thread_id": thread_id} if saved else None
+
+# ------------------ CACHE CONTROLS ------------------
+with st.sidebar:
+    st.markdown("### 🗄️ Cache")
+
+    force_fresh = st.checkbox(
+        "Force fresh analysis",
+        help="Re-run the full graph even if these inputs were analyzed before"
+    )
+
+    if st.button("Clear this run", use_container_width=True):
+        clear_current_run()
+        st.toast("Cached PDF text and this saved run cleared")
+
+    if st.button("Clear LLM response cache", use_container_width=True):
+        llm_cache.clear()
+        st.toast("LLM response cache cleared")
+
+    if st.button("Reload graph", use_container_width=True):
+        rebuild_graph()
+        load_resources.clear()
+        load_resources()
+        st.toast("Graph rebuilt")
+
+    stats = llm_cache.cache_stats()
+    st.caption(f"LLM cache: {stats['hits']} hits / {stats['misses']} misses")
 
 # ------------------ INPUT SECTION ------------------
 col1, col2 = st.columns([1, 2])
@@ -88,20 +177,41 @@ if st.button("🔍 Analyze Skill Gap", use_container_width=True):
         st.error("❗ Please upload a resume and paste a job description.")
         st.stop()
 
+    resume_bytes = resume_file.getvalue()
+    resume_sha = _sha256(resume_bytes)
+    jd_sha = _sha256(jd_text.strip().encode("utf-8"))
+
+    thread_id = make_thread_id(resume_sha, jd_sha)
+
+    # The run on screen (if any) is the baseline for incremental re-analysis
+    previous_state = st.session_state.agent_state
+
+    if force_fresh:
+        delete_run(thread_id)
+        previous_state = None
+
     with st.spinner("📖 Reading resume..."):
-        resume_text = extract_text_from_pdf(resume_file)
+        resume_text = cached_resume_text(resume_sha, resume_bytes)
 
+    # A finished run saved under this id is loaded instead of re-run
     with st.spinner("🧠 Running LangGraph agentic reasoning..."):
-        st.session_state.agent_state = run_skill_gap_graph(
+        result = run_skill_gap_graph(
             resume_text=resume_text,
-            jd_text=jd_text,
-            api_key=API_KEY
+            jd_text=jd_text.strip(),
+            api_key=API_KEY,
+            thread_id=thread_id,
+            previous_state=previous_state
         )
 
+    result.pop("api_key", None)
+    st.session_state.agent_state = result
+    st.query_params["run"] = thread_id
+
 # ================= RESULTS DISPLAY =================
 if st.session_state.agent_state:
 
     result = st.session_state.agent_state
+    thread_id = result["thread_id"]
     evaluation = result.get("final_evaluation") or {}
 
     # Always define these
@@ -142,6 +252,22 @@ if st.session_state.agent_state:
     mermaid_code = build_mermaid_from_trace(trace)
     render_mermaid(mermaid_code)
 
+    # ==================================================
+    # ✋ ORCHESTRATOR ASKED FOR HUMAN INPUT
+    # ==================================================
+    if result.get("next_action") == "HUMAN":
+        st.markdown("---")
+        st.warning(f"✋ The orchestrator needs recruiter input: {result.get('planner_reason', '')}")
+
+        human_response = st.text_input("Your clarification")
+
+        if st.button("Continue analysis") and human_response:
+            with st.spinner("🧠 Resuming from the saved run..."):
+                resumed = resume_after_human(thread_id, human_response, API_KEY)
+            resumed.pop("api_key", None)
+            st.session_state.agent_state = resumed
+            st.rerun()
+
     # ==================================================
     # 🤝 HUMAN-IN-THE-LOOP POLICY
     # ==================================================
@@ -186,6 +312,14 @@ if st.session_state.agent_state:
     st.metric("Requirement Match Percentage", f"{match_percentage}%")
     st.progress(match_percentage / 100 if total else 0)
 
+    reanalysis = result.get("reanalysis")
+    if reanalysis and "evaluations_reused" in reanalysis:
+        st.caption(
+            f"♻️ Incremental re-analysis: reused {reanalysis['gap_rows_reused']} gap "
+            f"verdicts and {reanalysis['evaluations_reused']} evaluations, "
+            f"evaluated {reanalysis['evaluations_computed']} changed requirement(s)"
+        )
+
     # ---------------- REQUIREMENT EVALUATION ----------------
     st.markdown("---")
     st.subheader("📌 Requirement Evaluation (Recruiter View)")
@@ -212,6 +346,22 @@ if st.session_state.agent_state:
             st.markdown(f"- **{i['requirement']}**")
             st.caption(i["reason"])
 
+    # ---------------- RECOMMENDATIONS ----------------
+    # Runs only RECOMMENDATION_AGENT on top of the saved run
+    if missing and "recommendations" not in result:
+        st.markdown("---")
+        if st.button("📚 Generate learning recommendations"):
+            with st.spinner("Generating recommendations..."):
+                updated = request_recommendations(thread_id, API_KEY)
+            updated.pop("api_key", None)
+            st.session_state.agent_state = updated
+            st.rerun()
+
+    elif result.get("recommendations"):
+        st.markdown("---")
+        with st.expander("📚 Learning Recommendations"):
+            st.json(result["recommendations"])
+
     # ---------------- CHATBOT ----------------
     st.markdown("---")
     st.subheader("💬 Query Chatbot")
@@ -221,14 +371,13 @@ if st.session_state.agent_state:
     )
 
     if st.button("Ask AI") and user_question:
-        st.session_state.agent_state["chat_question"] = user_question
-        st.session_state.agent_state = execute_action(
-            "CHAT_AGENT",
-            st.session_state.agent_state,
-            API_KEY
-        )
+        # Runs only CHAT_AGENT on the saved run; tokens render as they arrive
+        with st.container(border=True):
+            st.write_stream(stream_question(thread_id, user_question, API_KEY))
+
+        st.session_state.agent_state = {**load_run(thread_id), "thread_id": thread_id}
 
-    if "chat_answer" in st.session_state.agent_state:
+    elif "chat_answer" in st.session_state.agent_state:
         st.info(st.session_state.agent_state["chat_answer"])
 
 # ------------------ FOOTER ------------------
@@ -0,0 +1,694 @@
+# benchmarks/run.py
+"""
+Micro-benchmarks for the local (CPU-bound) compute paths.
+
+    python -m benchmarks.run --out bench.json
+    python -m benchmarks.run --quick --only gap,pdf --out bench.json
+
+Covers gap_agent over requirement × evidence sizes, infer_parent_skills
+over synthetic ontologies, approximate (HNSW / IVF) vs exact ontology
+indexes at taxonomy scale, float16 / int8 / PQ vector storage (memory
+saved vs changed match decisions), extract_text_from_pdf on generated
+PDFs and the model / index cold start. Each case reports p50 / p95 latency,
+throughput and peak RSS; results are written as JSON together with the
+git commit and machine info so runs can be compared across commits.
+No LLM calls are made.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, Any, List, Callable
+
+import numpy as np
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SECTIONS = ("gap", "ontology", "ann", "quant", "pdf", "cold_start")
+
+# ---------------- SYNTHETIC VOCABULARY ----------------
+_WORDS = (
+    "python sql docker kubernetes aws azure gcp spark kafka airflow pandas numpy "
+    "pytorch tensorflow scikit-learn react typescript java golang rust linux git "
+    "terraform ci/cd microservices rest graphql postgres mongodb redis nlp llm "
+    "transformers computer-vision statistics forecasting etl dashboards tableau "
+    "excel agile testing security networking leadership communication mentoring"
+).split()
+
+_VERBS = ("built", "designed", "deployed", "optimized", "maintained", "led", "migrated", "automated")
+
+
+def _peak_rss_mb() -> float:
+    # Linux reports KiB, macOS bytes
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _phrases(rng: random.Random, n: int, kind: str) -> List[str]:
+    out = []
+    for _ in range(n):
+        words = rng.sample(_WORDS, 3)
+        if kind == "requirement":
+            out.append(f"{rng.randint(1, 8)}+ years of {words[0]} and {words[1]} with {words[2]}")
+        else:
+            out.append(f"{rng.choice(_VERBS)} {words[0]} services using {words[1]} and {words[2]}")
+    return out
+
+
+def _measure(
+    name: str,
+    params: Dict[str, Any],
+    fn: Callable[[], Any],
+    items: int,
+    unit: str,
+    repeat: int,
+    warmup: int = 1,
+    setup: Callable[[], Any] = None
+) -> Dict[str, Any]:
+    """
+    Times fn() `repeat` times after `warmup` untimed calls.
+    setup() (untimed) runs before every call.
+    """
+
+    for _ in range(warmup):
+        if setup:
+            setup()
+        fn()
+
+    samples = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+
+    samples = np.asarray(samples)
+    result = {
+        "bench": name,
+        "params": params,
+        "iterations": repeat,
+        "mean_ms": round(float(samples.mean()) * 1000, 3),
+        "p50_ms": round(float(np.percentile(samples, 50)) * 1000, 3),
+        "p95_ms": round(float(np.percentile(samples, 95)) * 1000, 3),
+        "throughput": round(items / float(np.median(samples)), 1),
+        "throughput_unit": unit,
+        "peak_rss_mb": _peak_rss_mb()
+    }
+
+    print(
+        f"{name:<12} {json.dumps(params):<44} "
+        f"p50 {result['p50_ms']:>10.3f} ms  p95 {result['p95_ms']:>10.3f} ms  "
+        f"{result['throughput']:>10.1f} {unit}  rss {result['peak_rss_mb']} MB",
+        flush=True
+    )
+    return result
+
+
+# =========================================================
+# GAP AGENT
+# =========================================================
+
+def bench_gap(quick: bool, repeat: int) -> List[Dict[str, Any]]:
+    from agents.gap_agent import gap_agent
+
+    rng = random.Random(18)
+    req_sizes = (5, 25) if quick else (5, 25, 100)
+    evidence_sizes = (10, 50) if quick else (10, 50, 250)
+
+    results = []
+    for n_req in req_sizes:
+        for n_ev in evidence_sizes:
+            jd_requirements = _phrases(rng, n_req, "requirement")
+            resume_evidence = _phrases(rng, n_ev, "evidence")
+
+            results.append(_measure(
+                "gap_agent",
+                {"requirements": n_req, "evidence": n_ev},
+                lambda: gap_agent(jd_requirements, resume_evidence),
+                items=n_req * n_ev,
+                unit="pairs/s",
+                repeat=repeat
+            ))
+
+    return results
+
+
+# =========================================================
+# ONTOLOGY INFERENCE
+# =========================================================
+
+def synthetic_ontology(
+    n_parents: int,
+    children_per_parent: int,
+    seed: int = 0,
+    depth: int = 1,
+    branching: int = 5
+) -> Dict[str, Any]:
+    """
+    Ontology dict shaped like skill_ontology.json.
+    About a fifth of the children are shared with another parent.
+    depth > 1 groups the parents `branching` at a time under
+    sub-domains / domains until there are `depth` levels above the skills.
+    """
+
+    rng = random.Random(seed)
+    db = {}
+    shared = []
+
+    for p in range(n_parents):
+        parent = f"{rng.choice(_WORDS).title()} Engineering {p}"
+        children = []
+        for c in range(children_per_parent):
+            if shared and rng.random() < 0.2:
+                children.append(rng.choice(shared))
+                continue
+            child = f"{' '.join(rng.sample(_WORDS, 2))} {p}.{c}"
+            children.append(child)
+            shared.append(child)
+        db[parent] = children
+
+    for level in range(1, depth):
+        labels = list(db)
+        db = {
+            f"Domain {level}.{i // branching}": {label: db[label] for label in labels[i:i + branching]}
+            for i in range(0, len(labels), branching)
+        }
+
+    return db
+
+
+def bench_ontology(quick: bool, repeat: int) -> List[Dict[str, Any]]:
+    from rag.skill_rag import SkillOntology, infer_parent_skills
+
+    rng = random.Random(18)
+    # (parents, children per parent, levels above the skills)
+    shapes = (
+        ((20, 10, 1), (100, 20, 1), (100, 20, 4)) if quick
+        else ((20, 10, 1), (100, 20, 1), (500, 20, 1), (500, 20, 4), (500, 20, 6))
+    )
+    resume_skills = [f"{w} {v}" for w, v in zip(rng.sample(_WORDS, 20), rng.sample(_WORDS, 20))]
+
+    results = []
+    for n_parents, per_parent, depth in shapes:
+        db = synthetic_ontology(n_parents, per_parent, depth=depth)
+
+        # Index build (encode + add) is measured once; no disk cache
+        start = time.perf_counter()
+        ontology = SkillOntology(db, cache_dir=None)
+        ontology.get_index()
+        build_s = time.perf_counter() - start
+
+        result = _measure(
+            "ontology",
+            {"skills": len(ontology.all_skills), "depth": depth, "resume_skills": len(resume_skills)},
+            lambda: infer_parent_skills(resume_skills, ontology=ontology),
+            items=len(resume_skills),
+            unit="skills/s",
+            repeat=repeat
+        )
+        result["index_build_ms"] = round(build_s * 1000, 3)
+        results.append(result)
+
+    return results
+
+
+# =========================================================
+# ANN VS EXACT INDEX (TAXONOMY SCALE)
+# =========================================================
+
+def synthetic_vectors(n: int, dim: int = 384, aliases: int = 5, seed: int = 0):
+    """
+    Unit vectors in groups of `aliases` near-duplicates (a skill and its
+    aliases), plus one query per 500 vectors drawn near random groups.
+    Stands in for encoded ESCO / O*NET-size taxonomies without running
+    the model over 100k+ labels.
+    """
+
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((max(1, n // aliases), dim)).astype(np.float32)
+
+    vectors = np.repeat(centers, aliases, axis=0)[:n]
+    vectors = vectors + 0.4 * rng.standard_normal(vectors.shape).astype(np.float32)
+
+    picked = centers[rng.choice(len(centers), max(20, n // 500))]
+    queries = picked + 0.4 * rng.standard_normal(picked.shape).astype(np.float32)
+
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    return vectors, queries
+
+
+_LOAD_HEAP_SCRIPT = """
+import sys, faiss, numpy as np
+
+def private_mb():
+    # Resident minus file-backed pages (Linux); mmap-ed index files do not count
+    with open("/proc/self/statm") as f:
+        fields = f.read().split()
+    return (int(fields[1]) - int(fields[2])) * 4096 / (1024 * 1024)
+
+before = private_mb()
+index = faiss.read_index(sys.argv[1], int(sys.argv[2]))
+index.search(np.zeros((1, index.d), dtype=np.float32), 1)
+print(private_mb() - before)
+"""
+
+
+def _load_heap_mb(path: str, flags: int):
+    """
+    Heap growth from loading an index file in a fresh process (Linux only).
+    """
+
+    if not sys.platform.startswith("linux"):
+        return None
+
+    proc = subprocess.run(
+        [sys.executable, "-c", _LOAD_HEAP_SCRIPT, path, str(flags)],
+        capture_output=True, text=True, check=True
+    )
+    return round(float(proc.stdout.strip().splitlines()[-1]), 1)
+
+
+def bench_ann(quick: bool, repeat: int) -> List[Dict[str, Any]]:
+    """
+    Recall vs latency of the approximate index types against the exact
+    flat index, over a sweep of search-time parameters, plus the heap
+    cost of loading each index normally vs memory-mapped.
+    """
+
+    import faiss
+    from rag.skill_rag import build_index, set_search_params, range_recall, MMAP_FLAGS, EXACT_PARAMS
+
+    threshold = 0.73
+    sizes = (20_000,) if quick else (20_000, 100_000)
+    sweeps = {
+        "flat": [{}],
+        "hnsw": [{"hnsw_ef_search": ef} for ef in ((16, 64) if quick else (16, 64, 128, 256))],
+        "ivf": [{"ivf_nprobe": p} for p in ((4, 16) if quick else (4, 16, 32, 64))]
+    }
+
+    results = []
+    for n in sizes:
+        vectors, queries = synthetic_vectors(n)
+        exact = build_index(vectors, "flat", EXACT_PARAMS)
+
+        for index_type, sweep in sweeps.items():
+            start = time.perf_counter()
+            index = exact if index_type == "flat" else build_index(vectors, index_type)
+            build_s = time.perf_counter() - start
+
+            with tempfile.TemporaryDirectory() as tmp:
+                path = os.path.join(tmp, "index.faiss")
+                faiss.write_index(index, path)
+                index_mb = os.path.getsize(path) / (1024 * 1024)
+                heap = {
+                    "read_mb": _load_heap_mb(path, 0),
+                    "mmap_mb": _load_heap_mb(path, MMAP_FLAGS)
+                }
+
+            for params in sweep:
+                set_search_params(index, params)
+
+                result = _measure(
+                    f"ann_{index_type}",
+                    {"skills": n, "queries": len(queries), **params},
+                    lambda: index.range_search(queries, threshold),
+                    items=len(queries),
+                    unit="queries/s",
+                    repeat=max(3, repeat // 4)
+                )
+                quality = range_recall(index, exact, queries, threshold)
+                result.update({
+                    "recall": quality["recall"],
+                    "exact_hits": quality["exact_hits"],
+                    "build_ms": round(build_s * 1000, 3),
+                    "index_mb": round(index_mb, 1),
+                    "load_heap_mb": heap
+                })
+                print(
+                    f"{'':<12} recall {result['recall']:.4f}  build {result['build_ms']:.0f} ms  "
+                    f"index {result['index_mb']} MB  heap on load {json.dumps(heap)}",
+                    flush=True
+                )
+                results.append(result)
+
+    return results
+
+
+# =========================================================
+# QUANTIZED VECTOR STORAGE
+# =========================================================
+
+def _changed(reference: set, other: set) -> Dict[str, Any]:
+    changed = len(reference ^ other)
+    return {
+        "decisions": len(reference),
+        "changed_decisions": changed,
+        "changed_pct": round(100 * changed / max(1, len(reference | other)), 3)
+    }
+
+
+def bench_quant(quick: bool, repeat: int) -> List[Dict[str, Any]]:
+    """
+    Memory saved vs match decisions changed, relative to float32:
+    - infer_parent_skills over an ontology index stored as
+      float32 / float16 / int8 / PQ ((query, inferred skill) pairs)
+    - gap_agent on embeddings stored as float32 / float16 / int8, as the
+      encode_cached() LRU keeps them (matched / missing per requirement)
+    """
+
+    import faiss
+    from agents.gap_agent import gap_agent, dedupe_evidence, encode_requirements
+    from rag.skill_rag import SkillOntology, STORAGE_TYPES
+    from utils.embedding_service import encode, pack_vectors, unpack_vectors, VECTOR_DTYPES
+
+    rng = random.Random(18)
+    results = []
+
+    # ---------------- ONTOLOGY INDEX ----------------
+    # PQ needs ~10k vectors to train; below that it falls back to int8
+    db = synthetic_ontology(100, 20, depth=2) if quick else synthetic_ontology(600, 20, depth=2)
+    queries = [" ".join(rng.sample(_WORDS, 2)) for _ in range(100 if quick else 300)]
+
+    vectors = SkillOntology(db).skill_vectors()
+    reference = None
+
+    for storage in STORAGE_TYPES:
+        ontology = SkillOntology(
+            db, index_type="flat", index_params={"storage": storage}, vectors=vectors
+        )
+        index_bytes = faiss.serialize_index(ontology.get_index()).nbytes
+
+        decisions = {(q, skill) for q in queries for skill in ontology.infer_parent_skills([q])}
+        if reference is None:
+            reference, reference_bytes = decisions, index_bytes
+
+        result = _measure(
+            "quant_index",
+            {"skills": len(ontology.all_skills), "storage": storage, "stored_as": ontology.index_params["storage"]},
+            lambda: ontology.infer_parent_skills(queries),
+            items=len(queries),
+            unit="skills/s",
+            repeat=repeat
+        )
+        result.update({
+            "index_mb": round(index_bytes / (1024 * 1024), 2),
+            "memory_saved_pct": round(100 * (1 - index_bytes / reference_bytes), 1),
+            **_changed(reference, decisions)
+        })
+        print(
+            f"{'':<12} index {result['index_mb']} MB  saved {result['memory_saved_pct']}%  "
+            f"changed {result['changed_decisions']}/{result['decisions']} decisions",
+            flush=True
+        )
+        results.append(result)
+
+    # ---------------- GAP AGENT ----------------
+    jd_requirements = _phrases(rng, 25 if quick else 100, "requirement")
+    resume_evidence = _phrases(rng, 100 if quick else 500, "evidence")
+
+    jd_vectors = encode_requirements(jd_requirements)
+    resume_vectors = encode(list(dedupe_evidence(resume_evidence)), normalize=True)
+    reference = None
+
+    for dtype in VECTOR_DTYPES:
+        packed = [pack_vectors(v, dtype) for v in (jd_vectors, resume_vectors)]
+        jd_q, resume_q = (unpack_vectors(codes, scales) for codes, scales in packed)
+
+        # Unit scales of plain casts are not stored
+        stored_bytes = sum(
+            codes.nbytes + (scales.nbytes if dtype == "int8" else 0)
+            for codes, scales in packed
+        )
+
+        matched, _, _ = gap_agent(
+            jd_requirements, resume_evidence,
+            jd_embeddings=jd_q, resume_embeddings=resume_q
+        )
+        decisions = set(matched)
+        if reference is None:
+            reference, reference_bytes = decisions, stored_bytes
+
+        result = _measure(
+            "quant_gap",
+            {"requirements": len(jd_requirements), "evidence": len(resume_evidence), "storage": dtype},
+            lambda: gap_agent(
+                jd_requirements, resume_evidence,
+                jd_embeddings=unpack_vectors(*packed[0]),
+                resume_embeddings=unpack_vectors(*packed[1])
+            ),
+            items=len(jd_requirements) * len(resume_evidence),
+            unit="pairs/s",
+            repeat=repeat
+        )
+
+        # A requirement changes when it moves between matched and missing
+        changed = len(reference ^ decisions)
+        result.update({
+            "vectors_kb": round(stored_bytes / 1024, 1),
+            "memory_saved_pct": round(100 * (1 - stored_bytes / reference_bytes), 1),
+            "decisions": len(jd_requirements),
+            "changed_decisions": changed,
+            "changed_pct": round(100 * changed / len(jd_requirements), 3)
+        })
+        print(
+            f"{'':<12} vectors {result['vectors_kb']} KB  saved {result['memory_saved_pct']}%  "
+            f"changed {changed}/{len(jd_requirements)} requirements",
+            flush=True
+        )
+        results.append(result)
+
+    return results
+
+
+# =========================================================
+# PDF EXTRACTION
+# =========================================================
+
+def make_pdf(pages: List[str]) -> bytes:
+    """
+    Minimal valid PDF with one Helvetica text line per page.
+    """
+
+    n = len(pages)
+    font_id = 3 + 2 * n
+    kids = " ".join(f"{3 + 2 * i} 0 R" for i in range(n))
+
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{kids}] /Count {n} >>"
+    ]
+    for i, text in enumerate(pages):
+        stream = f"BT /F1 11 Tf 72 720 Td ({text}) Tj ET"
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 {font_id} 0 R >> >> /Contents {4 + 2 * i} 0 R >>"
+        )
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+    objects.append("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, obj in enumerate(objects):
+        offsets.append(len(out))
+        out += f"{i + 1} 0 obj\n{obj}\nendobj\n".encode("latin-1")
+
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode("latin-1")
+    out += (
+        f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\n"
+        f"startxref\n{xref}\n%%EOF\n"
+    ).encode("latin-1")
+
+    return bytes(out)
+
+
+def bench_pdf(quick: bool, repeat: int) -> List[Dict[str, Any]]:
+    from utils import pdf_parser
+
+    rng = random.Random(18)
+    page_counts = (1, 8, 32) if quick else (1, 8, 32, 128)
+
+    results = []
+    for n_pages in page_counts:
+        data = make_pdf(_phrases(rng, n_pages, "evidence"))
+
+        # Cache cleared before every call → measures parsing, not lookups
+        results.append(_measure(
+            "pdf_extract",
+            {"pages": n_pages, "bytes": len(data)},
+            lambda: pdf_parser.extract_text_from_pdf(data),
+            items=n_pages,
+            unit="pages/s",
+            repeat=repeat,
+            setup=pdf_parser.clear_cache
+        ))
+
+    return results
+
+
+# =========================================================
+# COLD START (FRESH PROCESS)
+# =========================================================
+
+_COLD_START_SCRIPT = """
+import json, resource, sys, time
+start = time.perf_counter()
+from rag import skill_rag
+from utils.embedding_service import get_model, get_stats
+imported = time.perf_counter()
+get_model()
+model_loaded = time.perf_counter()
+skill_rag.get_index()
+index_ready = time.perf_counter()
+skill_rag.infer_parent_skills(["python", "docker"])
+first_query = time.perf_counter()
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "model_load_ms": (model_loaded - imported) * 1000,
+    "index_ms": (index_ready - model_loaded) * 1000,
+    "first_query_ms": (first_query - index_ready) * 1000,
+    "total_ms": (first_query - start) * 1000,
+    "model_bytes": get_stats()["model_bytes"],
+    "peak_rss_mb": peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+}))
+"""
+
+
+def _cold_start_once(cache_dir: str) -> Dict[str, Any]:
+    env = {**os.environ, "SKILL_INDEX_CACHE_DIR": cache_dir}
+    proc = subprocess.run(
+        [sys.executable, "-c", _COLD_START_SCRIPT],
+        cwd=ROOT_DIR, env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def bench_cold_start(quick: bool, repeat: int) -> List[Dict[str, Any]]:
+    """
+    Fresh interpreter per sample: first without the on-disk index cache
+    (encode + build + write), then again with it (mmap load).
+    """
+
+    runs = {"no_disk_cache": [], "disk_cache": []}
+
+    for _ in range(1 if quick else 3):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            runs["no_disk_cache"].append(_cold_start_once(cache_dir))
+            runs["disk_cache"].append(_cold_start_once(cache_dir))
+
+    results = []
+    for mode, samples in runs.items():
+        totals = np.asarray([s["total_ms"] for s in samples])
+        result = {
+            "bench": "cold_start",
+            "params": {"index_cache": mode},
+            "iterations": len(samples),
+            "mean_ms": round(float(totals.mean()), 3),
+            "p50_ms": round(float(np.percentile(totals, 50)), 3),
+            "p95_ms": round(float(np.percentile(totals, 95)), 3),
+            "throughput": round(1000 / float(np.median(totals)), 3),
+            "throughput_unit": "starts/s",
+            "peak_rss_mb": round(max(s["peak_rss_mb"] for s in samples), 1),
+            "phases_ms": {
+                phase: round(float(np.median([s[phase] for s in samples])), 3)
+                for phase in ("import_ms", "model_load_ms", "index_ms", "first_query_ms")
+            },
+            "model_bytes": samples[-1]["model_bytes"]
+        }
+        print(
+            f"{'cold_start':<12} {json.dumps(result['params']):<44} "
+            f"p50 {result['p50_ms']:>10.3f} ms  phases {json.dumps(result['phases_ms'])}  "
+            f"rss {result['peak_rss_mb']} MB",
+            flush=True
+        )
+        results.append(result)
+
+    return results
+
+
+# =========================================================
+# RUNNER
+# =========================================================
+
+BENCHES = {
+    "gap": bench_gap,
+    "ontology": bench_ontology,
+    "ann": bench_ann,
+    "quant": bench_quant,
+    "pdf": bench_pdf,
+    "cold_start": bench_cold_start
+}
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run(sections=SECTIONS, quick: bool = False, repeat: int = 20) -> Dict[str, Any]:
+    from utils.embedding_service import MODEL_NAME, get_model
+
+    # In-process benches measure steady state, not model loading
+    if any(s != "cold_start" for s in sections):
+        get_model()
+
+    results = []
+    for section in sections:
+        results.extend(BENCHES[section](quick, repeat))
+
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "embedding_model": MODEL_NAME,
+            "quick": quick,
+            "repeat": repeat
+        },
+        "results": results
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the local compute paths.")
+    parser.add_argument("--out", default="benchmark_results.json", help="JSON results file")
+    parser.add_argument("--only", default=",".join(SECTIONS), help=f"comma-separated subset of {','.join(SECTIONS)}")
+    parser.add_argument("--repeat", type=int, default=20, help="timed iterations per case")
+    parser.add_argument("--quick", action="store_true", help="smaller size grid")
+    args = parser.parse_args(argv)
+
+    sections = [s.strip() for s in args.only.split(",") if s.strip()]
+    unknown = set(sections) - set(SECTIONS)
+    if unknown:
+        parser.error(f"unknown section(s): {', '.join(sorted(unknown))}")
+
+    report = run(sections, quick=args.quick, repeat=args.repeat)
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    print(f"\nwrote {len(report['results'])} results to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# rag/resume_retrieval.py
+
+import re
+from typing import Dict, Any, List, Tuple
+
+import numpy as np
+
+from utils.embedding_service import encode
+
+CHUNK_MAX_CHARS = 600
+
+# Lines like "EXPERIENCE", "Technical Skills:", "PROJECTS" start a new section
+_HEADING = re.compile(r"^\s*(?:[A-Z][A-Z &/]{2,40}|[A-Z][A-Za-z &/]{2,40}:)\s*$")
+_WORD = re.compile(r"[a-z0-9+#.]{3,}")
+
+
+def chunk_resume(resume_text: str, max_chars: int = CHUNK_MAX_CHARS) -> List[str]:
+    """
+    Splits a resume into section-aligned chunks of at most ~max_chars.
+    """
+
+    sections = []
+    current = []
+
+    for line in resume_text.splitlines():
+        if not line.strip():
+            continue
+        if _HEADING.match(line) and current:
+            sections.append(current)
+            current = []
+        current.append(line.strip())
+
+    if current:
+        sections.append(current)
+
+    chunks = []
+    for lines in sections:
+        buf = ""
+        for line in lines:
+            if buf and len(buf) + len(line) + 1 > max_chars:
+                chunks.append(buf)
+                buf = ""
+            buf = f"{buf}\n{line}" if buf else line
+        if buf:
+            chunks.append(buf)
+
+    return chunks
+
+
+def _keywords(text: str) -> set:
+    return set(_WORD.findall(text.lower()))
+
+
+def retrieve_context(
+    jd_requirements: List[str],
+    resume_text: str,
+    top_k: int = 3
+) -> Tuple[str, Dict[str, Any]]:
+    """
+    Evidence snippets for the requirements instead of the full resume.
+
+    Chunks and requirements are embedded in one batch; the top_k chunks
+    per requirement are kept (union, original order).
+    Returns (context, report) where report compares the context with
+    the full resume: size reduction and keyword recall (requirement
+    words found in the resume that are still present in the context).
+    """
+
+    if top_k < 1:
+        raise ValueError(f"top_k must be >= 1, got {top_k}")
+
+    chunks = chunk_resume(resume_text)
+
+    if len(chunks) <= top_k:
+        selected = list(range(len(chunks)))
+    else:
+        embeddings = encode(list(jd_requirements) + chunks, normalize=True)
+        req_vectors = embeddings[:len(jd_requirements)]
+        chunk_vectors = embeddings[len(jd_requirements):]
+
+        similarities = req_vectors @ chunk_vectors.T
+        top = np.argpartition(-similarities, top_k - 1, axis=1)[:, :top_k]
+        selected = sorted(set(top.ravel().tolist()))
+
+    context = "\n...\n".join(chunks[i] for i in selected)
+
+    # ---------------- REPORT ----------------
+    resume_words = _keywords(resume_text)
+    context_words = _keywords(context)
+
+    wanted = set()
+    for r in jd_requirements:
+        wanted |= _keywords(r) & resume_words
+
+    report = {
+        "mode": "retrieval",
+        "chunks_total": len(chunks),
+        "chunks_used": len(selected),
+        "full_chars": len(resume_text),
+        "context_chars": len(context),
+        "reduction": round(1 - len(context) / len(resume_text), 4) if resume_text else 0.0,
+        # ~4 chars per token is close enough for prompt budgeting
+        "approx_tokens_saved": (len(resume_text) - len(context)) // 4,
+        "keyword_recall": (
+            round(len(wanted & context_words) / len(wanted), 4) if wanted else 1.0
+        )
+    }
+
+    return context, report
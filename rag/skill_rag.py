@@ -1,56 +1,609 @@
+import glob
+import hashlib
 import json
 import os
+import threading
+import time
 import faiss
 import numpy as np
-from sentence_transformers import SentenceTransformer
 
-# ------------------ LOAD EMBEDDING MODEL ------------------
-model = SentenceTransformer("all-MiniLM-L6-v2")
+from utils.embedding_service import encode, MODEL_NAME
 
-# ------------------ LOAD SKILL ONTOLOGY SAFELY ------------------
+# ------------------ PATHS ------------------
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 ONTOLOGY_PATH = os.path.join(BASE_DIR, "skill_ontology.json")
 
-with open(ONTOLOGY_PATH, "r", encoding="utf-8") as f:
-    SKILL_DB = json.load(f)
+# Vectors + serialized index live next to skill_ontology.json.
+# The key changes whenever the ontology content or the model changes,
+# so stale files are never loaded.
+CACHE_DIR = os.getenv("SKILL_INDEX_CACHE_DIR", BASE_DIR)
 
-# ------------------ FLATTEN SKILLS ------------------
-PARENT_SKILLS = list(SKILL_DB.keys())
-CHILD_SKILLS = [child for children in SKILL_DB.values() for child in children]
+# How many levels above a matched skill are inferred (0 → all the way up)
+ANCESTOR_MAX_DEPTH = int(os.getenv("SKILL_RAG_MAX_DEPTH", "0")) or None
 
-ALL_SKILLS = PARENT_SKILLS + CHILD_SKILLS
+# ------------------ INDEX TYPE ------------------
+# "auto" picks by ontology size: exact (flat) for small ontologies,
+# HNSW from SKILL_INDEX_HNSW_MIN skills, IVF from SKILL_INDEX_IVF_MIN
+# (HNSW graphs get slow to build and large past a million vectors).
+# "flat" / "hnsw" / "ivf" force a type.
+INDEX_TYPES = ("flat", "hnsw", "ivf")
+INDEX_TYPE = os.getenv("SKILL_INDEX_TYPE", "auto")
+HNSW_MIN_SKILLS = int(os.getenv("SKILL_INDEX_HNSW_MIN", "20000"))
+IVF_MIN_SKILLS = int(os.getenv("SKILL_INDEX_IVF_MIN", "1000000"))
 
-# ------------------ BUILD FAISS INDEX (ONCE) ------------------
-skill_vectors = model.encode(ALL_SKILLS, convert_to_numpy=True)
-index = faiss.IndexFlatL2(skill_vectors.shape[1])
-index.add(skill_vectors)
+# Build-time parameters are part of the cache key, search-time ones
+# (ef_search, nprobe) are applied on load and can change freely.
+INDEX_PARAMS = {
+    "hnsw_m": int(os.getenv("SKILL_INDEX_HNSW_M", "32")),
+    "hnsw_ef_construction": int(os.getenv("SKILL_INDEX_HNSW_EF_CONSTRUCTION", "100")),
+    "hnsw_ef_search": int(os.getenv("SKILL_INDEX_HNSW_EF_SEARCH", "64")),
+    "ivf_nlist": int(os.getenv("SKILL_INDEX_IVF_NLIST", "0")),      # 0 → 4·√n
+    "ivf_nprobe": int(os.getenv("SKILL_INDEX_IVF_NPROBE", "16")),
+    "storage": os.getenv("SKILL_INDEX_STORAGE", "float32"),
+    "pq_m": int(os.getenv("SKILL_INDEX_PQ_M", "0"))                  # 0 → dim / 8
+}
+BUILD_PARAMS = {
+    "flat": ("storage", "pq_m"),
+    "hnsw": ("hnsw_m", "hnsw_ef_construction", "storage", "pq_m"),
+    "ivf": ("ivf_nlist", "storage", "pq_m")
+}
 
-# ------------------ INFER PARENT SKILLS ------------------
-def infer_parent_skills(resume_skills, threshold=0.65):
+# ------------------ VECTOR STORAGE ------------------
+# How the index stores vectors (bytes per 384-d vector):
+# float32 1536, float16 768, int8 (scalar quantizer) 384,
+# pq (product quantizer, pq_m one-byte codes) 48 by default.
+# Scores stay cosine similarities, approximated for everything but float32;
+# benchmarks/run.py --only quant shows how many decisions change.
+STORAGE_CODES = {
+    "float32": "Flat",
+    "float16": "SQfp16",
+    "int8": "SQ8"
+}
+STORAGE_TYPES = tuple(STORAGE_CODES) + ("pq",)
+
+# PQ trains 256 centroids per sub-quantizer and FAISS wants ~39 points
+# each; smaller ontologies use int8 instead (they are small anyway).
+# HNSW indexes use int8 too: FAISS has no inner-product HNSW+PQ.
+PQ_MIN_VECTORS = 256 * 39
+
+# Exact float32 search, e.g. as the reference in recall reports
+EXACT_PARAMS = {"storage": "float32"}
+
+# IO_FLAG_MMAP_IFC maps flat / HNSW vector storage without copying it
+# to the heap (plain IO_FLAG_MMAP only does that for IVF lists), so
+# every worker shares the page cache instead of holding its own copy.
+MMAP_FLAGS = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP) | faiss.IO_FLAG_READ_ONLY
+
+
+def choose_index_type(n_skills: int, requested: str = None) -> str:
+    requested = (requested or INDEX_TYPE).lower()
+
+    if requested in INDEX_TYPES:
+        return requested
+    if requested != "auto":
+        raise ValueError(f"unknown SKILL_INDEX_TYPE {requested!r}, expected auto or one of {INDEX_TYPES}")
+
+    if n_skills >= IVF_MIN_SKILLS:
+        return "ivf"
+    if n_skills >= HNSW_MIN_SKILLS:
+        return "hnsw"
+    return "flat"
+
+
+def _ivf_nlist(n_vectors: int, params: dict) -> int:
+    # FAISS wants ~39 training points per list
+    nlist = params["ivf_nlist"] or int(4 * np.sqrt(n_vectors))
+    return max(1, min(nlist, n_vectors // 39))
+
+
+def effective_storage(n_vectors: int, storage: str, index_type: str = "flat") -> str:
+    if storage != "pq":
+        return storage
+
+    # FAISS builds HNSW+PQ with the L2 metric whatever metric is asked for
+    if index_type == "hnsw" or n_vectors < PQ_MIN_VECTORS:
+        return "int8"
+    return storage
+
+
+def _storage_code(index_type: str, n_vectors: int, dim: int, params: dict) -> str:
+    storage = effective_storage(n_vectors, params["storage"], index_type)
+
+    if storage == "pq":
+        pq_m = params["pq_m"] or dim // 8
+        if dim % pq_m:
+            raise ValueError(f"SKILL_INDEX_PQ_M={pq_m} must divide the embedding size {dim}")
+        return f"PQ{pq_m}"
+
+    if storage not in STORAGE_CODES:
+        raise ValueError(f"unknown SKILL_INDEX_STORAGE {storage!r}, expected one of {STORAGE_TYPES}")
+
+    return STORAGE_CODES[storage]
+
+
+def index_spec(index_type: str, n_vectors: int, dim: int, params: dict = None) -> str:
     """
-    Infer high-level (parent) skills from low-level resume skills
-    using semantic similarity + ontology mapping.
+    faiss.index_factory string for an index type + vector storage,
+    e.g. "HNSW32_SQ8" or "IVF512,PQ48".
+    """
+
+    params = {**INDEX_PARAMS, **(params or {})}
+    code = _storage_code(index_type, n_vectors, dim, params)
+
+    if index_type == "flat":
+        return code
+
+    if index_type == "hnsw":
+        return f"HNSW{params['hnsw_m']}" + ("" if code == "Flat" else f"_{code}")
+
+    if index_type == "ivf":
+        return f"IVF{_ivf_nlist(n_vectors, params)},{code}"
+
+    raise ValueError(f"unknown index type {index_type!r}")
+
+
+def build_index(vectors: np.ndarray, index_type: str, params: dict = None):
+    """
+    Inner-product index over unit vectors (scores are cosine similarities).
+    """
+
+    params = {**INDEX_PARAMS, **(params or {})}
+    n, dim = vectors.shape
+
+    spec = index_spec(index_type, n, dim, params)
+    index = faiss.index_factory(dim, spec, faiss.METRIC_INNER_PRODUCT)
+
+    # Scores are compared to cosine thresholds; an L2 index would make
+    # every "similarity" a distance
+    if index.metric_type != faiss.METRIC_INNER_PRODUCT:
+        raise ValueError(f"FAISS built {spec!r} without the inner-product metric")
+
+    if index_type == "hnsw":
+        index.hnsw.efConstruction = params["hnsw_ef_construction"]
+
+    # IVF centroids / quantizer tables; bounded sample so training cost
+    # does not grow with the ontology
+    if not index.is_trained:
+        sample = vectors
+        sample_size = max(_ivf_nlist(n, params) * 256, 1 << 16)
+        if n > sample_size:
+            rows = np.random.default_rng(0).choice(n, sample_size, replace=False)
+            sample = vectors[np.sort(rows)]
+        index.train(np.ascontiguousarray(sample, dtype=np.float32))
+
+    index.add(np.ascontiguousarray(vectors, dtype=np.float32))
+    set_search_params(index, params)
+    return index
+
+
+def set_search_params(index, params: dict = None):
+    params = {**INDEX_PARAMS, **(params or {})}
+
+    if isinstance(index, faiss.IndexHNSW):
+        index.hnsw.efSearch = params["hnsw_ef_search"]
+    elif isinstance(index, faiss.IndexIVF):
+        index.nprobe = params["ivf_nprobe"]
+
+
+# Quantized storages: top-k first, range_search only if k may be too few
+QUANTIZED_SEARCH_K = int(os.getenv("SKILL_INDEX_QUANTIZED_K", "64"))
+
+
+def range_hits(index, queries: np.ndarray, threshold: float, storage: str = "float32"):
+    """
+    (lims, ids) of every indexed vector scoring above threshold, per
+    query, like index.range_search.
+
+    FAISS's range_search over SQ / PQ codes has no fast path (≈15x slower
+    than top-k search on the same codes), so quantized storages run a
+    top-k search and fall back to range_search only for the queries
+    whose k-th neighbour still scores above the threshold.
+    """
+
+    if storage == "float32":
+        lims, _, ids = index.range_search(queries, threshold)
+        return lims, ids
+
+    k = min(QUANTIZED_SEARCH_K, index.ntotal)
+    scores, ids = index.search(queries, k)
+
+    keep = (scores > threshold) & (ids >= 0)
+    per_query = [ids[i][keep[i]] for i in range(len(queries))]
+
+    overflow = np.flatnonzero(keep[:, -1]) if k < index.ntotal else []
+    if len(overflow):
+        more_lims, _, more_ids = index.range_search(queries[overflow], threshold)
+        for j, i in enumerate(overflow):
+            per_query[i] = more_ids[more_lims[j]:more_lims[j + 1]]
+
+    lims = np.zeros(len(queries) + 1, dtype=np.int64)
+    np.cumsum([len(h) for h in per_query], out=lims[1:])
+
+    hits = np.concatenate(per_query) if per_query else np.zeros(0, dtype=np.int64)
+    return lims, hits.astype(np.int64)
+
+
+def range_recall(index, exact_index, queries: np.ndarray, threshold: float, storage: str = "float32") -> dict:
+    """
+    Recall of range_hits() on index against the exact index for the same
+    queries and threshold, with both latencies (ms for the whole batch).
+    """
+
+    start = time.perf_counter()
+    ann_lims, ann_ids = range_hits(index, queries, threshold, storage)
+    ann_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    exact_lims, _, exact_ids = exact_index.range_search(queries, threshold)
+    exact_ms = (time.perf_counter() - start) * 1000
+
+    found = sum(
+        len(
+            set(exact_ids[exact_lims[i]:exact_lims[i + 1]].tolist())
+            & set(ann_ids[ann_lims[i]:ann_lims[i + 1]].tolist())
+        )
+        for i in range(len(queries))
+    )
+
+    return {
+        "recall": round(found / len(exact_ids), 4) if len(exact_ids) else 1.0,
+        "exact_hits": int(len(exact_ids)),
+        "ann_hits": int(len(ann_ids)),
+        "ann_ms": round(ann_ms, 3),
+        "exact_ms": round(exact_ms, 3)
+    }
+
+
+def _walk_edges(node, parent=None):
     """
+    (parent, child) pairs of a nested ontology, depth-first.
+    """
+
+    if isinstance(node, dict):
+        for label, children in node.items():
+            if parent is not None:
+                yield parent, label
+            yield from _walk_edges(children, label)
+
+    elif isinstance(node, list):
+        for child in node:
+            if isinstance(child, dict):
+                yield from _walk_edges(child, parent)
+            else:
+                yield parent, child
+
+    elif node is not None:
+        raise ValueError(f"unexpected ontology node under {parent!r}: {node!r}")
+
 
-    if not resume_skills:
-        return []
+class SkillOntology:
+    """
+    Skill hierarchy of any depth (skill → sub-domain → domain → …)
+    with its embedding index.
+
+    A node maps to a list of children (labels, or {label: children}
+    dicts for sub-domains) or directly to a {label: children} dict, e.g.
+    {"Machine Learning": ["XGBoost", {"Deep Learning": ["CNN"]}]}.
+    A flat parent → children dict is the one-level case, and a skill may
+    sit under several parents.
+
+    The default instance is built from skill_ontology.json; other
+    instances (e.g. synthetic ontologies in benchmarks) can be built
+    from any dict and, with cache_dir=None, never touch the disk.
+    """
 
-    inferred_parents = set()
+    def __init__(
+        self,
+        skill_db,
+        cache_dir=None,
+        source_bytes=None,
+        index_type=None,
+        index_params=None,
+        vectors=None
+    ):
+        self.skill_db = skill_db
 
-    resume_vectors = model.encode(resume_skills, convert_to_numpy=True)
+        # Optional precomputed unit vectors in all_skills order (skips encoding)
+        self._vectors = vectors
 
-    for i in range(len(resume_skills)):
-        distances, indices = index.search(resume_vectors[i:i+1], k=3)
+        # ------------------ FLATTEN SKILLS ------------------
+        self.edges = list(dict.fromkeys(_walk_edges(skill_db)))
 
-        for idx, dist in zip(indices[0], distances[0]):
-            similarity = 1 / (1 + dist)
+        # Unique, stable order: top-level nodes first, then children as they appear
+        self.all_skills = list(dict.fromkeys(
+            list(skill_db.keys()) + [child for _, child in self.edges]
+        ))
 
-            if similarity >= threshold:
-                matched_skill = ALL_SKILLS[idx]
+        # Every node with children, at any level
+        with_children = {parent for parent, _ in self.edges}
+        self.parent_skills = [s for s in self.all_skills if s in with_children]
 
-                # Map child → parent
-                for parent, children in SKILL_DB.items():
-                    if matched_skill in children:
-                        inferred_parents.add(parent)
+        self.ancestor_offsets, self.ancestor_ids, self.ancestor_depths = self._build_ancestor_closure()
+
+        # ------------------ INDEX TYPE ------------------
+        self.index_type = choose_index_type(len(self.all_skills), index_type)
+        self.index_params = {**INDEX_PARAMS, **(index_params or {})}
+        self.index_params["storage"] = effective_storage(
+            len(self.all_skills), self.index_params["storage"], self.index_type
+        )
+
+        build = {k: self.index_params[k] for k in BUILD_PARAMS[self.index_type]}
+        self.index_kind = f"{self.index_type}-ip-normalized:{json.dumps(build, sort_keys=True)}"
+
+        # ------------------ ON-DISK INDEX CACHE ------------------
+        if source_bytes is None:
+            source_bytes = json.dumps(skill_db, sort_keys=True).encode("utf-8")
+
+        self.cache_key = hashlib.sha256(
+            b"\0".join([
+                source_bytes,
+                MODEL_NAME.encode("utf-8"),
+                self.index_kind.encode("utf-8")
+            ])
+        ).hexdigest()[:16]
+
+        if cache_dir:
+            # Files of one index configuration share a prefix, so pruning
+            # stale keys never touches other configurations' live caches
+            config_tag = hashlib.sha256(self.index_kind.encode("utf-8")).hexdigest()[:8]
+            self.cache_prefix = os.path.join(cache_dir, f"skill_ontology.cache.{config_tag}.")
+            self.vectors_path = f"{self.cache_prefix}{self.cache_key}.npy"
+            self.index_path = f"{self.cache_prefix}{self.cache_key}.faiss"
+        else:
+            self.cache_prefix = self.vectors_path = self.index_path = None
+
+        self._index = None
+        self._index_lock = threading.Lock()
+
+    @classmethod
+    def from_file(cls, path, cache_dir=None, **kwargs):
+        with open(path, "rb") as f:
+            raw = f.read()
+        return cls(json.loads(raw.decode("utf-8")), cache_dir=cache_dir, source_bytes=raw, **kwargs)
+
+    # ------------------ ANCESTOR CLOSURE (CSR) ------------------
+    # Ancestors of all_skills[i] at every level are all_skills[j] for
+    # j in ancestor_ids[ancestor_offsets[i]:ancestor_offsets[i + 1]],
+    # ancestor_depths holding the hop count (1 = direct parent).
+
+    def _build_ancestor_closure(self):
+        skill_pos = {skill: i for i, skill in enumerate(self.all_skills)}
+        parents = [[] for _ in self.all_skills]
+
+        for parent, child in self.edges:
+            parents[skill_pos[child]].append(skill_pos[parent])
+
+        # {ancestor id: shortest depth} per node, memoized bottom-up
+        closure = [None] * len(self.all_skills)
+
+        for start in range(len(self.all_skills)):
+            stack = [start]
+            on_path = set()
+
+            while stack:
+                node = stack[-1]
+                if closure[node] is not None:
+                    stack.pop()
+                    continue
+
+                pending = [p for p in parents[node] if closure[p] is None]
+                if pending and node not in on_path:
+                    on_path.add(node)
+                    for p in pending:
+                        if p in on_path:
+                            raise ValueError(f"ontology cycle through {self.all_skills[p]!r}")
+                        stack.append(p)
+                    continue
+
+                ancestors = {}
+                for p in parents[node]:
+                    ancestors[p] = 1
+                    for a, depth in closure[p].items():
+                        if depth + 1 < ancestors.get(a, depth + 2):
+                            ancestors[a] = depth + 1
+
+                closure[node] = ancestors
+                on_path.discard(node)
+                stack.pop()
+
+        counts = np.array([len(a) for a in closure], dtype=np.int64)
+        offsets = np.zeros(len(self.all_skills) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+
+        total = int(offsets[-1])
+        ids = np.fromiter((a for anc in closure for a in anc), dtype=np.int32, count=total)
+        depths = np.fromiter((d for anc in closure for d in anc.values()), dtype=np.int16, count=total)
+
+        return offsets, ids, depths
+
+    def ancestors_of(self, skill_ids: np.ndarray, max_depth=None) -> np.ndarray:
+        """
+        Unique ancestor ids (any level, or up to max_depth levels up) for a
+        batch of ontology hits — gathered CSR slices, no per-level walk.
+        """
+
+        skill_ids = np.unique(skill_ids)
+
+        starts = self.ancestor_offsets[skill_ids]
+        lengths = self.ancestor_offsets[skill_ids + 1] - starts
+        total = int(lengths.sum())
+
+        if total == 0:
+            return np.zeros(0, dtype=np.int32)
+
+        # Flat positions of every slice: start_k + 0..len_k-1
+        slice_begin = np.repeat(np.cumsum(lengths) - lengths, lengths)
+        positions = np.repeat(starts, lengths) + (np.arange(total) - slice_begin)
+
+        if max_depth:
+            positions = positions[self.ancestor_depths[positions] <= max_depth]
+
+        return np.unique(self.ancestor_ids[positions])
+
+    # ------------------ ON-DISK INDEX CACHE ------------------
+    def _load_cached_index(self):
+        """
+        Memory-maps the cached vectors and index if both exist for the key.
+        Returns (vectors, index) or None.
+        """
+
+        if self.index_path is None:
+            return None
+
+        if not (os.path.exists(self.vectors_path) and os.path.exists(self.index_path)):
+            return None
+
+        try:
+            vectors = np.load(self.vectors_path, mmap_mode="r")
+
+            try:
+                index = faiss.read_index(self.index_path, MMAP_FLAGS)
+            except RuntimeError:
+                # Index type without mmap support → regular read
+                index = faiss.read_index(self.index_path)
+
+        except Exception:
+            return None
+
+        n = len(self.all_skills)
+        if index.ntotal != n or vectors.shape[0] != n:
+            return None
+
+        return vectors, index
+
+    def _write_cache(self, vectors: np.ndarray, index):
+        """
+        Atomically writes vectors + index for the key and removes files
+        left behind by older keys of the same index configuration
+        (never another process's in-flight .tmp files).
+        """
+
+        if self.index_path is None:
+            return
+
+        try:
+            tmp_vectors = f"{self.vectors_path}.{os.getpid()}.tmp"
+            tmp_index = f"{self.index_path}.{os.getpid()}.tmp"
+
+            with open(tmp_vectors, "wb") as f:
+                np.save(f, vectors)
+            faiss.write_index(index, tmp_index)
+
+            os.replace(tmp_vectors, self.vectors_path)
+            os.replace(tmp_index, self.index_path)
+
+            for path in glob.glob(f"{self.cache_prefix}*"):
+                name = os.path.basename(path)
+                if self.cache_key in name or name.endswith(".tmp"):
+                    continue
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    # Pruned concurrently by another process
+                    pass
+
+        except OSError:
+            # Read-only deploys still work, they just rebuild per process
+            pass
+
+    def skill_vectors(self) -> np.ndarray:
+        if self._vectors is not None:
+            return self._vectors
+        return encode(self.all_skills, normalize=True)
+
+    # ------------------ BUILD FAISS INDEX (ONCE, ON FIRST USE) ------------------
+    def get_index(self):
+        """
+        Returns the ontology index.
+        Loaded (memory-mapped) from the on-disk cache when the key matches,
+        otherwise encoded, built and written back on first use.
+        """
+
+        if self._index is not None:
+            return self._index
+
+        with self._index_lock:
+            if self._index is None:
+                cached = self._load_cached_index()
+
+                if cached is None:
+                    # Unit vectors + inner product → scores are cosine similarities
+                    skill_vectors = self.skill_vectors()
+                    index = build_index(skill_vectors, self.index_type, self.index_params)
+                    self._write_cache(skill_vectors, index)
+
+                    # Re-open the written files so this process maps them too
+                    cached = self._load_cached_index() or (skill_vectors, index)
+
+                _, index = cached
+                set_search_params(index, self.index_params)
+                self._index = index
+
+        return self._index
+
+    def recall_report(self, queries, threshold=0.73) -> dict:
+        """
+        range_recall() of this ontology's index against an exact index
+        over the same vectors, for a list of query skills.
+        """
+
+        index = self.get_index()
+
+        cached = self._load_cached_index()
+        vectors = cached[0] if cached is not None else self.skill_vectors()
+        exact = build_index(vectors, "flat", EXACT_PARAMS)
+
+        report = range_recall(
+            index, exact, encode(queries, normalize=True), threshold, self.index_params["storage"]
+        )
+        return {
+            "index_type": self.index_type,
+            "storage": self.index_params["storage"],
+            "skills": len(self.all_skills),
+            **report
+        }
+
+    # ------------------ INFER PARENT SKILLS ------------------
+    def infer_parent_skills(self, resume_skills, threshold=0.73, max_depth=None):
+        if not resume_skills:
+            return []
+
+        index = self.get_index()
+        resume_vectors = encode(resume_skills, normalize=True)
+
+        _, hits = range_hits(index, resume_vectors, threshold, self.index_params["storage"])
+
+        if len(hits) == 0:
+            return []
+
+        ancestor_ids = self.ancestors_of(hits.astype(np.int64), max_depth)
+
+        return sorted(self.all_skills[j] for j in ancestor_ids)
+
+
+# ------------------ DEFAULT ONTOLOGY ------------------
+DEFAULT_ONTOLOGY = SkillOntology.from_file(ONTOLOGY_PATH, cache_dir=CACHE_DIR)
+
+SKILL_DB = DEFAULT_ONTOLOGY.skill_db
+PARENT_SKILLS = DEFAULT_ONTOLOGY.parent_skills
+ALL_SKILLS = DEFAULT_ONTOLOGY.all_skills
+
+
+def get_index():
+    return DEFAULT_ONTOLOGY.get_index()
+
+
+def infer_parent_skills(resume_skills, threshold=0.73, ontology=None, max_depth=ANCESTOR_MAX_DEPTH):
+    """
+    Infer high-level (parent) skills from low-level resume skills
+    using semantic similarity + ontology mapping.
+
+    One batched range search returns every ontology entry whose cosine
+    similarity to any resume skill exceeds the threshold; their
+    ancestors at every level (or up to max_depth) are returned, so the
+    gap stage can credit a requirement phrased as a sub-domain or domain.
+    The default (0.73) matches the old 1 / (1 + L2²) >= 0.65 cut-off
+    for unit-length MiniLM embeddings.
+    """
 
-    return sorted(list(inferred_parents))
+    return (ontology or DEFAULT_ONTOLOGY).infer_parent_skills(resume_skills, threshold, max_depth)
@@ -0,0 +1,21 @@
+# tests/test_embedding_service.py
+
+import sys
+
+import numpy as np
+import pytest
+
+from utils import embedding_service
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="reads /proc/self/statm")
+def test_rss_is_current_not_peak():
+    before = embedding_service._current_rss_bytes()
+    block = np.ones(64 * 1024 * 1024 // 8)   # 64 MiB, touched
+    during = embedding_service._current_rss_bytes()
+    del block
+    after = embedding_service._current_rss_bytes()
+
+    assert during - before >= 48 * 1024 * 1024
+    # Peak RSS could never go down; current RSS does once the block is freed
+    assert after < during
@@ -0,0 +1,145 @@
+# tests/test_evaluation_agent.py
+
+import threading
+
+import pytest
+
+from agents import evaluation_agent
+from utils import structured_output
+from utils.structured_output import EVALUATION_SCHEMA, parse_json
+
+
+def _count_calls(monkeypatch, behaviour):
+    calls = []
+    lock = threading.Lock()
+
+    def fake_structured_call(prompt, api_key, schema, agent, max_retries, use_cache, check=None):
+        with lock:
+            calls.append(max_retries)
+        # structured_call makes 1 + max_retries LLM calls before giving up
+        return behaviour(len(calls))
+
+    monkeypatch.setattr(evaluation_agent, "structured_call", fake_structured_call)
+    return calls
+
+
+def test_unparseable_shard_is_not_rerun(monkeypatch):
+    calls = _count_calls(monkeypatch, lambda n: None)
+
+    result = evaluation_agent.evaluate_constraints(
+        ["Python"], "resume", "key", context_mode="full"
+    )
+
+    assert calls == [1]
+    assert result["missing"][0]["reason"] == evaluation_agent.FALLBACK_REASON
+
+
+def test_errored_shard_is_rerun_without_targeted_retry(monkeypatch):
+    def behaviour(n):
+        if n == 1:
+            raise ConnectionError("boom")
+        return {"met": [{"requirement": "Python", "reason": "ok"}], "partially_met": [], "missing": []}
+
+    calls = _count_calls(monkeypatch, behaviour)
+
+    result = evaluation_agent.evaluate_constraints(
+        ["Python"], "resume", "key", context_mode="full"
+    )
+
+    assert calls == [1, 0]
+    assert result["met"][0]["requirement"] == "Python"
+
+
+def test_retrieval_rejects_non_positive_top_k(monkeypatch):
+    calls = _count_calls(monkeypatch, lambda n: None)
+
+    with pytest.raises(ValueError):
+        evaluation_agent.evaluate_constraints(
+            ["Python"], "resume", "key", context_mode="retrieval", top_k=-1
+        )
+
+    with pytest.raises(ValueError):
+        evaluation_agent.evaluate_constraints(
+            ["Python"], "resume", "key", context_mode="retrieval", top_k=0
+        )
+
+    assert calls == []
+
+
+@pytest.mark.parametrize("shard_size", [0, -1])
+def test_non_positive_shard_size_is_rejected(monkeypatch, shard_size):
+    calls = _count_calls(monkeypatch, lambda n: None)
+
+    with pytest.raises(ValueError):
+        evaluation_agent.evaluate_constraints(
+            ["Python"], "resume", "key", context_mode="full", shard_size=shard_size
+        )
+
+    assert calls == []
+
+
+# A reply cut off inside the last item: repairing it must not silently
+# drop requirement "z"
+TRUNCATED = (
+    '{"met": [{"requirement": "x", "reason": "ok"}], "partially_met": [], '
+    '"missing": [{"requirement": "y", "reason": "no"}, {"requirement": "z", "rea'
+)
+COMPLETE = (
+    '{"met": [{"requirement": "x", "reason": "ok"}], "partially_met": [], '
+    '"missing": [{"requirement": "y", "reason": "no"}, {"requirement": "z", "reason": "no"}]}'
+)
+
+
+def test_parse_json_does_not_cut_truncated_output_at_an_inner_brace():
+    with pytest.raises(ValueError):
+        parse_json(TRUNCATED)
+
+    assert parse_json("Sure! " + COMPLETE + " Hope that {helps}")["missing"][1]["requirement"] == "z"
+
+
+def test_incomplete_shard_reply_is_retried_and_never_cached(monkeypatch):
+    replies = [TRUNCATED.replace(', {"requirement": "z", "rea', "]}"), COMPLETE]
+    prompts, forgotten, cached = [], [], []
+
+    def fake_groq_call(prompt, api_key, use_cache=True, json_mode=False):
+        prompts.append(prompt)
+        return replies[len(prompts) - 1]
+
+    monkeypatch.setattr(structured_output, "groq_call", fake_groq_call)
+    monkeypatch.setattr(structured_output, "forget_response", lambda p, json_mode: forgotten.append(p))
+    monkeypatch.setattr(structured_output, "cache_response", lambda p, c, json_mode: cached.append(c))
+
+    result = evaluation_agent.evaluate_constraints(
+        ["x", "y", "z"], "resume", "key", context_mode="full"
+    )
+
+    assert len(prompts) == 2
+    assert "missing from your answer: z" in prompts[1]
+    assert forgotten == [prompts[0]]
+    assert [item["requirement"] for item in result["missing"]] == ["y", "z"]
+    assert cached and '"z"' in cached[0]
+
+
+def test_shard_missing_a_requirement_after_retry_falls_back(monkeypatch):
+    partial = TRUNCATED.replace(', {"requirement": "z", "rea', "]}")
+    monkeypatch.setattr(structured_output, "groq_call", lambda *a, **k: partial)
+    monkeypatch.setattr(structured_output, "forget_response", lambda p, json_mode: None)
+
+    result = evaluation_agent.evaluate_constraints(
+        ["x", "y", "z"], "resume", "key", context_mode="full"
+    )
+
+    assert result["met"] == []
+    assert {item["reason"] for item in result["missing"]} == {evaluation_agent.FALLBACK_REASON}
+
+
+def test_rephrased_requirements_still_cover_the_shard():
+    check = evaluation_agent._coverage_check(["Python 3", "Docker"])
+    parsed = structured_output.validate(
+        {"met": [{"requirement": "python  3", "reason": "ok"},
+                 {"requirement": "Docker containers", "reason": "ok"}]},
+        EVALUATION_SCHEMA
+    )
+
+    assert check(parsed) is None
+    assert "Docker" in check({"met": parsed["met"][:1], "partially_met": [], "missing": []})
@@ -0,0 +1,72 @@
+# tests/test_extraction_node.py
+
+import threading
+
+import pytest
+
+from agents.lg_nodes import extraction_node
+
+STATE = {"jd_text": "jd", "resume_text": "resume", "api_key": "key"}
+
+
+def _branches(monkeypatch, jd, resume):
+    monkeypatch.setattr(extraction_node, "_jd_branch", jd)
+    monkeypatch.setattr(extraction_node, "_resume_branch", resume)
+
+
+def test_both_branches_merge(monkeypatch):
+    _branches(
+        monkeypatch,
+        lambda state: {"jd_requirements": ["Python"]},
+        lambda state: {"resume_evidence": ["Python"]}
+    )
+
+    assert extraction_node.parallel_extraction_node(STATE) == {
+        "jd_requirements": ["Python"],
+        "resume_evidence": ["Python"],
+        "last_action": "PARALLEL_EXTRACTION"
+    }
+
+
+def test_jd_error_wins_and_chains_resume_error(monkeypatch):
+    def jd(state):
+        raise KeyError("jd failed")
+
+    def resume(state):
+        raise RuntimeError("resume failed")
+
+    _branches(monkeypatch, jd, resume)
+
+    with pytest.raises(KeyError, match="jd failed") as info:
+        extraction_node.parallel_extraction_node(STATE)
+
+    assert isinstance(info.value.__cause__, RuntimeError)
+
+
+def test_jd_error_waits_for_resume_branch(monkeypatch):
+    finished = threading.Event()
+
+    def jd(state):
+        raise KeyError("jd failed")
+
+    def resume(state):
+        finished.wait(0.2)
+        finished.set()
+        return {}
+
+    _branches(monkeypatch, jd, resume)
+
+    with pytest.raises(KeyError):
+        extraction_node.parallel_extraction_node(STATE)
+
+    assert finished.is_set()
+
+
+def test_resume_error_propagates(monkeypatch):
+    def resume(state):
+        raise RuntimeError("resume failed")
+
+    _branches(monkeypatch, lambda state: {}, resume)
+
+    with pytest.raises(RuntimeError, match="resume failed"):
+        extraction_node.parallel_extraction_node(STATE)
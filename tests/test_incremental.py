@@ -0,0 +1,152 @@
+# tests/test_incremental.py
+
+import numpy as np
+import pytest
+
+from agents import incremental
+from agents.evaluation_agent import FALLBACK_REASON
+
+VOCAB = ["python", "sql", "docker", "kubernetes", "go", "react"]
+
+RESUME = "SKILLS\nPython, SQL, Docker"
+
+
+@pytest.fixture
+def encoded(monkeypatch):
+    # Texts sent to the embedding model, one list per call
+    calls = []
+
+    def fake_encode_cached(texts, normalize=True):
+        calls.append(list(texts))
+        vectors = np.array(
+            [[float(word in t.lower().split()) for word in VOCAB] + [1e-6] for t in texts],
+            dtype=np.float32
+        )
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    monkeypatch.setattr(incremental, "encode_cached", fake_encode_cached)
+    return calls
+
+
+@pytest.fixture
+def evaluated(monkeypatch):
+    # Requirements sent to the LLM, one list per call
+    calls = []
+
+    def fake_evaluate(requirements, resume_text, api_key):
+        calls.append(list(requirements))
+        return {
+            "met": [{"requirement": r, "reason": "fresh"} for r in requirements],
+            "partially_met": [],
+            "missing": []
+        }
+
+    monkeypatch.setattr(incremental, "evaluate_constraints", fake_evaluate)
+    return calls
+
+
+def _baseline(jd_requirements, evidence, details, verdicts, resume_text=RESUME):
+    return {
+        "jd_requirements": jd_requirements,
+        "resume_sha256": incremental.text_sha256(resume_text),
+        "resume_evidence": evidence,
+        "inferred_skills": [],
+        "match_details": details,
+        "evaluation_verdicts": verdicts
+    }
+
+
+# ---------------- GAP ----------------
+
+def test_gap_reuses_unchanged_rows_and_drops_removed(encoded):
+    evidence = ["Python", "SQL"]
+    matched, _, _, details, _ = incremental.incremental_gap(["Python", "Go", "Docker"], evidence)
+    previous = _baseline(["Python", "Go", "Docker"], evidence, details, {})
+    encoded.clear()
+
+    matched, missing, pct, details, report = incremental.incremental_gap(
+        ["python", "Go", "Kubernetes"], evidence, previous=previous
+    )
+
+    assert report["gap_rows_reused"] == 2
+    assert report["gap_rows_computed"] == 1
+    assert (report["requirements_unchanged"], report["requirements_added"], report["requirements_removed"]) == (2, 1, 1)
+    assert encoded[0] == ["kubernetes"]
+
+    # Rows follow the new requirement list and spelling; Docker is gone
+    assert [d["requirement"] for d in details] == ["python", "Go", "Kubernetes"]
+    assert matched == ["python"]
+    assert missing == ["Go", "Kubernetes"]
+    assert pct == 33
+
+
+def test_gap_recomputes_everything_when_evidence_changes(encoded):
+    _, _, _, details, _ = incremental.incremental_gap(["Python", "Docker"], ["Python"])
+    previous = _baseline(["Python", "Docker"], ["Python"], details, {})
+
+    matched, _, _, _, report = incremental.incremental_gap(
+        ["Python", "Docker"], ["Python", "Docker"], previous=previous
+    )
+
+    assert report["evidence_changed"] is True
+    assert report["gap_rows_reused"] == 0
+    assert matched == ["Python", "Docker"]
+
+
+# ---------------- EVALUATION ----------------
+
+def test_evaluation_reuses_verdicts_and_drops_removed(evaluated):
+    previous = _baseline([], [], [], {
+        "Python": {"status": "met", "reason": "projects"},
+        "Docker": {"status": "missing", "reason": "not mentioned"}
+    })
+
+    evaluation, report = incremental.incremental_evaluation(
+        ["python", "Kubernetes"], RESUME, "key", previous=previous
+    )
+
+    assert report == {"resume_changed": False, "evaluations_reused": 1, "evaluations_computed": 1}
+    assert evaluated == [["Kubernetes"]]
+    assert evaluation["met"] == [
+        {"requirement": "python", "reason": "projects"},
+        {"requirement": "Kubernetes", "reason": "fresh"}
+    ]
+    assert evaluation["missing"] == []
+
+
+def test_changed_resume_forces_reevaluation(evaluated):
+    previous = _baseline([], [], [], {"Python": {"status": "missing", "reason": "old resume"}})
+
+    evaluation, report = incremental.incremental_evaluation(
+        ["Python"], RESUME + "\nPython projects", "key", previous=previous
+    )
+
+    assert report["resume_changed"] is True
+    assert report["evaluations_reused"] == 0
+    assert evaluated == [["Python"]]
+    assert evaluation["met"][0]["reason"] == "fresh"
+
+
+def test_fallback_verdicts_are_never_reused(evaluated):
+    verdicts = incremental.verdicts_from_evaluation({
+        "met": [{"requirement": "Python", "reason": "projects"}],
+        "missing": [{"requirement": "Docker", "reason": FALLBACK_REASON}]
+    })
+    assert verdicts == {"Python": {"status": "met", "reason": "projects"}}
+
+    _, report = incremental.incremental_evaluation(
+        ["Python", "Docker"], RESUME, "key", previous=_baseline([], [], [], verdicts)
+    )
+
+    assert report["evaluations_reused"] == 1
+    assert evaluated == [["Docker"]]
+
+
+def test_nothing_to_evaluate_makes_no_llm_call(evaluated):
+    previous = _baseline([], [], [], {"Python": {"status": "met", "reason": "projects"}})
+
+    evaluation, report = incremental.incremental_evaluation(["Python"], RESUME, "key", previous=previous)
+
+    assert evaluated == []
+    assert report["evaluations_computed"] == 0
+    assert "context_report" not in evaluation
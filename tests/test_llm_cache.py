@@ -0,0 +1,87 @@
+# tests/test_llm_cache.py
+
+import sqlite3
+import threading
+
+import pytest
+
+from utils import llm_cache
+
+
+@pytest.fixture
+def cache_at(monkeypatch):
+    def point_to(path, max_bytes=1024 * 1024, access_granularity_s=0.0):
+        monkeypatch.setattr(llm_cache, "CACHE_PATH", str(path))
+        monkeypatch.setattr(llm_cache, "MAX_BYTES", max_bytes)
+        monkeypatch.setattr(llm_cache, "ACCESS_GRANULARITY_S", access_granularity_s)
+        monkeypatch.setattr(llm_cache, "_retry_at", 0.0)
+        monkeypatch.setattr(llm_cache, "ENABLED", True)
+        monkeypatch.setattr(llm_cache, "_local", threading.local())
+        monkeypatch.setattr(llm_cache, "_initialized", False)
+        monkeypatch.setattr(llm_cache, "_disabled_reason", None)
+        monkeypatch.setattr(llm_cache, "_total_bytes", None)
+    return point_to
+
+
+def test_unusable_path_disables_cache_instead_of_raising(tmp_path, cache_at):
+    blocker = tmp_path / "not-a-dir"
+    blocker.write_text("")
+    cache_at(blocker / "cache.sqlite")
+
+    assert llm_cache.get("k") is None
+    llm_cache.put("k", "response")
+    llm_cache.clear()
+
+    stats = llm_cache.cache_stats()
+    assert stats["enabled"] is False
+    assert stats["disabled_reason"]
+
+
+def test_put_evicts_least_recently_used_over_budget(tmp_path, cache_at):
+    cache_at(tmp_path / "cache.sqlite", max_bytes=25)
+
+    llm_cache.put("a", "x" * 10)
+    llm_cache.put("b", "x" * 10)
+    assert llm_cache.get("a") is not None      # "b" is now least recently used
+    llm_cache.put("c", "x" * 10)
+
+    assert llm_cache.get("b") is None
+    assert llm_cache.get("a") is not None
+    assert llm_cache.get("c") is not None
+    assert llm_cache.cache_stats()["stored_bytes"] <= 25
+
+
+def test_corrupt_store_disables_cache(tmp_path, cache_at):
+    path = tmp_path / "cache.sqlite"
+    path.write_bytes(b"not a database" * 100)
+    cache_at(path)
+
+    assert llm_cache.get("k") is None
+    assert llm_cache.cache_stats()["disabled_reason"]
+
+
+def test_locked_store_only_backs_off(tmp_path, cache_at, monkeypatch):
+    cache_at(tmp_path / "cache.sqlite")
+    llm_cache.put("k", "response")
+
+    llm_cache._failed(sqlite3.OperationalError("database is locked"))
+
+    assert llm_cache.cache_stats()["disabled_reason"] is None
+    assert llm_cache.get("k") is None          # skipped while backing off
+
+    monkeypatch.setattr(llm_cache, "_retry_at", 0.0)
+    assert llm_cache.get("k") == "response"
+
+
+def test_hits_refresh_last_access_only_past_granularity(tmp_path, cache_at):
+    cache_at(tmp_path / "cache.sqlite", access_granularity_s=3600)
+    llm_cache.put("k", "response")
+
+    def last_access():
+        return llm_cache._connection().execute(
+            "SELECT last_access FROM responses WHERE key = 'k'"
+        ).fetchone()[0]
+
+    before = last_access()
+    assert llm_cache.get("k") == "response"
+    assert last_access() == before
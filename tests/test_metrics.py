@@ -0,0 +1,43 @@
+# tests/test_metrics.py
+
+import urllib.error
+import urllib.request
+
+import pytest
+
+from utils import metrics
+
+
+def test_render_prometheus_exposes_observations():
+    metrics.observe_node("TEST_NODE", 0.02)
+    metrics.LLM_TOKENS.inc(7, kind='we"ird')
+
+    text = metrics.render_prometheus()
+
+    assert "# TYPE skill_gap_node_duration_seconds histogram" in text
+    assert 'skill_gap_node_duration_seconds_bucket{node="TEST_NODE",le="0.025"} 1' in text
+    assert 'skill_gap_node_calls_total{node="TEST_NODE",status="ok"}' in text
+    assert 'skill_gap_llm_tokens_total{kind="we\\"ird"}' in text
+    assert text.endswith("\n")
+
+
+def test_metrics_endpoint_is_scrapeable_on_loopback():
+    server = metrics.serve_metrics(0)
+    try:
+        host, port = server.server_address
+        assert host == "127.0.0.1"
+
+        with urllib.request.urlopen(f"http://{host}:{port}/metrics", timeout=5) as response:
+            assert response.headers["Content-Type"].startswith("text/plain")
+            assert "skill_gap_node_calls_total" in response.read().decode("utf-8")
+
+        with pytest.raises(urllib.error.HTTPError):
+            urllib.request.urlopen(f"http://{host}:{port}/other", timeout=5)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_metrics_server_is_off_without_a_port(monkeypatch):
+    monkeypatch.setattr(metrics, "METRICS_PORT", 0)
+    assert metrics.start_metrics_server() is None
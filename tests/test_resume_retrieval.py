@@ -0,0 +1,76 @@
+# tests/test_resume_retrieval.py
+
+import numpy as np
+import pytest
+
+from rag import resume_retrieval
+from rag.resume_retrieval import chunk_resume, retrieve_context
+
+RESUME = """Jane Doe
+SKILLS
+Python, SQL, Docker
+EXPERIENCE
+Built Kubernetes deployments for payment services
+Tuned PostgreSQL queries
+EDUCATION
+BSc Computer Science
+"""
+
+VOCAB = ["python", "docker", "kubernetes", "postgresql", "science", "jane"]
+
+
+def _fake_encode(texts, normalize=True):
+    # One dimension per vocabulary word: similarity = shared keywords
+    vectors = np.array(
+        [[float(word in t.lower()) for word in VOCAB] + [1e-3] for t in texts],
+        dtype="float32"
+    )
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+@pytest.fixture(autouse=True)
+def fake_encode(monkeypatch):
+    monkeypatch.setattr(resume_retrieval, "encode", _fake_encode)
+
+
+def test_chunks_follow_section_headings():
+    assert chunk_resume(RESUME) == [
+        "Jane Doe",
+        "SKILLS\nPython, SQL, Docker",
+        "EXPERIENCE\nBuilt Kubernetes deployments for payment services\nTuned PostgreSQL queries",
+        "EDUCATION\nBSc Computer Science"
+    ]
+
+
+def test_long_sections_are_split_at_max_chars():
+    chunks = chunk_resume("SKILLS\n" + "\n".join(f"skill number {i}" for i in range(20)), max_chars=60)
+
+    assert len(chunks) > 1
+    assert all(len(c) <= 60 for c in chunks)
+    assert chunk_resume("") == []
+
+
+def test_top_k_chunks_per_requirement_in_resume_order():
+    context, report = retrieve_context(["Kubernetes", "Python"], RESUME, top_k=1)
+
+    assert context == (
+        "SKILLS\nPython, SQL, Docker\n...\n"
+        "EXPERIENCE\nBuilt Kubernetes deployments for payment services\nTuned PostgreSQL queries"
+    )
+    assert report["chunks_total"] == 4
+    assert report["chunks_used"] == 2
+    assert report["keyword_recall"] == 1.0
+    assert 0 < report["reduction"] < 1
+
+
+def test_small_resume_is_sent_whole():
+    context, report = retrieve_context(["Python"], RESUME, top_k=10)
+
+    assert report["chunks_used"] == report["chunks_total"] == 4
+    assert "EDUCATION" in context
+
+
+@pytest.mark.parametrize("top_k", [0, -2])
+def test_non_positive_top_k_is_rejected(top_k):
+    with pytest.raises(ValueError):
+        retrieve_context(["Python"], RESUME, top_k=top_k)
@@ -0,0 +1,90 @@
+# tests/test_role_matrix.py
+
+import numpy as np
+import pytest
+
+from agents import role_matrix
+
+VOCAB = ["python", "sql", "docker", "kubernetes", "react", "go"]
+
+
+@pytest.fixture
+def encoded(monkeypatch):
+    # One dimension per vocabulary word: cosine = share of common words
+    batches = []
+
+    def fake_encode(texts, normalize=True):
+        batches.append(list(texts))
+        vectors = np.array(
+            [[float(word in t.lower().split()) for word in VOCAB] + [1e-6] for t in texts],
+            dtype=np.float32
+        )
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    monkeypatch.setattr(role_matrix, "encode", fake_encode)
+    return batches
+
+
+def test_roles_ranked_by_coverage_with_per_requirement_rows(encoded):
+    result = role_matrix.match_roles(
+        ["Python", "SQL"],
+        {
+            "Frontend": ["React", "Docker"],
+            "Data Engineer": ["Python", "SQL"],
+            "Backend": ["Python", "Go"]
+        }
+    )
+
+    assert [r["role"] for r in result["roles"]] == ["Data Engineer", "Backend", "Frontend"]
+    assert [r["coverage"] for r in result["roles"]] == [1.0, 0.5, 0.0]
+    assert [r["match_percentage"] for r in result["roles"]] == [100, 50, 0]
+
+    backend = result["roles"][1]
+    assert backend["matched"] == ["Python"]
+    assert backend["missing"] == ["Go"]
+    assert backend["requirements"][0] == {
+        "requirement": "Python",
+        "best_evidence": "Python",
+        "score": 1.0,
+        "threshold": 0.6,
+        "matched": True
+    }
+
+
+def test_ties_break_by_role_name_and_shared_requirements_encode_once(encoded):
+    result = role_matrix.match_roles(
+        ["python"],
+        {"Zeta": ["Python", "Go"], "Alpha": ["python", "Kubernetes"]}
+    )
+
+    assert [r["role"] for r in result["roles"]] == ["Alpha", "Zeta"]
+    assert result["roles"][0]["coverage"] == result["roles"][1]["coverage"] == 0.5
+
+    # "Python" / "python" normalize to one requirement, encoded with the evidence in one batch
+    assert len(encoded) == 1
+    assert sorted(encoded[0]) == ["go", "kubernetes", "python", "python"]
+
+
+def test_partial_similarity_respects_threshold(encoded):
+    # "python sql" vs "python": cosine ≈ 0.707 against thresholds 0.6 / 0.75
+    requirements = {"Analyst": ["Python SQL"]}
+
+    assert role_matrix.match_roles(["Python"], requirements)["roles"][0]["matched"] == ["Python SQL"]
+    assert role_matrix.match_roles(
+        ["Python"], requirements, base_threshold=0.8
+    )["roles"][0]["missing"] == ["Python SQL"]
+
+
+def test_inferred_skills_count_as_evidence(encoded):
+    result = role_matrix.match_roles([], {"Platform": ["Docker"]}, inferred_skills=["Docker"])
+
+    assert result["roles"][0]["coverage"] == 1.0
+
+
+def test_empty_inputs(encoded):
+    assert role_matrix.match_roles(["Python"], {}) == {"roles": []}
+
+    result = role_matrix.match_roles([], {"Empty": [], "Backend": ["Go"]})
+    assert [(r["role"], r["coverage"]) for r in result["roles"]] == [("Backend", 0.0), ("Empty", 0.0)]
+    assert result["roles"][0]["requirements"][0]["best_evidence"] is None
+    assert encoded == []
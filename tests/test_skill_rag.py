@@ -0,0 +1,160 @@
+# tests/test_skill_rag.py
+
+import hashlib
+import os
+
+import faiss
+import numpy as np
+import pytest
+
+from rag import skill_rag
+from rag.skill_rag import (
+    INDEX_TYPES,
+    ONTOLOGY_PATH,
+    STORAGE_TYPES,
+    EXACT_PARAMS,
+    PQ_MIN_VECTORS,
+    build_index,
+    SkillOntology,
+    effective_storage,
+    infer_parent_skills,
+    range_hits,
+    range_recall
+)
+
+THRESHOLD = 0.9
+
+
+@pytest.fixture(scope="module")
+def clustered():
+    # Skills with near-duplicate aliases; enough vectors to train PQ
+    rng = np.random.default_rng(0)
+    centers = rng.standard_normal((PQ_MIN_VECTORS // 20 + 1, 16)).astype(np.float32)
+    vectors = np.repeat(centers, 20, axis=0)
+    vectors += 0.05 * rng.standard_normal(vectors.shape).astype(np.float32)
+    faiss.normalize_L2(vectors)
+
+    queries = np.ascontiguousarray(vectors[rng.choice(len(vectors), 40, replace=False)])
+    return vectors, queries
+
+
+@pytest.mark.parametrize("storage", STORAGE_TYPES)
+@pytest.mark.parametrize("index_type", INDEX_TYPES)
+def test_range_hits_matches_exact_search(clustered, index_type, storage):
+    vectors, queries = clustered
+    params = {"storage": storage, "pq_m": 8, "ivf_nprobe": 64}
+
+    index = build_index(vectors, index_type, params)
+    exact = build_index(vectors, "flat", EXACT_PARAMS)
+    stored_as = effective_storage(len(vectors), storage, index_type)
+
+    assert index.metric_type == faiss.METRIC_INNER_PRODUCT
+
+    report = range_recall(index, exact, queries, THRESHOLD, stored_as)
+    assert report["recall"] >= 0.9
+    assert report["ann_hits"] <= 1.1 * report["exact_hits"]
+
+    # Every query is an indexed vector, so it must find itself
+    lims, ids = range_hits(index, queries, THRESHOLD, stored_as)
+    assert len(lims) == len(queries) + 1
+    assert all(len(ids[lims[i]:lims[i + 1]]) > 0 for i in range(len(queries)))
+
+
+def test_hnsw_never_uses_pq():
+    assert effective_storage(10 * PQ_MIN_VECTORS, "pq", "hnsw") == "int8"
+    assert effective_storage(10 * PQ_MIN_VECTORS, "pq", "ivf") == "pq"
+
+
+# ---------------- ONTOLOGY CLOSURE ----------------
+
+def _fake_encode(texts, normalize=True):
+    # Same text → same unit vector; different texts are near-orthogonal
+    vectors = np.stack([
+        np.random.default_rng(list(hashlib.sha256(t.casefold().encode("utf-8")).digest()[:8]))
+        .standard_normal(64)
+        for t in texts
+    ]).astype(np.float32)
+    faiss.normalize_L2(vectors)
+    return vectors
+
+
+@pytest.fixture
+def fake_encode(monkeypatch):
+    monkeypatch.setattr(skill_rag, "encode", _fake_encode)
+
+
+DEEP = {
+    "Machine Learning": ["XGBoost", {"Deep Learning": ["CNN", {"Transformers": ["BERT"]}]}],
+    "NLP": [{"Transformers": ["GPT"]}]
+}
+
+
+def _names(ontology, ids):
+    return sorted(ontology.all_skills[i] for i in ids)
+
+
+def test_ancestors_are_transitive_with_shortest_depth():
+    ontology = SkillOntology(DEEP)
+    bert = ontology.all_skills.index("BERT")
+
+    assert _names(ontology, ontology.ancestors_of(np.array([bert]))) == [
+        "Deep Learning", "Machine Learning", "NLP", "Transformers"
+    ]
+    assert _names(ontology, ontology.ancestors_of(np.array([bert]), max_depth=1)) == ["Transformers"]
+    assert _names(ontology, ontology.ancestors_of(np.array([bert]), max_depth=2)) == [
+        "Deep Learning", "NLP", "Transformers"
+    ]
+
+    roots = [ontology.all_skills.index(s) for s in ("Machine Learning", "NLP")]
+    assert len(ontology.ancestors_of(np.array(roots))) == 0
+
+
+def test_flat_ontology_is_the_one_level_case():
+    ontology = SkillOntology({"SQL": ["Joins"], "Data Analysis": ["Pandas", "Joins"]})
+    joins = ontology.all_skills.index("Joins")
+
+    assert _names(ontology, ontology.ancestors_of(np.array([joins, joins]))) == ["Data Analysis", "SQL"]
+
+
+@pytest.mark.parametrize("skill_db", [
+    {"A": [{"B": ["A"]}]},
+    {"A": ["B"], "B": ["C"], "C": ["A"]},
+    {"A": ["A"]}
+])
+def test_cycles_are_rejected(skill_db):
+    with pytest.raises(ValueError, match="cycle"):
+        SkillOntology(skill_db)
+
+
+def test_infer_parent_skills_on_shipped_ontology(fake_encode):
+    ontology = SkillOntology.from_file(ONTOLOGY_PATH)
+
+    assert infer_parent_skills(["CNN", "Pandas"], ontology=ontology) == ["Data Analysis", "Deep Learning"]
+    assert infer_parent_skills(["transformers"], ontology=ontology) == ["Deep Learning", "NLP"]
+    assert infer_parent_skills(["Gardening"], ontology=ontology) == []
+    assert infer_parent_skills([], ontology=ontology) == []
+
+
+def test_cache_pruning_keeps_other_configurations(tmp_path):
+    skill_db = {"SQL": ["Joins", "CTEs"], "Data Analysis": ["Pandas"]}
+    vectors = _fake_encode(["SQL", "Data Analysis", "Joins", "CTEs", "Pandas"])
+
+    def build(index_type, db=skill_db):
+        ontology = SkillOntology(db, cache_dir=str(tmp_path), index_type=index_type, vectors=vectors)
+        ontology.get_index()
+        return ontology
+
+    flat = build("flat")
+    in_flight = tmp_path / (os.path.basename(flat.index_path) + ".4242.tmp")
+    in_flight.write_bytes(b"")
+    stale = tmp_path / (os.path.basename(flat.cache_prefix) + "0123456789abcdef.npy")
+    stale.write_bytes(b"")
+
+    hnsw = build("hnsw")
+    newer_flat = build("flat", {**skill_db, "SQL": ["Joins", "Indexes"]})
+
+    remaining = set(os.listdir(tmp_path))
+    assert {os.path.basename(hnsw.index_path), os.path.basename(newer_flat.index_path)} <= remaining
+    assert os.path.basename(flat.index_path) not in remaining    # older key, same config
+    assert not stale.exists()
+    assert in_flight.exists()
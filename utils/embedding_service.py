@@ -0,0 +1,256 @@
+# utils/embedding_service.py
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+
+from utils import metrics
+
+# ---------------- CONFIG ----------------
+MODEL_NAME = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+DEFAULT_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+DEFAULT_NUM_THREADS = int(os.getenv("EMBEDDING_NUM_THREADS", "0"))  # 0 → library default
+VECTOR_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "8192"))
+
+# How encode_cached() keeps vectors: float32, float16 (½ the memory)
+# or int8 with a per-vector scale (¼). Callers always get float32 back.
+VECTOR_CACHE_DTYPE = os.getenv("EMBEDDING_CACHE_DTYPE", "float32")
+VECTOR_DTYPES = ("float32", "float16", "int8")
+
+# ---------------- SHARED STATE ----------------
+_model = None
+_lock = threading.Lock()
+
+_config = {
+    "batch_size": DEFAULT_BATCH_SIZE,
+    "num_threads": DEFAULT_NUM_THREADS
+}
+
+# Text → packed vector LRU used by encode_cached()
+_vector_cache: "OrderedDict[Tuple[bool, str], Tuple[np.ndarray, float]]" = OrderedDict()
+_vector_cache_lock = threading.Lock()
+
+_stats = {
+    "model_name": MODEL_NAME,
+    "loaded": False,
+    "load_time_s": 0.0,
+    "model_bytes": 0,
+    # Current (not peak) RSS around the load; None where /proc is unavailable
+    "rss_before_load_bytes": None,
+    "rss_after_load_bytes": None,
+    "load_rss_delta_bytes": None,
+    "encode_calls": 0,
+    "texts_encoded": 0,
+    "encode_time_s": 0.0,
+    "cache_hits": 0,
+    "cache_misses": 0
+}
+
+
+def _current_rss_bytes() -> Optional[int]:
+    """
+    Current resident set size of this process, from /proc/self/statm.
+    (ru_maxrss is the peak: equal before and after the load once the
+    process has already peaked, e.g. after PDF parsing or an index build.)
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return resident_pages * os.sysconf("SC_PAGE_SIZE")
+
+
+def _apply_num_threads(num_threads: int):
+    if num_threads <= 0:
+        return
+
+    import torch
+    torch.set_num_threads(num_threads)
+
+
+def configure(batch_size: Optional[int] = None, num_threads: Optional[int] = None):
+    """
+    Adjust encode defaults for this process.
+    Thread count is applied immediately if the model is already loaded.
+    """
+
+    if batch_size is not None:
+        if batch_size <= 0:
+            raise ValueError("batch_size must be positive")
+        _config["batch_size"] = batch_size
+
+    if num_threads is not None:
+        _config["num_threads"] = num_threads
+        if _model is not None:
+            _apply_num_threads(num_threads)
+
+
+def get_model():
+    """
+    Returns the process-wide SentenceTransformer.
+    Loaded once, on first use, and shared by every agent.
+    """
+
+    global _model
+
+    if _model is not None:
+        return _model
+
+    with _lock:
+        if _model is None:
+            from sentence_transformers import SentenceTransformer
+
+            _stats["rss_before_load_bytes"] = _current_rss_bytes()
+            start = time.perf_counter()
+
+            _apply_num_threads(_config["num_threads"])
+            model = SentenceTransformer(MODEL_NAME)
+
+            _stats["load_time_s"] = round(time.perf_counter() - start, 4)
+            _stats["rss_after_load_bytes"] = _current_rss_bytes()
+            if None not in (_stats["rss_before_load_bytes"], _stats["rss_after_load_bytes"]):
+                _stats["load_rss_delta_bytes"] = (
+                    _stats["rss_after_load_bytes"] - _stats["rss_before_load_bytes"]
+                )
+            _stats["model_bytes"] = sum(
+                p.numel() * p.element_size() for p in model.parameters()
+            )
+            _stats["loaded"] = True
+
+            _model = model
+
+    return _model
+
+
+def embedding_dim() -> int:
+    return get_model().get_sentence_embedding_dimension()
+
+
+def encode(
+    texts: List[str],
+    batch_size: Optional[int] = None,
+    normalize: bool = False
+) -> np.ndarray:
+    """
+    Batched encode through the shared model.
+    Returns a float32 matrix of shape (len(texts), dim).
+    """
+
+    if not texts:
+        return np.zeros((0, embedding_dim()), dtype=np.float32)
+
+    model = get_model()
+
+    start = time.perf_counter()
+    vectors = model.encode(
+        list(texts),
+        batch_size=batch_size or _config["batch_size"],
+        convert_to_numpy=True,
+        normalize_embeddings=normalize,
+        show_progress_bar=False
+    )
+
+    elapsed = time.perf_counter() - start
+
+    _stats["encode_calls"] += 1
+    _stats["texts_encoded"] += len(texts)
+    _stats["encode_time_s"] += elapsed
+
+    metrics.observe_embedding(len(texts), elapsed)
+
+    return np.asarray(vectors, dtype=np.float32)
+
+
+# ---------------- COMPACT VECTOR STORAGE ----------------
+
+def pack_vectors(vectors: np.ndarray, dtype: Optional[str] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (codes, scales) for a float32 matrix stored as `dtype`.
+    int8 is symmetric scalar quantization with one scale per row;
+    other dtypes are a plain cast with unit scales.
+    """
+
+    dtype = dtype or VECTOR_CACHE_DTYPE
+    if dtype not in VECTOR_DTYPES:
+        raise ValueError(f"unknown EMBEDDING_CACHE_DTYPE {dtype!r}, expected one of {VECTOR_DTYPES}")
+
+    vectors = np.asarray(vectors, dtype=np.float32)
+
+    if dtype != "int8":
+        return vectors.astype(dtype), np.ones(len(vectors), dtype=np.float32)
+
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    codes = np.rint(vectors / scales[:, None]).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+def unpack_vectors(codes: np.ndarray, scales: np.ndarray) -> np.ndarray:
+    if codes.dtype == np.int8:
+        return codes.astype(np.float32) * scales[:, None]
+    return codes.astype(np.float32)
+
+
+def encode_cached(texts: List[str], normalize: bool = True) -> np.ndarray:
+    """
+    encode() that reuses vectors of texts seen before (process-wide LRU).
+    Only unseen texts are sent to the model, in one batch.
+    Vectors are kept as VECTOR_CACHE_DTYPE; with float16 / int8 the
+    rounded vector is returned on misses too, so results do not depend
+    on what happens to be cached.
+    """
+
+    keys = [(normalize, t) for t in texts]
+    vectors: Dict[Tuple[bool, str], np.ndarray] = {}
+
+    with _vector_cache_lock:
+        for key in keys:
+            if key in _vector_cache:
+                _vector_cache.move_to_end(key)
+                code, scale = _vector_cache[key]
+                vectors[key] = unpack_vectors(code[None], np.array([scale], dtype=np.float32))[0]
+
+    misses = list(dict.fromkeys(k for k in keys if k not in vectors))
+
+    _stats["cache_hits"] += len(keys) - len(misses)
+    _stats["cache_misses"] += len(misses)
+
+    if misses:
+        codes, scales = pack_vectors(encode([t for _, t in misses], normalize=normalize))
+        fresh = unpack_vectors(codes, scales)
+
+        with _vector_cache_lock:
+            for key, vector, code, scale in zip(misses, fresh, codes, scales):
+                vectors[key] = vector
+                _vector_cache[key] = (code, float(scale))
+            while len(_vector_cache) > VECTOR_CACHE_SIZE:
+                _vector_cache.popitem(last=False)
+
+    if not keys:
+        return np.zeros((0, embedding_dim()), dtype=np.float32)
+
+    return np.stack([vectors[k] for k in keys])
+
+
+def get_stats() -> Dict[str, Any]:
+    """
+    Load-time, memory and throughput stats for the shared model.
+    """
+
+    with _vector_cache_lock:
+        cache_bytes = sum(code.nbytes for code, _ in _vector_cache.values())
+
+    return {
+        **_stats,
+        "encode_time_s": round(_stats["encode_time_s"], 4),
+        "batch_size": _config["batch_size"],
+        "num_threads": _config["num_threads"],
+        "cache_dtype": VECTOR_CACHE_DTYPE,
+        "cache_entries": len(_vector_cache),
+        "cache_vector_bytes": cache_bytes
+    }
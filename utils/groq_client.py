@@ -1,27 +1,280 @@
+import os
+import threading
+import time
+import weakref
+from typing import Dict, Any, Iterator, List, Optional
+
+import httpx
 from groq import Groq
 
-def groq_call(prompt: str, api_key: str) -> str:
-    client = Groq(api_key=api_key)
+from utils import llm_cache
+from utils import metrics
+
+MODEL = "moonshotai/kimi-k2-instruct-0905"
+
+SYSTEM_PROMPT = (
+    "You are a strict, deterministic assistant. "
+    "Follow instructions exactly. "
+    "If JSON is requested, return ONLY valid JSON. "
+    "Do not add explanations."
+)
+
+# ---------------- CONNECTION POOL CONFIG ----------------
+MAX_CONNECTIONS = int(os.getenv("GROQ_MAX_CONNECTIONS", "20"))
+MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("GROQ_MAX_KEEPALIVE_CONNECTIONS", "10"))
+KEEPALIVE_EXPIRY_S = float(os.getenv("GROQ_KEEPALIVE_EXPIRY_S", "120"))
+DEFAULT_TIMEOUT_S = float(os.getenv("GROQ_TIMEOUT_S", "60"))
+
+# ---------------- CLIENT POOL (ONE PER API KEY) ----------------
+_clients: Dict[str, Groq] = {}
+_clients_lock = threading.Lock()
+
+_stats_lock = threading.Lock()
+_stats = {
+    "pool_hits": 0,
+    "pool_misses": 0,
+    "requests": 0,
+    "new_connections": 0
+}
+
+# Network streams already seen → a response on a known stream reused its connection
+_seen_streams = weakref.WeakSet()
+
+
+def _bump(key: str, n: int = 1):
+    with _stats_lock:
+        _stats[key] += n
+
+
+def _track_connection(response: httpx.Response):
+    stream = response.extensions.get("network_stream")
+
+    with _stats_lock:
+        _stats["requests"] += 1
+
+        if stream is None:
+            return
+
+        try:
+            if stream not in _seen_streams:
+                _seen_streams.add(stream)
+                _stats["new_connections"] += 1
+        except TypeError:
+            # Stream type without weakref support → can't tell, count as new
+            _stats["new_connections"] += 1
+
+
+def _new_client(api_key: str) -> Groq:
+    http_client = httpx.Client(
+        limits=httpx.Limits(
+            max_connections=MAX_CONNECTIONS,
+            max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=KEEPALIVE_EXPIRY_S
+        ),
+        timeout=DEFAULT_TIMEOUT_S,
+        event_hooks={"response": [_track_connection]}
+    )
+
+    return Groq(api_key=api_key, http_client=http_client, timeout=DEFAULT_TIMEOUT_S)
+
+
+def get_client(api_key: str) -> Groq:
+    """
+    Returns the pooled, keep-alive client for this API key.
+    Clients are thread-safe and shared across sessions and worker threads.
+    """
+
+    client = _clients.get(api_key)
+    if client is not None:
+        _bump("pool_hits")
+        return client
+
+    with _clients_lock:
+        client = _clients.get(api_key)
+        if client is None:
+            client = _new_client(api_key)
+            _clients[api_key] = client
+            _bump("pool_misses")
+        else:
+            _bump("pool_hits")
+
+    return client
+
+
+def close_clients():
+    """
+    Closes every pooled client (and its open connections).
+    """
+
+    with _clients_lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
+
+
+def pool_stats() -> Dict[str, Any]:
+    """
+    Client pool hit/miss and HTTP connection reuse counters.
+    """
+
+    with _stats_lock:
+        stats = dict(_stats)
+
+    stats["pooled_clients"] = len(_clients)
+    stats["reused_connections"] = max(stats["requests"] - stats["new_connections"], 0)
+    stats["connection_reuse_ratio"] = (
+        round(stats["reused_connections"] / stats["requests"], 4)
+        if stats["requests"] else 0.0
+    )
+
+    return stats
+
+
+def _messages(prompt: str) -> List[Dict[str, str]]:
+    return [
+        {
+            "role": "system",
+            "content": SYSTEM_PROMPT
+        },
+        {
+            "role": "user",
+            "content": prompt
+        }
+    ]
+
+
+def _params(json_mode: bool = False) -> Dict[str, Any]:
+    params = {"temperature": 0, "max_tokens": 2048}
+    if json_mode:
+        params["response_format"] = {"type": "json_object"}
+    return params
+
+
+def cache_response(prompt: str, content: str, json_mode: bool = False):
+    """
+    Stores content as the cached answer for prompt
+    (e.g. a validated retry replacing a malformed first answer).
+    """
+    llm_cache.put(
+        llm_cache.make_key(MODEL, SYSTEM_PROMPT, prompt, _params(json_mode)),
+        content
+    )
+
+
+def forget_response(prompt: str, json_mode: bool = False):
+    """
+    Drops the cached answer for prompt (e.g. one that failed validation).
+    """
+    llm_cache.delete(llm_cache.make_key(MODEL, SYSTEM_PROMPT, prompt, _params(json_mode)))
+
+
+def groq_call(
+    prompt: str,
+    api_key: str,
+    timeout: Optional[float] = None,
+    use_cache: bool = True,
+    json_mode: bool = False
+) -> str:
+    """
+    Deterministic (temperature=0) chat completion.
+    Identical requests are served from the local response cache;
+    pass use_cache=False to force a fresh call.
+    json_mode=True asks the API for a JSON object response.
+    """
+
+    params = _params(json_mode)
+
+    cache_key = llm_cache.make_key(MODEL, SYSTEM_PROMPT, prompt, params)
+
+    start = time.perf_counter()
+
+    if use_cache:
+        cached = llm_cache.get(cache_key)
+        if cached is not None:
+            metrics.observe_llm(time.perf_counter() - start, cached=True)
+            return cached
+
+    client = get_client(api_key)
 
     response = client.chat.completions.create(
-        model="moonshotai/kimi-k2-instruct-0905",
-        messages=[
-            {
-                "role": "system",
-                "content": (
-                    "You are a strict, deterministic assistant. "
-                    "Follow instructions exactly. "
-                    "If JSON is requested, return ONLY valid JSON. "
-                    "Do not add explanations."
-                )
-            },
-            {
-                "role": "user",
-                "content": prompt
-            }
-        ],
-        temperature=0,
-        max_tokens=2048
+        model=MODEL,
+        messages=_messages(prompt),
+        timeout=timeout or DEFAULT_TIMEOUT_S,
+        **params
+    )
+
+    content = response.choices[0].message.content
+
+    usage = getattr(response, "usage", None)
+    metrics.observe_llm(
+        time.perf_counter() - start,
+        prompt_tokens=getattr(usage, "prompt_tokens", 0) or 0,
+        completion_tokens=getattr(usage, "completion_tokens", 0) or 0
+    )
+
+    if use_cache:
+        llm_cache.put(cache_key, content)
+
+    return content
+
+
+def groq_stream(
+    prompt: str,
+    api_key: str,
+    timeout: Optional[float] = None,
+    use_cache: bool = True
+) -> Iterator[str]:
+    """
+    Streaming variant of groq_call: yields text chunks as they arrive.
+    Shares the response cache — a cached answer is yielded in one chunk,
+    and a fully streamed answer is written back.
+    """
+
+    params = _params()
+
+    cache_key = llm_cache.make_key(MODEL, SYSTEM_PROMPT, prompt, params)
+
+    start = time.perf_counter()
+
+    if use_cache:
+        cached = llm_cache.get(cache_key)
+        if cached is not None:
+            metrics.observe_llm(time.perf_counter() - start, cached=True)
+            yield cached
+            return
+
+    client = get_client(api_key)
+
+    stream = client.chat.completions.create(
+        model=MODEL,
+        messages=_messages(prompt),
+        timeout=timeout or DEFAULT_TIMEOUT_S,
+        stream=True,
+        **params
+    )
+
+    parts = []
+    usage = None
+
+    for chunk in stream:
+        # Groq reports usage on the final chunk
+        x_groq = getattr(chunk, "x_groq", None)
+        if x_groq is not None and getattr(x_groq, "usage", None) is not None:
+            usage = x_groq.usage
+
+        if not chunk.choices:
+            continue
+
+        delta = chunk.choices[0].delta.content
+        if delta:
+            parts.append(delta)
+            yield delta
+
+    metrics.observe_llm(
+        time.perf_counter() - start,
+        prompt_tokens=getattr(usage, "prompt_tokens", 0) or 0,
+        completion_tokens=getattr(usage, "completion_tokens", 0) or 0
     )
 
-    return response.choices[0].message.content
+    if use_cache:
+        llm_cache.put(cache_key, "".join(parts))
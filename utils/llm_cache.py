@@ -0,0 +1,310 @@
+# utils/llm_cache.py
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, Optional
+
+# ---------------- CONFIG ----------------
+CACHE_PATH = os.getenv(
+    "LLM_CACHE_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "skill-gap-analyzer", "llm_cache.sqlite")
+)
+MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+TTL_S = float(os.getenv("LLM_CACHE_TTL_S", str(7 * 24 * 3600)))
+ENABLED = os.getenv("LLM_CACHE_DISABLED", "0") != "1"
+# After a transient error (e.g. "database is locked") the cache is skipped this long
+RETRY_AFTER_S = float(os.getenv("LLM_CACHE_RETRY_AFTER_S", "5"))
+# Hits refresh last_access only when it is older than this (LRU resolution),
+# so reads don't take the write lock every time
+ACCESS_GRANULARITY_S = float(os.getenv("LLM_CACHE_ACCESS_GRANULARITY_S", "300"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    response TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_last_access ON responses(last_access);
+CREATE INDEX IF NOT EXISTS responses_created_at ON responses(created_at);
+"""
+
+# ---------------- CONNECTIONS (ONE PER THREAD) ----------------
+_local = threading.local()
+_init_lock = threading.Lock()
+_initialized = False
+
+# Set on unrecoverable errors (read-only home, bad LLM_CACHE_PATH, corrupt
+# file); the cache is then off for the rest of the process
+_disabled_reason: Optional[str] = None
+_retry_at = 0.0
+
+# Running estimate of stored bytes: seeded from the table once, grown by
+# this process's writes, re-measured only when it crosses MAX_BYTES
+_total_lock = threading.Lock()
+_total_bytes: Optional[int] = None
+
+_stats_lock = threading.Lock()
+_stats = {
+    "hits": 0,
+    "misses": 0,
+    "writes": 0,
+    "evictions": 0,
+    "bytes_saved": 0
+}
+
+
+def _bump(key: str, n: int = 1):
+    with _stats_lock:
+        _stats[key] += n
+
+
+def _active() -> bool:
+    return ENABLED and _disabled_reason is None and time.monotonic() >= _retry_at
+
+
+def _unrecoverable(e: Exception) -> bool:
+    if isinstance(e, OSError):
+        return True
+    # DatabaseError proper: "file is not a database", "malformed"
+    if isinstance(e, sqlite3.DatabaseError) and not isinstance(e, sqlite3.OperationalError):
+        return True
+    message = str(e).lower()
+    return "unable to open" in message or "readonly" in message
+
+
+def _failed(e: Exception):
+    """
+    Turns the cache off for good on unrecoverable errors; otherwise
+    (locked / busy database) skips it for RETRY_AFTER_S.
+    """
+
+    global _disabled_reason, _retry_at
+
+    if _unrecoverable(e):
+        _disabled_reason = f"{type(e).__name__}: {e}"
+    else:
+        _retry_at = time.monotonic() + RETRY_AFTER_S
+
+
+def _connection() -> sqlite3.Connection:
+    global _initialized
+
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        return conn
+
+    with _init_lock:
+        if not _initialized:
+            os.makedirs(os.path.dirname(CACHE_PATH) or ".", exist_ok=True)
+            init = sqlite3.connect(CACHE_PATH)
+            try:
+                init.execute("PRAGMA journal_mode=WAL")
+                init.executescript(_SCHEMA)
+                init.commit()
+            finally:
+                init.close()
+            _initialized = True
+
+    conn = sqlite3.connect(CACHE_PATH, timeout=10)
+    conn.execute("PRAGMA synchronous=NORMAL")
+
+    _local.conn = conn
+    return conn
+
+
+def make_key(model: str, system_prompt: str, prompt: str, params: Dict[str, Any]) -> str:
+    """
+    Content address of one LLM request.
+    """
+
+    payload = json.dumps(
+        {
+            "model": model,
+            "system": system_prompt,
+            "prompt": prompt,
+            "params": params
+        },
+        sort_keys=True,
+        ensure_ascii=False
+    )
+
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def get(key: str) -> Optional[str]:
+    """
+    Cached response for key, or None (missing / expired).
+    """
+
+    if not _active():
+        return None
+
+    try:
+        conn = _connection()
+        now = time.time()
+
+        row = conn.execute(
+            "SELECT response, size, created_at, last_access FROM responses WHERE key = ?",
+            (key,)
+        ).fetchone()
+
+        if row is None or now - row[2] > TTL_S:
+            if row is not None:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                conn.commit()
+            _bump("misses")
+            return None
+
+        if now - row[3] > ACCESS_GRANULARITY_S:
+            conn.execute(
+                "UPDATE responses SET last_access = ? WHERE key = ?",
+                (now, key)
+            )
+            conn.commit()
+
+    except (sqlite3.Error, OSError) as e:
+        # A broken cache must never break an analysis
+        _failed(e)
+        _bump("misses")
+        return None
+
+    _bump("hits")
+    _bump("bytes_saved", row[1])
+    return row[0]
+
+
+def put(key: str, response: str):
+    """
+    Stores a response and evicts least-recently-used rows over MAX_BYTES.
+    """
+
+    global _total_bytes
+
+    if not _active() or response is None:
+        return
+
+    size = len(response.encode("utf-8"))
+    if size > MAX_BYTES:
+        return
+
+    try:
+        conn = _connection()
+        now = time.time()
+
+        conn.execute(
+            "INSERT OR REPLACE INTO responses (key, response, size, created_at, last_access) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (key, response, size, now, now)
+        )
+        _bump("writes")
+
+        with _total_lock:
+            if _total_bytes is None:
+                _total_bytes = _stored_bytes(conn)
+            else:
+                _total_bytes += size
+            over_budget = _total_bytes > MAX_BYTES
+
+        if not over_budget:
+            conn.commit()
+            return
+
+        # ---------------- TTL + LRU EVICTION ----------------
+        # Only when the estimate crosses the budget: re-measure (other
+        # processes write too), drop expired rows, then LRU
+        conn.execute("DELETE FROM responses WHERE created_at < ?", (now - TTL_S,))
+
+        total = _stored_bytes(conn)
+
+        while total > MAX_BYTES:
+            oldest = conn.execute(
+                "SELECT key, size FROM responses ORDER BY last_access ASC LIMIT 1"
+            ).fetchone()
+            if oldest is None:
+                break
+            conn.execute("DELETE FROM responses WHERE key = ?", (oldest[0],))
+            total -= oldest[1]
+            _bump("evictions")
+
+        conn.commit()
+
+        with _total_lock:
+            _total_bytes = total
+
+    except (sqlite3.Error, OSError) as e:
+        _failed(e)
+
+
+def delete(key: str):
+    """
+    Drops one cached response, if present.
+    """
+
+    if not _active():
+        return
+
+    try:
+        conn = _connection()
+        conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+        conn.commit()
+    except (sqlite3.Error, OSError) as e:
+        _failed(e)
+
+
+def _stored_bytes(conn: sqlite3.Connection) -> int:
+    return conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+
+def clear():
+    """
+    Drops every cached response.
+    """
+
+    global _total_bytes
+
+    if not _active():
+        return
+
+    try:
+        conn = _connection()
+        conn.execute("DELETE FROM responses")
+        conn.commit()
+    except (sqlite3.Error, OSError) as e:
+        _failed(e)
+        return
+
+    with _total_lock:
+        _total_bytes = 0
+
+
+def cache_stats() -> Dict[str, Any]:
+    """
+    Hit / miss / bytes-saved counters for this process plus store size.
+    """
+
+    with _stats_lock:
+        stats = dict(_stats)
+
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_ratio"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+    stats["enabled"] = _active()
+    stats["disabled_reason"] = _disabled_reason
+    stats["path"] = CACHE_PATH
+
+    if _active():
+        try:
+            entries, size = _connection().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+            stats["entries"] = entries
+            stats["stored_bytes"] = size
+        except (sqlite3.Error, OSError) as e:
+            _failed(e)
+
+    return stats
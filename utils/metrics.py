@@ -0,0 +1,294 @@
+# utils/metrics.py
+
+import contextvars
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, List, Optional, Tuple
+
+_lock = threading.Lock()
+
+# /metrics is off unless a port is set; loopback only unless a host is given
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+BATCH_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+
+
+# =========================================================
+# PROCESS-WIDE COUNTERS / HISTOGRAMS
+# =========================================================
+
+class Counter:
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self.values: Dict[Tuple, float] = {}
+
+    def inc(self, value: float = 1, **labels):
+        key = tuple(sorted(labels.items()))
+        with _lock:
+            self.values[key] = self.values.get(key, 0) + value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{_labels(key)} {value:g}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(buckets)
+        self.values: Dict[Tuple, Dict[str, Any]] = {}
+
+    def observe(self, value: float, **labels):
+        key = tuple(sorted(labels.items()))
+        with _lock:
+            series = self.values.setdefault(
+                key,
+                {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            )
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series["counts"][i] += 1
+            series["sum"] += value
+            series["count"] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, series in sorted(self.values.items()):
+            for bound, count in zip(self.buckets, series["counts"]):
+                lines.append(f"{self.name}_bucket{_labels(key + (('le', f'{bound:g}'),))} {count}")
+            lines.append(f"{self.name}_bucket{_labels(key + (('le', '+Inf'),))} {series['count']}")
+            lines.append(f"{self.name}_sum{_labels(key)} {series['sum']:g}")
+            lines.append(f"{self.name}_count{_labels(key)} {series['count']}")
+        return lines
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(key: Tuple) -> str:
+    if not key:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in key) + "}"
+
+
+NODE_SECONDS = Histogram("skill_gap_node_duration_seconds", "Wall time per graph node")
+NODE_CALLS = Counter("skill_gap_node_calls_total", "Graph node executions")
+LLM_SECONDS = Histogram("skill_gap_llm_request_duration_seconds", "Wall time per LLM call")
+LLM_CALLS = Counter("skill_gap_llm_calls_total", "LLM calls (cached=true means served locally)")
+LLM_TOKENS = Counter("skill_gap_llm_tokens_total", "LLM tokens reported by the Groq usage field")
+LLM_RETRIES = Counter("skill_gap_llm_retries_total", "LLM retries after unusable output or failures")
+EMBED_SECONDS = Histogram("skill_gap_embedding_duration_seconds", "Wall time per encode batch")
+EMBED_BATCH = Histogram("skill_gap_embedding_batch_size", "Texts per encode call", buckets=BATCH_BUCKETS)
+
+REGISTRY = [
+    NODE_SECONDS, NODE_CALLS,
+    LLM_SECONDS, LLM_CALLS, LLM_TOKENS, LLM_RETRIES,
+    EMBED_SECONDS, EMBED_BATCH
+]
+
+
+def render_prometheus() -> str:
+    """
+    All metrics in Prometheus text exposition format.
+    """
+
+    with _lock:
+        lines = [line for metric in REGISTRY for line in metric.render()]
+    return "\n".join(lines) + "\n"
+
+
+def serve_metrics(port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """
+    Serves /metrics from a daemon thread.
+    """
+
+    class _Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+_server: Optional[ThreadingHTTPServer] = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server() -> Optional[ThreadingHTTPServer]:
+    """
+    Starts /metrics once per process if METRICS_PORT is set.
+    """
+
+    global _server
+
+    if not METRICS_PORT:
+        return None
+
+    with _server_lock:
+        if _server is None:
+            _server = serve_metrics(METRICS_PORT, METRICS_HOST)
+        return _server
+
+
+# =========================================================
+# PER-RUN SUMMARY
+# =========================================================
+
+class RunMetrics:
+    """
+    Collects what one analysis spent; shared by reference with every
+    thread that copies the run's context.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.perf_counter()
+        self.nodes: List[Dict[str, Any]] = []
+        self.llm = {
+            "calls": 0,
+            "cache_hits": 0,
+            "retries": 0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "seconds": 0.0
+        }
+        self.embedding_batches: List[int] = []
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            node_totals: Dict[str, float] = {}
+            for n in self.nodes:
+                node_totals[n["node"]] = node_totals.get(n["node"], 0.0) + n["seconds"]
+
+            return {
+                "wall_seconds": round(time.perf_counter() - self.started, 4),
+                "nodes": [dict(n) for n in self.nodes],
+                "node_seconds": {k: round(v, 4) for k, v in node_totals.items()},
+                "llm": {**self.llm, "seconds": round(self.llm["seconds"], 4)},
+                "embedding_batches": list(self.embedding_batches)
+            }
+
+
+_current_run: contextvars.ContextVar[Optional[RunMetrics]] = contextvars.ContextVar(
+    "skill_gap_run_metrics", default=None
+)
+
+
+@contextmanager
+def track_run():
+    """
+    Everything observed inside the block (and in threads started with
+    the block's context) is also added to the yielded RunMetrics.
+    """
+
+    run = RunMetrics()
+    token = _current_run.set(run)
+    try:
+        yield run
+    finally:
+        _current_run.reset(token)
+
+
+def submit(pool, fn, *args, **kwargs):
+    """
+    pool.submit that keeps the caller's context (and so its RunMetrics).
+    """
+    return pool.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+# =========================================================
+# OBSERVATION HOOKS
+# =========================================================
+
+def observe_node(node: str, seconds: float, ok: bool = True):
+    NODE_SECONDS.observe(seconds, node=node)
+    NODE_CALLS.inc(node=node, status="ok" if ok else "error")
+
+    run = _current_run.get()
+    if run is not None:
+        with run._lock:
+            run.nodes.append({"node": node, "seconds": round(seconds, 4), "ok": ok})
+
+
+def observe_llm(
+    seconds: float,
+    prompt_tokens: int = 0,
+    completion_tokens: int = 0,
+    cached: bool = False
+):
+    LLM_SECONDS.observe(seconds, cached=str(cached).lower())
+    LLM_CALLS.inc(cached=str(cached).lower())
+    if prompt_tokens:
+        LLM_TOKENS.inc(prompt_tokens, type="prompt")
+    if completion_tokens:
+        LLM_TOKENS.inc(completion_tokens, type="completion")
+
+    run = _current_run.get()
+    if run is not None:
+        with run._lock:
+            run.llm["calls"] += 1
+            run.llm["cache_hits"] += int(cached)
+            run.llm["prompt_tokens"] += prompt_tokens
+            run.llm["completion_tokens"] += completion_tokens
+            run.llm["seconds"] += seconds
+
+
+def observe_retry(agent: str):
+    LLM_RETRIES.inc(agent=agent)
+
+    run = _current_run.get()
+    if run is not None:
+        with run._lock:
+            run.llm["retries"] += 1
+
+
+def observe_embedding(batch_size: int, seconds: float):
+    EMBED_SECONDS.observe(seconds)
+    EMBED_BATCH.observe(batch_size)
+
+    run = _current_run.get()
+    if run is not None:
+        with run._lock:
+            run.embedding_batches.append(batch_size)
+
+
+def timed_node(name: str, fn):
+    """
+    Wraps a graph node with wall-time / outcome instrumentation.
+    """
+
+    @wraps(fn)
+    def wrapper(state):
+        start = time.perf_counter()
+        try:
+            result = fn(state)
+        except Exception:
+            observe_node(name, time.perf_counter() - start, ok=False)
+            raise
+        observe_node(name, time.perf_counter() - start)
+        return result
+
+    return wrapper
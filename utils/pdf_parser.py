@@ -1,10 +1,173 @@
+import hashlib
+import io
+import multiprocessing as mp
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
 from pypdf import PdfReader
 
-def extract_text_from_pdf(file):
-    reader = PdfReader(file)
-    text = ""
-    for page in reader.pages:
-        content = page.extract_text()
+# ---------------- CONFIG ----------------
+# Documents with at least this many pages are split across processes
+PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "24"))
+PAGE_WORKERS = int(os.getenv("PDF_PAGE_WORKERS", str(min(4, os.cpu_count() or 1))))
+TEXT_CACHE_SIZE = int(os.getenv("PDF_TEXT_CACHE_SIZE", "128"))
+
+# ---------------- TEXT CACHE (BY CONTENT HASH) ----------------
+_cache: "OrderedDict[Tuple, str]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+# Thread pool for the non-blocking API (parsing itself may fan out to processes)
+_io_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="pdf")
+_page_executor = None
+_page_executor_lock = threading.Lock()
+
+
+def _read_bytes(file) -> bytes:
+    """
+    Accepts a path, raw bytes, or a file-like object (e.g. Streamlit upload).
+    """
+
+    if isinstance(file, (bytes, bytearray)):
+        return bytes(file)
+
+    if isinstance(file, (str, os.PathLike)):
+        with open(file, "rb") as f:
+            return f.read()
+
+    if hasattr(file, "getvalue"):
+        return file.getvalue()
+
+    pos = file.tell() if hasattr(file, "tell") else None
+    data = file.read()
+    if pos is not None and hasattr(file, "seek"):
+        file.seek(pos)
+    return data
+
+
+def _extract_pages(data: bytes, start: int, stop: int) -> List[str]:
+    """
+    Text of pages [start, stop). Runs in worker processes for long PDFs.
+    """
+
+    reader = PdfReader(io.BytesIO(data))
+    pages = []
+    for i in range(start, stop):
+        content = reader.pages[i].extract_text()
         if content:
-            text += content + "\n"
-    return text.strip()
+            pages.append(content)
+    return pages
+
+
+def _get_page_executor() -> ProcessPoolExecutor:
+    global _page_executor
+
+    with _page_executor_lock:
+        if _page_executor is None:
+            # spawn, never fork: callers are threaded (Streamlit, torch,
+            # batch_screen workers) and forking a threaded process can deadlock
+            _page_executor = ProcessPoolExecutor(
+                max_workers=PAGE_WORKERS,
+                mp_context=mp.get_context("spawn")
+            )
+        return _page_executor
+
+
+def _parse(data: bytes, max_pages: Optional[int], max_bytes: Optional[int]) -> str:
+    reader = PdfReader(io.BytesIO(data))
+    n_pages = len(reader.pages)
+    if max_pages is not None:
+        n_pages = min(n_pages, max_pages)
+
+    if n_pages >= PARALLEL_MIN_PAGES and PAGE_WORKERS > 1 and max_bytes is None:
+        # ---------------- PARALLEL PAGE RANGES ----------------
+        chunk = -(-n_pages // PAGE_WORKERS)
+        executor = _get_page_executor()
+        futures = [
+            executor.submit(_extract_pages, data, start, min(start + chunk, n_pages))
+            for start in range(0, n_pages, chunk)
+        ]
+        pages = [page for future in futures for page in future.result()]
+
+    else:
+        # ---------------- SEQUENTIAL (STOPS AT BYTE CAP) ----------------
+        pages = []
+        size = 0
+        for i in range(n_pages):
+            content = reader.pages[i].extract_text()
+            if not content:
+                continue
+            pages.append(content)
+            size += len(content.encode("utf-8")) + 1
+            if max_bytes is not None and size >= max_bytes:
+                break
+
+    text = "\n".join(pages).strip()
+
+    if max_bytes is not None:
+        text = text.encode("utf-8")[:max_bytes].decode("utf-8", errors="ignore")
+
+    return text
+
+
+def extract_text_from_pdf(
+    file,
+    max_pages: Optional[int] = None,
+    max_bytes: Optional[int] = None
+) -> str:
+    """
+    Extracts text from a PDF (path, bytes or file-like).
+
+    - Results are cached by content hash, so reruns don't re-parse
+    - Long documents are split into page ranges parsed in parallel
+    - max_pages / max_bytes cap the pages read and the text returned
+    """
+
+    data = _read_bytes(file)
+
+    key = (hashlib.sha256(data).hexdigest(), max_pages, max_bytes)
+
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+
+    text = _parse(data, max_pages, max_bytes)
+
+    with _cache_lock:
+        _cache[key] = text
+        _cache.move_to_end(key)
+        while len(_cache) > TEXT_CACHE_SIZE:
+            _cache.popitem(last=False)
+
+    return text
+
+
+def clear_cache():
+    """
+    Drops all cached texts (e.g. before a cold-parse benchmark).
+    """
+
+    with _cache_lock:
+        _cache.clear()
+
+
+def extract_text_async(file, **kwargs) -> Future:
+    """
+    Parses off the calling (e.g. Streamlit script) thread.
+    The file is read immediately; parsing happens in the background.
+    """
+
+    data = _read_bytes(file)
+    return _io_executor.submit(extract_text_from_pdf, data, **kwargs)
+
+
+def extract_many(files, **kwargs) -> List[str]:
+    """
+    Parses several uploaded files at once; results keep input order.
+    """
+
+    futures = [extract_text_async(f, **kwargs) for f in files]
+    return [future.result() for future in futures]
@@ -0,0 +1,312 @@
+# utils/structured_output.py
+
+import ast
+import json
+import re
+import threading
+from typing import Callable, Dict, Any, Optional
+
+from utils.groq_client import groq_call, cache_response, forget_response
+from utils import metrics
+
+
+# =========================================================
+# SCHEMAS (PER AGENT)
+# =========================================================
+# A schema is a dict of required keys → expected shape:
+#   str / float / dict       → value of that type
+#   [str] / [dict] / [{...}] → list whose items match the inner shape
+# Missing list-valued keys default to [] (agents already treat them as empty).
+
+JD_SCHEMA = {"requirements": [str]}
+
+RESUME_SCHEMA = {"evidence": [str]}
+
+RECOMMENDATION_SCHEMA = {"recommendations": [dict]}
+
+EVALUATION_SCHEMA = {
+    "met": [{"requirement": str, "reason": str}],
+    "partially_met": [{"requirement": str, "reason": str}],
+    "missing": [{"requirement": str, "reason": str}]
+}
+
+ORCHESTRATOR_SCHEMA = {"next_action": str}
+
+
+class SchemaError(ValueError):
+    pass
+
+
+def _check(value, shape, path: str):
+    if isinstance(shape, list):
+        if not isinstance(value, list):
+            raise SchemaError(f"{path} must be a list")
+        return [_check(v, shape[0], f"{path}[{i}]") for i, v in enumerate(value)]
+
+    if isinstance(shape, dict):
+        if not isinstance(value, dict):
+            raise SchemaError(f"{path} must be an object")
+        return validate(value, shape, path)
+
+    if shape is str:
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return str(value)
+        if not isinstance(value, str):
+            raise SchemaError(f"{path} must be a string")
+        return value
+
+    if shape is float:
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise SchemaError(f"{path} must be a number")
+        return float(value)
+
+    if not isinstance(value, shape):
+        raise SchemaError(f"{path} must be {shape.__name__}")
+    return value
+
+
+def validate(data: Any, schema: Dict[str, Any], path: str = "$") -> Dict[str, Any]:
+    """
+    Checks data against schema; returns it with list defaults filled in.
+    Raises SchemaError describing the first mismatch.
+    """
+
+    if not isinstance(data, dict):
+        raise SchemaError(f"{path} must be a JSON object")
+
+    out = dict(data)
+
+    for key, shape in schema.items():
+        if key not in data:
+            if isinstance(shape, list):
+                out[key] = []
+                continue
+            raise SchemaError(f"{path}.{key} is required")
+
+        out[key] = _check(data[key], shape, f"{path}.{key}")
+
+    return out
+
+
+# =========================================================
+# LOCAL REPAIR
+# =========================================================
+
+_FENCE = re.compile(r"```(?:json|JSON)?")
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+_SMART_QUOTES = str.maketrans({"“": '"', "”": '"', "‘": "'", "’": "'"})
+
+
+def _outermost_object(text: str) -> str:
+    """
+    The first top-level {...} in text. An object that is never closed
+    (truncated output) is returned whole, so _close_truncated sees the cut
+    instead of a shorter object ending at some inner "}".
+    """
+
+    start = text.find("{")
+    if start == -1:
+        return text
+
+    depth = 0
+    in_string = False
+    escaped = False
+
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == in_string:
+                in_string = False
+        elif ch in "\"'":
+            in_string = ch
+        elif ch in "{[":
+            depth += 1
+        elif ch in "}]":
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+
+    return text[start:]
+
+
+def _close_truncated(text: str) -> str:
+    """
+    Closes strings / brackets left open by a truncated response.
+    """
+
+    stack = []
+    in_string = False
+    escaped = False
+
+    for ch in text:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+        elif ch in "}]" and stack:
+            stack.pop()
+
+    if in_string:
+        text += '"'
+
+    text = _TRAILING_COMMA.sub(r"\1", text.rstrip().rstrip(","))
+    return text + "".join(reversed(stack))
+
+
+def parse_json(raw: str) -> Any:
+    """
+    json.loads with cheap local repairs for common LLM malformations:
+    code fences, prose around the object, smart quotes, trailing commas,
+    Python literals / single quotes, and truncated output.
+    """
+
+    text = _FENCE.sub("", raw or "").strip()
+
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        pass
+
+    text = _outermost_object(text).translate(_SMART_QUOTES)
+    text = _TRAILING_COMMA.sub(r"\1", text)
+
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        pass
+
+    try:
+        return ast.literal_eval(text)
+    except (ValueError, SyntaxError, TypeError, MemoryError, RecursionError):
+        pass
+
+    return json.loads(_close_truncated(text))
+
+
+# =========================================================
+# STATS
+# =========================================================
+
+_stats_lock = threading.Lock()
+_stats: Dict[str, Dict[str, int]] = {}
+
+
+def _bump(agent: str, key: str):
+    with _stats_lock:
+        agent_stats = _stats.setdefault(
+            agent,
+            {"calls": 0, "clean": 0, "repaired": 0, "retried": 0, "failed": 0}
+        )
+        agent_stats[key] += 1
+
+
+def parse_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Per-agent parse outcomes and failure rates.
+    """
+
+    with _stats_lock:
+        snapshot = {agent: dict(s) for agent, s in _stats.items()}
+
+    for s in snapshot.values():
+        calls = s["calls"] or 1
+        s["first_pass_failure_rate"] = round((s["calls"] - s["clean"] - s["repaired"]) / calls, 4)
+        s["failure_rate"] = round(s["failed"] / calls, 4)
+
+    return snapshot
+
+
+# =========================================================
+# STRUCTURED CALL
+# =========================================================
+
+def _try_parse(raw: str, schema: Dict[str, Any], check: Optional[Callable] = None):
+    """
+    Returns (result, repaired, error).
+    """
+
+    text = _FENCE.sub("", raw or "").strip()
+
+    # JSONDecodeError and SchemaError are both ValueErrors
+    try:
+        result, repaired = validate(json.loads(text), schema), False
+    except ValueError:
+        try:
+            result, repaired = validate(parse_json(raw), schema), True
+        except ValueError as e:
+            return None, False, str(e)
+
+    # Valid but incomplete (e.g. items lost to truncation) counts as a failure
+    error = check(result) if check is not None else None
+    if error:
+        return None, False, error
+
+    return result, repaired, None
+
+
+def structured_call(
+    prompt: str,
+    api_key: str,
+    schema: Dict[str, Any],
+    agent: str,
+    max_retries: int = 1,
+    use_cache: bool = True,
+    check: Optional[Callable[[Dict[str, Any]], Optional[str]]] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    JSON-mode LLM call validated against schema.
+
+    Malformed output is repaired locally first; only if that fails is
+    the model asked once more, with the specific error. check(result)
+    may return an error for a valid but unusable object (treated the
+    same way). Returns None if no valid object could be obtained —
+    callers keep their fallbacks.
+    """
+
+    _bump(agent, "calls")
+
+    raw = groq_call(prompt, api_key, use_cache=use_cache, json_mode=True)
+    result, repaired, error = _try_parse(raw, schema, check)
+
+    if result is not None:
+        _bump(agent, "repaired" if repaired else "clean")
+        return result
+
+    if use_cache:
+        # Never serve the unusable reply again, whatever the retry yields
+        forget_response(prompt, json_mode=True)
+
+    for _ in range(max_retries):
+        _bump(agent, "retried")
+        metrics.observe_retry(agent)
+
+        retry_prompt = (
+            f"{prompt}\n\n"
+            "--------------------------------------------------\n"
+            "Your previous reply could not be used:\n"
+            f"{error}\n"
+            "Return ONLY the corrected JSON object.\n"
+        )
+
+        # Fresh call: the cached reply is the one that failed
+        raw = groq_call(retry_prompt, api_key, use_cache=False, json_mode=True)
+        result, _, error = _try_parse(raw, schema, check)
+
+        if result is not None:
+            if use_cache:
+                cache_response(prompt, json.dumps(result, ensure_ascii=False), json_mode=True)
+            return result
+
+    _bump(agent, "failed")
+    return None